@@ -0,0 +1,324 @@
+"""End-to-end discovery and download benchmark against a local TikWM stand-in.
+
+Starts an HTTP server that answers ``/api/user/info`` and ``/api/user/posts``
+like TikWM and serves synthetic MP4 payloads under ``/@<user>/video/<id>``.
+Latency, throttling (403/429) and server errors are injected at configurable
+rates. Injected throttles trigger the real AIMD backoff and cooldowns, so
+even a few percent makes a case take minutes. Every (workers, videos) case
+runs in a fresh subprocess so peak RSS is per case, and the results are
+written as JSON for comparison between versions.
+
+    python benchmarks/bench_pipeline.py --workers 1 4 8 --videos 30 150 --json after.json
+    python benchmarks/bench_pipeline.py --compare before.json after.json
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+FIRST_ID = 7_300_000_000_000_000_000
+POST_PATH = re.compile(r"^/@(?P<user>[\w.-]+)/video/(?P<vid>\d+)$")
+PLAY_PATH = re.compile(r"^/video/media/play/(?P<vid>\d+)\.mp4$")
+RANGE = re.compile(r"bytes=(\d+)-")
+
+
+def account_size(username: str) -> int:
+    # Accounts are named bench<N>; N is the number of posts.
+    return int(username.lstrip("@").removeprefix("bench") or 0)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "StandInServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _reply(self, status: int, body: bytes = b"", content_type: str = "application/json",
+               headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, payload: Any) -> None:
+        self._reply(200, json.dumps(payload).encode())
+
+    def _injected_fault(self) -> bool:
+        cfg = self.server.cfg
+        if cfg.latency_ms:
+            time.sleep(cfg.latency_ms / 1000)
+        roll = self.server.roll()
+        if roll < cfg.throttle_rate:
+            self._reply(429 if roll < cfg.throttle_rate / 2 else 403)
+            return True
+        if roll < cfg.throttle_rate + cfg.failure_rate:
+            self._reply(500)
+            return True
+        return False
+
+    def do_HEAD(self) -> None:
+        self.do_GET()
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if self._injected_fault():
+            return
+        if url.path == "/api/user/info":
+            name = query.get("unique_id", "").lstrip("@")
+            self._json({
+                "code": 0,
+                "data": {
+                    "user": {"uniqueId": name, "nickname": name},
+                    "stats": {"videoCount": account_size(name), "followerCount": 0},
+                },
+            })
+        elif url.path == "/api/user/posts":
+            name = query.get("unique_id", "").lstrip("@")
+            cursor = int(query.get("cursor", 0))
+            count = int(query.get("count", 30))
+            total = account_size(name)
+            videos = [
+                {
+                    "video_id": str(FIRST_ID + idx),
+                    "title": f"video {idx}",
+                    "cover": None,
+                    # Relative, as TikWM often answers.
+                    "play": f"/video/media/play/{FIRST_ID + idx}.mp4",
+                    "size": len(self.server.payload),
+                }
+                for idx in range(cursor, min(cursor + count, total))
+            ]
+            self._json({
+                "code": 0,
+                "data": {"videos": videos, "cursor": cursor + len(videos), "hasMore": cursor + count < total},
+            })
+        elif POST_PATH.match(url.path) or PLAY_PATH.match(url.path):
+            payload = self.server.payload
+            match = RANGE.match(self.headers.get("Range", ""))
+            start = int(match.group(1)) if match else 0
+            headers = {"Accept-Ranges": "bytes"}
+            if start >= len(payload):
+                # What a CDN answers when a resumed partial is already complete.
+                self._reply(416, b"", "text/plain", {"Content-Range": f"bytes */{len(payload)}"})
+                return
+            if match:
+                headers["Content-Range"] = f"bytes {start}-{len(payload) - 1}/{len(payload)}"
+            self._reply(206 if match else 200, payload[start:], "video/mp4", headers)
+        else:
+            # The yt-dlp profile scrape has nothing to find here.
+            self._reply(404, b"", "text/plain")
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cfg: argparse.Namespace) -> None:
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.cfg = cfg
+        # ftyp box followed by filler so the payload sniffs as MP4.
+        header = b"\x00\x00\x00\x18ftypmp42\x00\x00\x00\x00mp42isom"
+        self.payload = header + bytes(max(0, cfg.video_kb * 1024 - len(header)))
+        self._random = random.Random(cfg.seed)
+        self._lock = threading.Lock()
+
+    def handle_error(self, request, client_address) -> None:
+        # Clients closing kept-alive connections at exit is not worth a traceback.
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+    def roll(self) -> float:
+        with self._lock:
+            return self._random.random()
+
+
+def run_case(
+    port: int, workers: int, videos: int, discovery_concurrency: int, direct: int = 1
+) -> Dict[str, Any]:
+    """Runs inside the child process: one discovery + download pass."""
+    import contextlib
+    import io
+
+    from tiktok_dl.direct import DirectDownloader
+    from tiktok_dl.http import build_session
+    from tiktok_dl.logging import Logger
+    from tiktok_dl.ratelimit import AdaptiveRateLimiter
+    from tiktok_dl.services.download_service import DownloadService
+    from tiktok_dl.services.profile_service import ProfileService
+    from tiktok_dl.services.video_service import PAGE_SIZE, VideoService
+
+    # API and media go to different host names so they get separate rate budgets.
+    api_base = f"http://127.0.0.1:{port}/api"
+    web_base = f"http://localhost:{port}"
+    username = f"bench{videos}"
+    logger = Logger()
+    limiter = AdaptiveRateLimiter(logger=logger)
+    session = build_session(rate_limiter=limiter)
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        ProfileService(session, 15, logger, api_base=api_base).fetch_profile(username)
+        discovered = VideoService(
+            session,
+            15,
+            logger,
+            rate_limiter=limiter,
+            page_concurrency=discovery_concurrency,
+            api_base=api_base,
+            web_base=web_base,
+        ).discover_videos(username, max_pages=videos // PAGE_SIZE + 1)
+        discovery = time.perf_counter() - started
+
+        service = DownloadService(
+            Path(tmp),
+            username,
+            workers,
+            None,
+            logger,
+            rate_limiter=limiter,
+            # Play URLs are served from the API host.
+            allowed_hosts={f"localhost:{port}", f"127.0.0.1:{port}"},
+            direct=DirectDownloader(session, 15) if direct else None,
+        )
+        started = time.perf_counter()
+        results = service.download_all(discovered)
+        download = time.perf_counter() - started
+        done = [r for r in results if r.success]
+        size = sum(r.target.stat().st_size for r in done if r.target.exists())
+
+    return {
+        "workers": workers,
+        "videos": videos,
+        "discovered": len(discovered),
+        "downloaded": len(done),
+        "failed": len(results) - len(done),
+        "discovery_s": round(discovery, 3),
+        "download_s": round(download, 3),
+        "downloads_per_s": round(len(done) / max(download, 1e-9), 2),
+        "mb_per_s": round(size / 1e6 / max(download, 1e-9), 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(before_path: str, after_path: str) -> None:
+    before = json.loads(Path(before_path).read_text(encoding="utf-8"))
+    after = json.loads(Path(after_path).read_text(encoding="utf-8"))
+    old = {(r["workers"], r["videos"]): r for r in before["results"]}
+    print(f"{before.get('revision')} -> {after.get('revision')}")
+    for row in after["results"]:
+        base = old.get((row["workers"], row["videos"]))
+        if not base or base.get("timed_out") or row.get("timed_out"):
+            continue
+        parts = []
+        for key in ("discovery_s", "downloads_per_s", "mb_per_s", "peak_rss_mb"):
+            change = (row[key] - base[key]) / base[key] * 100 if base[key] else 0.0
+            parts.append(f"{key} {base[key]} -> {row[key]} ({change:+.1f}%)")
+        print(f"workers={row['workers']:<3} videos={row['videos']:<5} " + ", ".join(parts))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--videos", type=int, nargs="+", default=[30, 150], help="Posts per account")
+    parser.add_argument("--discovery-concurrency", type=int, default=4)
+    parser.add_argument("--video-kb", type=int, default=256)
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Added to every response")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction answered 403/429")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction answered 500")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--no-direct", action="store_true", help="Download every video through yt-dlp extraction"
+    )
+    parser.add_argument(
+        "--case-timeout", type=float, default=600.0,
+        help="Give up on a case after this many seconds (throttling backs off for real)",
+    )
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="Diff two result files and exit")
+    parser.add_argument("--case", nargs=5, type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.case:
+        print(json.dumps(run_case(*args.case)))
+        return
+
+    server = StandInServer(args)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+
+    results: List[Dict[str, Any]] = []
+    for videos, workers in itertools.product(args.videos, args.workers):
+        try:
+            proc = subprocess.run(
+                [sys.executable, __file__, "--case", str(port), str(workers), str(videos),
+                 str(args.discovery_concurrency), str(int(not args.no_direct))],
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=args.case_timeout,
+            )
+        except subprocess.TimeoutExpired:
+            print(f"videos={videos:<5} workers={workers:<3} timed out after {args.case_timeout:g}s")
+            results.append({"workers": workers, "videos": videos, "timed_out": True})
+            continue
+        row = json.loads(proc.stdout.strip().splitlines()[-1])
+        results.append(row)
+        print(
+            f"videos={videos:<5} workers={workers:<3} discovery {row['discovery_s']:6.2f}s  "
+            f"{row['downloads_per_s']:7.2f} dl/s  {row['mb_per_s']:7.2f} MB/s  "
+            f"rss {row['peak_rss_mb']:6.1f} MB  failed {row['failed']}"
+        )
+    server.shutdown()
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            key: getattr(args, key)
+            for key in (
+                "discovery_concurrency", "video_kb", "latency_ms", "throttle_rate", "failure_rate", "seed", "no_direct"
+            )
+        },
+        "results": results,
+    }
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
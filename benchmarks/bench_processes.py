@@ -0,0 +1,125 @@
+"""Compare the in-process yt-dlp pool with worker-process pools of growing size.
+
+Serves small synthetic MP4 files from a local HTTP server, so yt-dlp's
+pure-Python work (option handling, extraction, hooks) dominates over
+network bandwidth. The thread pool is bound by one GIL; each process pool
+splits the same number of download threads between N processes.
+
+    python benchmarks/bench_processes.py --videos 400 --workers 8 --processes 1,2,4,8
+
+How this scales with cores has not been measured yet: so far it has only
+run on a single-CPU host, where the process pools lose to threads
+(0.67x-0.91x) because they only add IPC. --processes stays off by
+default until a run on a machine with at least as many CPUs as the
+largest process count shows a gain.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_ytdl_pool import serve  # noqa: E402
+
+from tiktok_dl.services.download_service import ydl_options  # noqa: E402
+from tiktok_dl.ytdl import ProcessYoutubeDLPool, YoutubeDLPool  # noqa: E402
+
+
+def run(pool, urls, out_dir: Path, workers: int) -> float:
+    received = [0] * len(urls)
+
+    def fetch(item):
+        idx, url = item
+
+        def hook(status):
+            received[idx] = status.get("downloaded_bytes") or received[idx]
+
+        pool.download(url, str(out_dir / f"{idx}.mp4"), hook)
+
+    # Warm up: start the worker processes and build one YoutubeDL per slot.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, list(enumerate(urls))[:workers]))
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, enumerate(urls)))
+    elapsed = time.perf_counter() - started
+    pool.close()
+    if not all(received):
+        raise SystemExit("some downloads reported no progress")
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--processes", default="1,2,4", help="Comma-separated process counts")
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+    counts = [int(n) for n in args.processes.split(",") if n.strip()]
+    cpus = os.cpu_count() or 1
+    if cpus < max(counts, default=1):
+        print(
+            f"warning: {cpus} CPU(s) for up to {max(counts)} processes; "
+            "these numbers cannot show scaling with cores"
+        )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        media = root / "media"
+        media.mkdir()
+        payload = b"\0" * (args.size_kb * 1024)
+        for idx in range(args.videos):
+            (media / f"{idx}.mp4").write_bytes(payload)
+        server = serve(media)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/{idx}.mp4" for idx in range(args.videos)]
+
+        pools = [("threads", lambda: YoutubeDLPool(ydl_options()))]
+        for count in counts:
+            per_process = -(-args.workers // count)
+            pools.append(
+                (
+                    f"{count}x{per_process} proc",
+                    lambda count=count, per_process=per_process: ProcessYoutubeDLPool(
+                        ydl_options(), count, per_process
+                    ),
+                )
+            )
+
+        results = {}
+        for name, factory in pools:
+            out_dir = root / name.replace(" ", "_")
+            out_dir.mkdir()
+            elapsed = run(factory(), urls, out_dir, args.workers)
+            results[name] = {
+                "seconds": round(elapsed, 3),
+                "videos_per_second": round(args.videos / elapsed, 1),
+            }
+            print(f"{name:>12}: {elapsed:7.2f}s total, {results[name]['videos_per_second']:7.1f} videos/s")
+        server.shutdown()
+
+    baseline = results["threads"]["seconds"]
+    for name, row in results.items():
+        print(f"{name:>12}: {baseline / row['seconds']:.2f}x vs threads")
+    print(f"({args.videos} videos, {args.workers} download threads, {os.cpu_count()} CPUs)")
+    if args.json_path:
+        Path(args.json_path).write_text(
+            json.dumps(
+                {"videos": args.videos, "workers": args.workers, "cpus": os.cpu_count(), **results},
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Measure the fixed cost of starting the CLI.
+
+Runs short invocations in fresh interpreters (from a scratch working
+directory, since Settings.load writes its config file there) and reports
+the minimum and median wall time, plus the slowest imports behind
+``import tiktok_dl.cli`` according to ``python -X importtime``.
+
+    python benchmarks/bench_startup.py --repeat 20 --json startup.json
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+MAIN = str(ROOT / "main.py")
+
+
+def commands(scratch: Path) -> Dict[str, List[str]]:
+    return {
+        "import": [sys.executable, "-c", "import tiktok_dl.cli"],
+        "help": [sys.executable, MAIN, "--help"],
+        "self-check": [sys.executable, MAIN, "--self-check"],
+        "verify-empty": [sys.executable, MAIN, "--verify", "-d", str(scratch / "downloads")],
+    }
+
+
+def time_command(cmd: List[str], cwd: Path, env: Dict[str, str], repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def slowest_imports(cwd: Path, env: Dict[str, str], top: int) -> List[Tuple[str, float]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import tiktok_dl.cli"],
+        cwd=cwd, env=env, capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].rstrip()
+        # Direct imports of tiktok_dl.cli only, so nested modules are not counted twice.
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth != 1:
+            continue
+        rows.append((name.strip(), int(parts[1]) / 1000))
+    return sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--top", type=int, default=8, help="How many top-level imports to list")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = Path(tmp)
+        for name, cmd in commands(scratch).items():
+            samples = time_command(cmd, scratch, env, args.repeat)
+            results[name] = {
+                "min_ms": round(min(samples), 1),
+                "median_ms": round(statistics.median(samples), 1),
+            }
+            print(f"{name:>13}: min {results[name]['min_ms']:7.1f} ms, median {results[name]['median_ms']:7.1f} ms")
+        imports = slowest_imports(scratch, env, args.top)
+
+    print("slowest direct imports of tiktok_dl.cli (cumulative):")
+    for module, ms in imports:
+        print(f"  {ms:7.1f} ms  {module}")
+
+    if args.json_path:
+        Path(args.json_path).write_text(
+            json.dumps(
+                {
+                    "python": sys.version.split()[0],
+                    "repeat": args.repeat,
+                    "commands": results,
+                    "imports_ms": dict(imports),
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
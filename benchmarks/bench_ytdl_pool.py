@@ -0,0 +1,110 @@
+"""Compare per-video overhead of a fresh YoutubeDL per download vs. the pool.
+
+Serves small synthetic MP4 files from a local HTTP server so the numbers
+reflect yt-dlp setup and extraction cost rather than network bandwidth.
+
+    python benchmarks/bench_ytdl_pool.py --videos 200 --workers 8
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import yt_dlp  # noqa: E402
+
+from tiktok_dl.services.download_service import ydl_options  # noqa: E402
+from tiktok_dl.ytdl import YoutubeDLPool  # noqa: E402
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args) -> None:
+        pass
+
+
+def serve(directory: Path) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=str(directory)))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_fresh(urls, out_dir: Path, workers: int) -> float:
+    opts = ydl_options()
+
+    def fetch(item):
+        idx, url = item
+        with yt_dlp.YoutubeDL({**opts, "outtmpl": str(out_dir / f"fresh_{idx}.mp4")}) as ydl:
+            ydl.download([url])
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, enumerate(urls)))
+    return time.perf_counter() - started
+
+
+def run_pooled(urls, out_dir: Path, workers: int) -> float:
+    pool = YoutubeDLPool(ydl_options())
+
+    def fetch(item):
+        idx, url = item
+        pool.download(url, str(out_dir / f"pooled_{idx}.mp4"))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, enumerate(urls)))
+    elapsed = time.perf_counter() - started
+    pool.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--videos", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        media = root / "media"
+        media.mkdir()
+        payload = b"\0" * (args.size_kb * 1024)
+        for idx in range(args.videos):
+            (media / f"{idx}.mp4").write_bytes(payload)
+        server = serve(media)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/{idx}.mp4" for idx in range(args.videos)]
+
+        results = {}
+        for name, runner in (("fresh", run_fresh), ("pooled", run_pooled)):
+            out_dir = root / name
+            out_dir.mkdir()
+            elapsed = runner(urls, out_dir, args.workers)
+            results[name] = {
+                "seconds": round(elapsed, 3),
+                "ms_per_video": round(elapsed * 1000 / args.videos, 2),
+            }
+            print(f"{name:>7}: {elapsed:7.2f}s total, {results[name]['ms_per_video']:7.2f} ms/video")
+        server.shutdown()
+
+    speedup = results["fresh"]["seconds"] / max(results["pooled"]["seconds"], 1e-9)
+    print(f"speedup: {speedup:.2f}x ({args.videos} videos, {args.workers} workers)")
+    if args.json_path:
+        Path(args.json_path).write_text(
+            json.dumps({"videos": args.videos, "workers": args.workers, **results}, indent=2),
+            encoding="utf-8",
+        )
+
+
+if __name__ == "__main__":
+    main()
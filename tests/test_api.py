@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import pytest
+
+from tiktok_dl.api import parse_job_request
+from tiktok_dl.cli import subset_limit
+
+
+def test_job_without_count_takes_the_cli_default():
+    username, options = parse_job_request({"username": " someone "})
+    assert username == "someone"
+    assert not options["download_all"]
+    assert subset_limit(options["count"], options["download_all"]) == 20
+
+
+def test_job_can_ask_for_everything():
+    _, options = parse_job_request({"username": "someone", "all": True})
+    assert subset_limit(options["count"], options["download_all"]) is None
+
+
+@pytest.mark.parametrize("count", [0, -1, "5", True, 2.5])
+def test_job_rejects_bad_counts(count):
+    with pytest.raises(ValueError):
+        parse_job_request({"username": "someone", "count": count})
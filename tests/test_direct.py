@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tiktok_dl.direct import DirectDownloader
+from tiktok_dl.http import build_session
+from tiktok_dl.logging import Logger
+from tiktok_dl.models import VideoItem
+from tiktok_dl.ratelimit import MEDIA_HOST, AdaptiveRateLimiter
+from tiktok_dl.services.download_service import DownloadService
+
+PAYLOAD = b"\x00" * 4096
+
+
+@pytest.fixture
+def media_server():
+    class Media(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "video/mp4")
+            self.send_header("Content-Length", str(len(PAYLOAD)))
+            self.end_headers()
+            self.wfile.write(PAYLOAD)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Media)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def service(tmp_path, limiter, allowed_hosts):
+    session = build_session(rate_limiter=limiter)
+    return DownloadService(
+        tmp_path,
+        "someone",
+        1,
+        None,
+        Logger(),
+        rate_limiter=limiter,
+        allowed_hosts=allowed_hosts,
+        direct=DirectDownloader(session, 5),
+    )
+
+
+def test_direct_fetch_is_charged_to_the_media_budget(tmp_path, media_server):
+    # The play URL is on the API host, as TikWM's relative play paths are.
+    limiter = AdaptiveRateLimiter({MEDIA_HOST: 60, "127.0.0.1": 60})
+    video = VideoItem("1", f"http://{media_server}/@someone/video/1", play_url=f"http://{media_server}/play/1.mp4")
+    (result,) = service(tmp_path, limiter, {media_server}).download_all([video])
+    assert result.status == "downloaded"
+    assert result.target.read_bytes() == PAYLOAD
+    assert limiter.rate(MEDIA_HOST) > 60
+    assert limiter.rate("127.0.0.1") == pytest.approx(60)
+
+
+@pytest.mark.parametrize(
+    ("url", "allowed"),
+    [
+        ("https://www.tikwm.com/video/media/play/1.mp4", True),
+        ("https://v16m.tiktokcdn.com/abc/1.mp4", True),
+        ("https://www.tiktok.com/aweme/v1/play/?video_id=1", True),
+        ("https://attacker.example/1.mp4", False),
+        ("file:///etc/passwd", False),
+        ("ftp://www.tikwm.com/1.mp4", False),
+    ],
+)
+def test_play_url_hosts(tmp_path, url, allowed):
+    assert service(tmp_path, AdaptiveRateLimiter(), None)._allowed_play_url(url) is allowed
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import csv
+import json
+from pathlib import Path
+
+from tiktok_dl.exports import ResultExporter
+from tiktok_dl.models import DownloadResult, VideoItem
+
+
+def result(index: int, description: str = "") -> DownloadResult:
+    video = VideoItem(str(index), f"https://www.tiktok.com/@someone/video/{index}", description)
+    return DownloadResult(index, video, True, "downloaded", Path(f"{index}.mp4"), 10, "abc")
+
+
+def test_torn_last_line_is_trimmed_on_reopen(tmp_path):
+    path = tmp_path / "results.ndjson"
+    with ResultExporter(path) as exporter:
+        exporter.write(result(1))
+    with path.open("a") as fh:
+        fh.write('{"index": 2, "vid')
+    with ResultExporter(path) as exporter:
+        exporter.write(result(3))
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [row["index"] for row in rows] == [1, 3]
+
+
+def test_csv_keeps_one_record_per_line(tmp_path):
+    path = tmp_path / "results.csv"
+    with ResultExporter(path, "csv", "sha256") as exporter:
+        exporter.write(result(1, "two\nlines"))
+    with ResultExporter(path, "csv", "sha256") as exporter:
+        exporter.write(result(2))
+    rows = list(csv.DictReader(path.open()))
+    assert [row["description"] for row in rows] == ["two lines", ""]
+    assert rows[0]["algorithm"] == "sha256"
+
+
+def test_nothing_is_written_without_rows(tmp_path):
+    ResultExporter(tmp_path / "results.ndjson").close()
+    assert not (tmp_path / "results.ndjson").exists()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from tiktok_dl.http_cache import CachingAdapter, ResponseCache
+
+POSTS = "https://www.tikwm.com/api/user/posts?unique_id=@someone"
+
+
+def test_entries_expire(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cache.put(POSTS, 200, {"ETag": "x"}, b"{}", ttl=60)
+    status, headers, body, expires_at = cache.get(POSTS)
+    assert (status, headers, body) == (200, {"ETag": "x"}, b"{}")
+    assert expires_at > time.time()
+    assert cache.get("https://www.tikwm.com/api/other") is None
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_bytes=250)
+    for n in range(3):
+        cache.put(f"{POSTS}&n={n}", 200, {}, b"x" * 100, ttl=60)
+        time.sleep(0.01)
+    assert cache.get(f"{POSTS}&n=0") is None
+    assert cache.get(f"{POSTS}&n=2") is not None
+
+
+def test_ttl_rules(tmp_path):
+    adapter = CachingAdapter(ResponseCache(tmp_path / "cache.sqlite3"), {"posts": 0})
+    assert adapter._ttl_for(POSTS) is None
+    assert adapter._ttl_for("https://www.tikwm.com/api/user/info?unique_id=@someone") == 3600
+    assert adapter._ttl_for("https://v16m.tiktokcdn.com/video.mp4") is None
+
+
+def test_fresh_entries_are_served_without_the_network(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cache.put(POSTS, 200, {"Content-Type": "application/json"}, b'{"code": 0}', ttl=60)
+    session = requests.Session()
+    session.mount("https://", CachingAdapter(cache))
+    response = session.get(POSTS)
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json() == {"code": 0}
+
+
+def test_hits_are_counted_across_threads(tmp_path):
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+    cache.put(POSTS, 200, {"Content-Type": "application/json"}, b'{"code": 0}', ttl=60)
+    session = requests.Session()
+    session.mount("https://", CachingAdapter(cache))
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: session.get(POSTS), range(200)))
+    assert (cache.hits, cache.misses) == (200, 0)
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from tiktok_dl.journal import DownloadJournal
+from tiktok_dl.models import VideoItem
+
+VIDEO = VideoItem("1", "https://www.tiktok.com/@someone/video/1")
+
+
+def test_progress_is_kept_for_the_next_run(tmp_path):
+    journal = DownloadJournal(tmp_path)
+    tracker = journal.tracker(VIDEO, tmp_path / "out.mp4")
+    tracker({"status": "downloading", "downloaded_bytes": 512, "total_bytes": 2048})
+    resumed = DownloadJournal(tmp_path).tracker(VIDEO, tmp_path / "out.mp4")
+    assert (resumed.entry.received, resumed.entry.expected_size) == (512, 2048)
+
+
+def test_switching_source_discards_the_partial(tmp_path):
+    journal = DownloadJournal(tmp_path)
+    journal.tracker(VIDEO, tmp_path / "out.mp4", "direct")({"status": "downloading", "downloaded_bytes": 512})
+    journal.partial_path("1").write_bytes(b"x" * 512)
+    tracker = journal.tracker(VIDEO, tmp_path / "out.mp4", "ytdlp")
+    assert tracker.entry.received == 0
+    assert not journal.partial_path("1").exists()
+
+
+def test_finished_part_file_is_renamed(tmp_path):
+    journal = DownloadJournal(tmp_path)
+    part = journal.partial_path("1").with_name("1.mp4.part")
+    part.write_bytes(b"x" * 100)
+    assert not journal.finished_partial("1", 200)
+    assert journal.finished_partial("1", 100)
+    assert journal.partial_path("1").stat().st_size == 100
+
+
+def test_commit_moves_the_file_and_drops_the_journal(tmp_path):
+    journal = DownloadJournal(tmp_path / "partial")
+    journal.tracker(VIDEO, tmp_path / "out.mp4")
+    journal.partial_path("1").write_bytes(b"done")
+    journal.commit("1", journal.partial_path("1"), tmp_path / "out.mp4")
+    assert (tmp_path / "out.mp4").read_bytes() == b"done"
+    assert journal.pending() == []
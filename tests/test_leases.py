@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import pytest
+
+from tiktok_dl import leases as leases_module
+from tiktok_dl.config import MIN_WORKER_ROUND, Settings
+from tiktok_dl.leases import ACCOUNT, VIDEO, LeaseStore
+from tiktok_dl.logging import Logger
+from tiktok_dl.models import VideoItem
+from tiktok_dl.services.download_service import DownloadService
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(leases_module.time, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def stores(tmp_path):
+    path = tmp_path / "leases.sqlite3"
+    first, second = LeaseStore(path, "first", ttl=30), LeaseStore(path, "second", ttl=30)
+    yield first, second
+    first.close()
+    second.close()
+
+
+def test_workers_split_the_accounts(stores, clock):
+    first, second = stores
+    first.seed(ACCOUNT, ["a", "b"])
+    taken = {first.acquire(ACCOUNT), second.acquire(ACCOUNT)}
+    assert taken == {"a", "b"}
+    assert first.acquire(ACCOUNT) is None
+
+
+def test_expired_lease_is_taken_over(stores, clock):
+    first, second = stores
+    assert first.claim(VIDEO, "1").owner == "first"
+    assert second.claim(VIDEO, "1").owner == "first"
+    clock.now += 31
+    assert second.claim(VIDEO, "1").owner == "second"
+
+
+def test_released_lease_is_available_again(stores, clock):
+    first, second = stores
+    first.seed(ACCOUNT, ["a"])
+    assert first.acquire(ACCOUNT) == "a"
+    first.release(ACCOUNT, "a")
+    assert second.acquire(ACCOUNT) == "a"
+
+
+def test_done_video_stays_done_unless_redone(stores, clock):
+    first, second = stores
+    first.claim(VIDEO, "1")
+    first.complete(VIDEO, "1", size=10)
+    clock.now += 10_000
+    assert second.claim(VIDEO, "1").status == "done"
+    assert second.claim(VIDEO, "1", redo=True).owner == "second"
+
+
+@pytest.mark.parametrize("keep_for", [0, 60])
+def test_finished_account_is_due_after_keep_for(stores, clock, keep_for):
+    first, second = stores
+    first.seed(ACCOUNT, ["a"])
+    first.acquire(ACCOUNT)
+    first.complete(ACCOUNT, "a", keep_for=keep_for)
+    if keep_for:
+        assert second.acquire(ACCOUNT) is None
+    clock.now += keep_for + 1
+    assert second.acquire(ACCOUNT) == "a"
+
+
+def test_worker_round_has_a_floor(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "tiktok_termux_ultimate.config.json").write_text('{"worker_round": 0}')
+    assert Settings.load().worker_round == MIN_WORKER_ROUND
+
+
+def test_video_leased_elsewhere_is_not_reported_done(stores, tmp_path):
+    first, second = stores
+    first.claim(VIDEO, "1")
+    service = DownloadService(tmp_path, "someone", 1, None, Logger(), leases=second)
+    (result,) = service.download_all([VideoItem("1", "https://www.tiktok.com/@someone/video/1")])
+    assert (result.success, result.status) == (False, "remote")
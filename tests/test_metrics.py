@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from tiktok_dl.metrics import Metrics
+
+
+def test_events_racing_close_are_dropped_not_written_to_a_closed_file(tmp_path):
+    path = tmp_path / "events.jsonl"
+    metrics = Metrics(jsonl_path=path)
+    errors = []
+    started = threading.Event()
+
+    def emit():
+        started.set()
+        try:
+            for n in range(2000):
+                metrics.event("video", n=n)
+        except Exception as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=emit)
+    thread.start()
+    started.wait()
+    metrics.close()
+    thread.join()
+    assert not errors
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert lines[-1]["event"] == "run"
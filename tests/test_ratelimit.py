@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tiktok_dl.http import build_session
+from tiktok_dl.ratelimit import API_HOST, MEDIA_HOST, UNMETERED_HEADER, AdaptiveRateLimiter, budget_key
+
+
+@pytest.mark.parametrize(
+    ("url", "key"),
+    [
+        ("https://www.tiktok.com/@someone/video/1", MEDIA_HOST),
+        ("https://v16-webapp.tiktokcdn.com/abc/video.mp4", MEDIA_HOST),
+        ("https://www.tikwm.com/api/user/posts", API_HOST),
+        (MEDIA_HOST, MEDIA_HOST),
+        ("http://127.0.0.1:8080/api/user/posts", "127.0.0.1"),
+        ("http://10.0.0.1/video.mp4", "10.0.0.1"),
+        ("http://[::1]:8080/", "::1"),
+        ("http://localhost:8080/", "localhost"),
+    ],
+)
+def test_budget_key(url, key):
+    assert budget_key(url) == key
+
+
+def test_ip_hosts_do_not_share_a_budget():
+    assert budget_key("http://127.0.0.1/") != budget_key("http://192.168.0.1/")
+
+
+def test_throttle_halves_and_success_recovers_up_to_ceiling():
+    limiter = AdaptiveRateLimiter({MEDIA_HOST: 60})
+    limiter.throttled("https://www.tiktok.com/@someone/video/1")
+    assert limiter.rate(MEDIA_HOST) == pytest.approx(30)
+    limiter.succeeded(MEDIA_HOST)
+    assert limiter.rate(MEDIA_HOST) == pytest.approx(30 * (1 + AdaptiveRateLimiter.INCREASE))
+    for _ in range(200):
+        limiter.succeeded(MEDIA_HOST)
+    assert limiter.rate(MEDIA_HOST) == pytest.approx(120)
+
+
+def test_unlimited_host_is_seeded_by_first_throttle():
+    limiter = AdaptiveRateLimiter()
+    for _ in range(10):
+        limiter.acquire(API_HOST)
+    assert limiter.rate(API_HOST) is None
+    limiter.throttled(API_HOST)
+    assert limiter.rate(API_HOST) == pytest.approx(5)
+    assert limiter.rate(MEDIA_HOST) is None
+
+
+
+def test_reserved_token_pays_for_the_first_request_only(monkeypatch):
+    limiter = AdaptiveRateLimiter({MEDIA_HOST: 6})
+    ticket = limiter.reserve(MEDIA_HOST)
+    acquired = []
+    monkeypatch.setattr(limiter, "acquire", acquired.append)
+    ticket.spend("https://www.tiktok.com/@someone/video/1")
+    assert acquired == []
+    ticket.spend(MEDIA_HOST)
+    assert acquired == [MEDIA_HOST]
+
+
+def test_unspent_ticket_is_refunded():
+    limiter = AdaptiveRateLimiter({MEDIA_HOST: 6})
+    limiter.reserve(MEDIA_HOST).refund()
+    # At 6/min another token would take ten seconds to refill.
+    assert limiter.acquire(MEDIA_HOST) == 0
+
+
+@pytest.fixture
+def forbidden_server():
+    class Forbidden(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.server.headers_seen.append(dict(self.headers))
+            self.send_response(403)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Forbidden)
+    server.headers_seen = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_adapter_throttles_governed_hosts(forbidden_server):
+    url = f"http://127.0.0.1:{forbidden_server.server_address[1]}/api"
+    limiter = AdaptiveRateLimiter({"127.0.0.1": 60})
+    build_session(rate_limiter=limiter).get(url)
+    assert limiter.rate(url) == pytest.approx(30)
+
+
+def test_adapter_ignores_ungoverned_hosts(forbidden_server):
+    url = f"http://127.0.0.1:{forbidden_server.server_address[1]}/cover.jpg"
+    limiter = AdaptiveRateLimiter({MEDIA_HOST: 60})
+    build_session(rate_limiter=limiter).get(url)
+    assert limiter.rate(url) is None
+
+
+def test_unmetered_requests_skip_the_limiter(forbidden_server):
+    url = f"http://127.0.0.1:{forbidden_server.server_address[1]}/cover.jpg"
+    limiter = AdaptiveRateLimiter({"127.0.0.1": 60})
+    build_session(rate_limiter=limiter).get(url, headers={UNMETERED_HEADER: "1"})
+    assert limiter.rate(url) == pytest.approx(60)
+    assert UNMETERED_HEADER not in forbidden_server.headers_seen[0]
@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+import requests
+
+from tiktok_dl.logging import Logger
+from tiktok_dl.models import VideoItem
+from tiktok_dl.services.thumbnail_service import ThumbnailService
+
+
+def test_finished_fetches_are_not_kept(tmp_path):
+    service = ThumbnailService(requests.Session(), 1, Logger())
+    # Nothing listens on port 9: each fetch fails fast and is logged, not raised.
+    for n in range(50):
+        service.submit(VideoItem(str(n), "", thumbnail_url=f"http://127.0.0.1:9/{n}.jpg"), tmp_path)
+    service._executor.shutdown(wait=True)
+    assert not service._futures
+    service.close()
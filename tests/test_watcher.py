@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import random
+
+import pytest
+
+from tiktok_dl.services.watcher import WatchSchedule
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def schedule(clock, jitter=0.0):
+    return WatchSchedule(100, 10, 1000, jitter, clock=clock, rng=random.Random(1))
+
+
+def test_new_accounts_are_due_at_once_and_handed_out_once(clock):
+    watch = schedule(clock)
+    assert watch.sync(["a", "b", "a", " "]) == (["a", "b"], [])
+    assert sorted(watch.due()) == ["a", "b"]
+    assert watch.due() == []
+    assert watch.seconds_until_next() is None
+
+
+def test_interval_adapts_to_posting(clock):
+    watch = schedule(clock)
+    watch.sync(["a"])
+    watch.due()
+    assert watch.polled("a", 3) == pytest.approx(50)
+    assert watch.polled("a", 0) == pytest.approx(75)
+    for _ in range(20):
+        watch.polled("a", 0)
+    assert watch.polled("a", 0) == pytest.approx(1000)
+    for _ in range(20):
+        watch.polled("a", 5)
+    assert watch.polled("a", 5) == pytest.approx(10)
+
+
+def test_busiest_accounts_go_first(clock):
+    watch = schedule(clock)
+    watch.sync(["quiet", "busy"])
+    watch.due()
+    watch.polled("quiet", 0)
+    watch.polled("busy", 4)
+    clock.now += 1000
+    assert watch.due() == ["busy", "quiet"]
+
+
+def test_jitter_stays_within_bounds(clock):
+    watch = schedule(clock, jitter=0.1)
+    names = [str(n) for n in range(50)]
+    watch.sync(names)
+    watch.due()
+    waits = [watch.polled(name, 0) for name in names]
+    assert all(135 <= wait <= 165 for wait in waits)
+    assert len(set(waits)) > 1
+
+
+def test_failures_back_off_from_min_interval(clock):
+    watch = schedule(clock)
+    watch.sync(["a"])
+    watch.due()
+    assert [watch.failed("a") for _ in range(5)] == pytest.approx([10, 20, 40, 80, 100])
+
+
+def test_removed_accounts_are_forgotten(clock):
+    watch = schedule(clock)
+    watch.sync(["a", "b"])
+    watch.due()
+    assert watch.sync(["b"]) == ([], ["a"])
+    assert watch.polled("a", 1) is None
+    assert len(watch) == 1
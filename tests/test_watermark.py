@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+import pytest
+import requests
+
+from tiktok_dl.cli import stream_account
+from tiktok_dl.logging import Logger
+from tiktok_dl.manifest import DownloadManifest
+from tiktok_dl.models import DiscoveryOutcome, DownloadResult
+from tiktok_dl.services.video_service import PAGE_SIZE, VideoService
+
+# Newest first, the order TikTok lists an account's posts in.
+POSTS = [str(7300000000000000000 + n) for n in range(90, 0, -1)]
+
+
+class PagedVideos(VideoService):
+    """The real page walk over fixed TikWM pages; ``failing`` pages answer like a 429."""
+
+    def __init__(self, manifest: DownloadManifest, posts: list[str], failing: set[int]) -> None:
+        # Nothing listens on port 9, so the yt-dlp source fails at once.
+        super().__init__(requests.Session(), 5, Logger(), manifest, web_base="http://127.0.0.1:9")
+        self.posts = posts
+        self.failing = failing
+
+    def _fetch_page(self, username, page):
+        if page in self.failing:
+            return None
+        start = (page - 1) * PAGE_SIZE
+        return [{"video_id": vid} for vid in self.posts[start:start + PAGE_SIZE]]
+
+
+class RecordingDownloads:
+    def __init__(self, manifest: DownloadManifest, target_dir: Path, fail: set[str] = frozenset()) -> None:
+        self.manifest = manifest
+        self.target_dir = target_dir
+        self.fail = fail
+        self.seen: list[str] = []
+
+    def download_all(self, videos):
+        results = []
+        for index, video in enumerate(videos, start=1):
+            self.seen.append(video.id)
+            ok = video.id not in self.fail
+            if ok:
+                self.manifest.record(video.id, self.target_dir / f"{video.id}.mp4", 2048, None)
+            results.append(DownloadResult(index, video, ok, "downloaded" if ok else "failed", self.target_dir))
+        return results
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    return DownloadManifest.open(tmp_path / "state")
+
+
+def run(manifest, tmp_path, count=None, download_all=False, fail=frozenset(), failing=frozenset(), posts=POSTS):
+    videos = PagedVideos(manifest, posts, set(failing))
+    downloads = RecordingDownloads(manifest, tmp_path, set(fail))
+    args = argparse.Namespace(incremental=True, count=count, download_all=download_all)
+    discovered, results, outcome = stream_account("someone", videos, downloads, args)
+    videos.advance_watermark("someone", discovered, results, outcome)
+    return downloads.seen
+
+
+def test_limited_run_leaves_older_posts_for_later(manifest, tmp_path):
+    assert len(run(manifest, tmp_path, count=5)) == 5
+    assert manifest.watermark("someone") is None
+    assert len(run(manifest, tmp_path, download_all=True)) == 85
+
+
+def test_full_run_moves_watermark_to_newest(manifest, tmp_path):
+    assert len(run(manifest, tmp_path, download_all=True)) == 90
+    assert manifest.watermark("someone").newest_id == POSTS[0]
+    assert run(manifest, tmp_path, download_all=True) == []
+
+
+def test_limit_larger_than_account_counts_as_complete(manifest, tmp_path):
+    run(manifest, tmp_path, count=500)
+    assert manifest.watermark("someone").newest_id == POSTS[0]
+
+
+def test_failed_download_holds_watermark_below_it(manifest, tmp_path):
+    run(manifest, tmp_path, download_all=True, fail={POSTS[10]})
+    assert manifest.watermark("someone").newest_id == POSTS[11]
+    assert run(manifest, tmp_path, download_all=True) == [POSTS[10]]
+
+
+def test_failed_middle_page_leaves_watermark_unchanged(manifest, tmp_path):
+    run(manifest, tmp_path, download_all=True)
+    old_mark = manifest.watermark("someone").newest_id
+    newer = [str(7300000000000000100 + n) for n in range(90, 0, -1)]
+    assert len(run(manifest, tmp_path, download_all=True, failing={2}, posts=newer + POSTS)) == 60
+    assert manifest.watermark("someone").newest_id == old_mark
+    # The next run walks past the downloaded first page to the posts it missed.
+    assert run(manifest, tmp_path, download_all=True, posts=newer + POSTS) == newer[PAGE_SIZE:2 * PAGE_SIZE]
+    assert manifest.watermark("someone").newest_id == newer[0]
+
+
+def test_scan_cut_by_max_pages_is_incomplete(manifest, tmp_path):
+    videos = PagedVideos(manifest, POSTS, set())
+    outcome = DiscoveryOutcome()
+    assert len(videos.discover_videos("someone", max_pages=2, outcome=outcome)) == 60
+    assert outcome.truncated and not outcome.complete
+
+
+def test_posts_already_downloaded_count_toward_the_watermark(manifest, tmp_path):
+    for vid in POSTS:
+        manifest.record(vid, tmp_path / f"{vid}.mp4", 2048, None)
+    assert run(manifest, tmp_path, download_all=True) == []
+    assert manifest.watermark("someone").newest_id == POSTS[0]
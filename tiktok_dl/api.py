@@ -0,0 +1,280 @@
+"""Local REST API: queue download jobs and poll their progress.
+
+    POST /jobs                {"username": "...", "count": 10, "metadata": "json"}
+    GET  /jobs[?status=queued&limit=50]
+    GET  /jobs/<id>
+    POST /jobs/<id>/cancel
+    GET  /health
+    GET  /metrics             Prometheus text format
+"""
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from .exports import RESULT_FORMATS
+from .jobs import JOB_STATUSES, JobStore
+from .logging import Logger
+from .metrics import Metrics
+from .models import Job
+
+MAX_BODY = 64 * 1024
+JOB_PATH = re.compile(r"^/jobs/(?P<id>\d+)(?P<action>/cancel)?$")
+
+
+def parse_job_request(payload: Any) -> Tuple[str, Dict[str, Any]]:
+    """Validate a POST /jobs body; options are keyed like the CLI arguments."""
+    if not isinstance(payload, dict):
+        raise ValueError("body must be a JSON object")
+    username = payload.get("username")
+    if not isinstance(username, str) or not username.strip():
+        raise ValueError("username is required")
+    count = payload.get("count")
+    if count is not None and (not isinstance(count, int) or isinstance(count, bool) or count < 1):
+        raise ValueError("count must be a positive integer")
+    metadata = payload.get("metadata")
+    if metadata not in (None, "json", "csv"):
+        raise ValueError("metadata must be 'json' or 'csv'")
+    results = payload.get("results")
+    if results not in (None, "parquet", *RESULT_FORMATS):
+        raise ValueError(f"results must be one of {', '.join((*RESULT_FORMATS, 'parquet'))}")
+    options = {
+        "count": count,
+        # Without count or all, a job takes the latest 20 like the CLI does.
+        "download_all": bool(payload.get("all", False)),
+        "metadata": metadata,
+        "playlist": bool(payload.get("playlist", False)),
+        "results": results,
+        "incremental": bool(payload.get("incremental", False)),
+    }
+    return username.strip(), options
+
+
+class JobHandle:
+    """A running job plus the callbacks that stop it."""
+
+    def __init__(self, job: Job) -> None:
+        self.job = job
+        self._cancelled = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def on_cancel(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            self._callbacks.append(callback)
+            already = self._cancelled.is_set()
+        if already:
+            callback()
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled.set()
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            callback()
+
+
+class JobRunner:
+    """Claims queued jobs and runs them on a fixed set of threads.
+
+    ``execute`` does the actual work with whatever long-lived services the
+    caller built, so sessions, pools and caches stay warm from one job to
+    the next. Jobs interrupted by a shutdown are left ``running`` and go
+    back to the queue when the next server starts.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        execute: Callable[[JobHandle], None],
+        workers: int,
+        logger: Logger,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.store = store
+        self.execute = execute
+        self.workers = max(1, int(workers))
+        self.logger = logger
+        self.metrics = metrics or Metrics()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._active: Dict[int, JobHandle] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        requeued = self.store.requeue_interrupted()
+        if requeued:
+            self.logger.info(f"Requeued {requeued} job(s) interrupted by the last shutdown.")
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-{number + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        self._wake.set()
+
+    def cancel(self, job_id: int) -> bool:
+        if self.store.cancel(job_id):
+            return True
+        with self._lock:
+            handle = self._active.get(job_id)
+        if not handle:
+            return False
+        handle.cancel()
+        return True
+
+    def close(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+        with self._lock:
+            active = list(self._active.values())
+        for handle in active:
+            handle.cancel()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _worker(self) -> None:
+        while not self._stopping.is_set():
+            job = self.store.claim()
+            if not job:
+                self._wake.wait(1.0)
+                self._wake.clear()
+                continue
+            handle = JobHandle(job)
+            with self._lock:
+                self._active[job.id] = handle
+            self.logger.info(f"Job {job.id}: @{job.username.lstrip('@')} started.")
+            status, error = "done", None
+            try:
+                with self.metrics.phase("job", job=job.id):
+                    self.execute(handle)
+                if handle.cancelled:
+                    status = "cancelled"
+            except Exception as exc:
+                status, error = "failed", str(exc)
+                self.logger.error(f"Job {job.id} failed: {exc}")
+            finally:
+                with self._lock:
+                    self._active.pop(job.id, None)
+            if self._stopping.is_set():
+                # Left as running: requeued and resumed on the next start.
+                return
+            self.store.finish(job.id, status, error)
+            self.metrics.incr("jobs_total", status=status)
+            self.logger.info(f"Job {job.id}: {status}.")
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "ApiServer"
+
+    def log_message(self, *args) -> None:
+        pass
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _json(self, status: int, payload: Any) -> None:
+        self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _error(self, status: int, message: str) -> None:
+        self._json(status, {"error": message})
+
+    def _read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_BODY:
+            raise ValueError("request body too large")
+        raw = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(raw or b"null")
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"invalid JSON: {exc.msg}") from exc
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        store = self.server.store
+        if url.path == "/health":
+            self._json(200, {"status": "ok", "jobs": store.counts()})
+        elif url.path == "/metrics":
+            body = self.server.metrics.render_prometheus().encode("utf-8")
+            self._send(200, body, "text/plain; version=0.0.4")
+        elif url.path == "/jobs":
+            query = {k: v[0] for k, v in parse_qs(url.query).items()}
+            status = query.get("status")
+            if status and status not in JOB_STATUSES:
+                self._error(400, f"status must be one of {', '.join(JOB_STATUSES)}")
+                return
+            try:
+                limit = max(1, min(int(query.get("limit", 50)), 1000))
+            except ValueError:
+                self._error(400, "limit must be an integer")
+                return
+            self._json(200, {"jobs": [asdict(job) for job in store.list(status, limit)]})
+        else:
+            match = JOB_PATH.match(url.path)
+            job = store.get(int(match.group("id"))) if match and not match.group("action") else None
+            if job:
+                self._json(200, asdict(job))
+            else:
+                self._error(404, "not found")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        store = self.server.store
+        try:
+            payload = self._read_json()
+        except ValueError as exc:
+            self._error(400, str(exc))
+            return
+        if url.path == "/jobs":
+            try:
+                username, options = parse_job_request(payload)
+            except ValueError as exc:
+                self._error(400, str(exc))
+                return
+            job = store.submit(username, options)
+            self.server.runner.notify()
+            self._json(201, asdict(job))
+            return
+        match = JOB_PATH.match(url.path)
+        if not match or not match.group("action"):
+            self._error(404, "not found")
+            return
+        job_id = int(match.group("id"))
+        if not store.get(job_id):
+            self._error(404, "not found")
+        elif self.server.runner.cancel(job_id):
+            self._json(200, asdict(store.get(job_id)))
+        else:
+            self._error(409, "job already finished")
+
+
+class ApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        store: JobStore,
+        runner: JobRunner,
+        metrics: Metrics,
+    ) -> None:
+        super().__init__(address, ApiHandler)
+        self.store = store
+        self.runner = runner
+        self.metrics = metrics
@@ -0,0 +1,100 @@
+"""Chunked and streaming checksum helpers."""
+from __future__ import annotations
+
+import hashlib
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+CHECKSUM_ALGORITHMS = ("sha256", "blake2b")
+DEFAULT_ALGORITHM = "sha256"
+CHUNK_SIZE = 1024 * 1024
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM) -> Any:
+    if algorithm not in CHECKSUM_ALGORITHMS:
+        raise ValueError(f"Unsupported checksum algorithm: {algorithm}")
+    return hashlib.new(algorithm)
+
+
+def hash_file(path: Path, algorithm: str = DEFAULT_ALGORITHM, chunk_size: int = CHUNK_SIZE) -> str:
+    hasher = new_hasher(algorithm)
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def checksum_path(target: Path, algorithm: str = DEFAULT_ALGORITHM) -> Path:
+    return target.with_suffix(target.suffix + f".{algorithm}")
+
+
+def write_checksum(target: Path, digest: str, algorithm: str = DEFAULT_ALGORITHM) -> Path:
+    sidecar = checksum_path(target, algorithm)
+    tmp = sidecar.with_name(sidecar.name + ".tmp")
+    tmp.write_text(digest, encoding="utf-8")
+    os.replace(tmp, sidecar)
+    return sidecar
+
+
+class ProgressHasher:
+    """yt-dlp progress hook that hashes the partial file while it grows.
+
+    Each progress event reads only the bytes appended since the previous
+    event, which are still in the page cache, so the finished file never
+    needs a second full pass and memory stays at one chunk.
+    """
+
+    def __init__(self, algorithm: str = DEFAULT_ALGORITHM, chunk_size: int = CHUNK_SIZE) -> None:
+        self.algorithm = algorithm
+        self.chunk_size = chunk_size
+        self.elapsed = 0.0
+        self._reset(None)
+
+    def _reset(self, path: Optional[Path]) -> None:
+        self._hasher = new_hasher(self.algorithm)
+        self._path = path
+        self.offset = 0
+
+    def _consume(self, path: Path, limit: Optional[int] = None) -> None:
+        started = time.perf_counter()
+        try:
+            with path.open("rb") as fh:
+                fh.seek(self.offset)
+                while limit is None or self.offset < limit:
+                    size = self.chunk_size
+                    if limit is not None:
+                        size = min(size, limit - self.offset)
+                    chunk = fh.read(size)
+                    if not chunk:
+                        break
+                    self._hasher.update(chunk)
+                    self.offset += len(chunk)
+        except OSError:
+            pass
+        self.elapsed += time.perf_counter() - started
+
+    def __call__(self, status: Dict[str, Any]) -> None:
+        if status.get("status") != "downloading":
+            return
+        name = status.get("tmpfilename") or status.get("filename")
+        if not name:
+            return
+        path = Path(name)
+        downloaded = status.get("downloaded_bytes") or 0
+        if path != self._path or downloaded < self.offset:
+            # A new file or a restarted transfer: start over.
+            self._reset(path)
+        self._consume(path, downloaded)
+
+    def hexdigest(self, final: Path) -> str:
+        """Hash whatever was not seen during the transfer and return the digest."""
+        try:
+            size = final.stat().st_size
+        except OSError:
+            size = 0
+        if size < self.offset:
+            self._reset(final)
+        self._consume(final)
+        return self._hasher.hexdigest()
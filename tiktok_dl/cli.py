@@ -2,25 +2,52 @@ from __future__ import annotations
 
 import argparse
 import csv
+import itertools
 import json
+import signal
 import sys
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from dataclasses import asdict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Iterable, List
+from typing import Iterable, Iterator, List, Tuple
 
 import requests
 
+from .api import ApiServer, JobHandle, JobRunner
+from .checksums import CHECKSUM_ALGORITHMS
 from .config import Settings
+from .direct import DirectDownloader
+from .exports import ResultExporter, write_parquet
 from .http import build_session
+from .http_cache import ResponseCache
+from .jobs import JobStore
+from .journal import DownloadJournal
+from .leases import ACCOUNT, LeaseStore
 from .logging import Logger
-from .models import VideoItem
-from .services.download_service import DownloadService
+from .manifest import DownloadManifest
+from .media_store import MediaStore
+from .metrics import Metrics
+from .models import DiscoveryOutcome, DownloadResult, VideoItem
+from .ratelimit import API_HOST, MEDIA_HOST, AdaptiveRateLimiter
+from .services.download_service import DownloadService, ydl_options
 from .services.profile_service import ProfileService
+from .services.scheduler import DownloadScheduler
+from .services.thumbnail_service import ThumbnailService
+from .services.verify_service import VerifyCache, VerifyService
 from .services.video_service import VideoService
+from .services.watcher import WatchSchedule
 from .theme import Theme
 from .ui import banners, prompts, summaries
-from .utils import fetch_ip_metadata
+from .ui.progress import ProgressRenderer
+from .utils import IP_CACHE_FILENAME, IpLookup
+from .ytdl import ProcessYoutubeDLPool, YoutubeDLPool
+
+# Seconds between looks at the watchlist file in --watch mode.
+WATCHLIST_CHECK = 30.0
 
 
 def parse_args() -> argparse.Namespace:
@@ -34,32 +61,133 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("-d", "--download-dir", help="Custom download directory")
     parser.add_argument("--proxy", help="HTTP/HTTPS proxy")
     parser.add_argument("--max-workers", type=int, help="Max simultaneous downloads")
+    parser.add_argument(
+        "--window",
+        type=int,
+        help="Max downloads queued or running per account; unset means twice --max-workers",
+    )
+    parser.add_argument(
+        "--max-failures",
+        type=int,
+        help="Stop an account after this many failed downloads in a row (0 = never)",
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        help="Run yt-dlp in this many worker processes, splitting --max-workers between them "
+        "(0 = threads in this process). Experimental: not shown to be faster than threads",
+    )
+    parser.add_argument(
+        "--account-concurrency",
+        type=int,
+        help="Accounts discovered in parallel when downloading a watchlist with --yes",
+    )
+    parser.add_argument(
+        "--discovery-concurrency",
+        type=int,
+        help="TikWM listing pages fetched in parallel per account",
+    )
     parser.add_argument("--request-timeout", type=int, help="Network timeout seconds")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the on-disk API response cache")
     parser.add_argument("--quick", action="store_true", help="Quick mode (less shell coloring)")
     parser.add_argument("--privacy", action="store_true", help="Suppress IP information in banners")
     parser.add_argument("--metadata", choices=["json", "csv"], help="Export metadata alongside downloads")
+    parser.add_argument(
+        "--results",
+        choices=["ndjson", "csv", "parquet"],
+        help="Append one row per finished download to results.<format> in the run folder "
+        "as it happens (parquet needs pyarrow)",
+    )
     parser.add_argument("--thumbnails", action="store_true", help="Download thumbnails for each video")
     parser.add_argument("--playlist", action="store_true", help="Export playlist file (.m3u) with video URLs")
-    parser.add_argument("--rate-limit", type=int, help="Maximum downloads per minute")
+    parser.add_argument(
+        "--rate-limit",
+        type=int,
+        help="Starting media downloads per minute; adapts to 403/429 responses",
+    )
+    parser.add_argument(
+        "--no-manifest",
+        action="store_true",
+        help="Ignore the download manifest and fetch every video again",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only discover videos posted since the last successful run",
+    )
     parser.add_argument("--schedule", help="Defer run until HH:MM (24 hour)")
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and poll each --watchlist/--username account for new posts",
+    )
+    parser.add_argument(
+        "--watch-interval",
+        type=float,
+        help="Starting seconds between polls of an account; adapts to how often it posts",
+    )
     parser.add_argument("--watchlist", help="Path to file containing one username per line")
     parser.add_argument("--self-check", action="store_true", help="Run environment diagnostics and exit")
     parser.add_argument("--verify", action="store_true", help="Verify existing checksum files and exit")
+    parser.add_argument(
+        "--verify-max-age",
+        type=float,
+        default=7.0,
+        help="Skip files verified unchanged within this many days (0 re-hashes everything)",
+    )
+    parser.add_argument("--checksum", choices=CHECKSUM_ALGORITHMS, help="Checksum algorithm for new downloads")
+    parser.add_argument(
+        "--store",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Keep each video once in a shared store and hardlink it into run folders",
+    )
+    parser.add_argument(
+        "--direct",
+        action=argparse.BooleanOptionalAction,
+        default=None,
+        help="Fetch media straight from the URL discovery returned, falling back to yt-dlp",
+    )
+    parser.add_argument("--gc", action="store_true", help="Delete stored videos no run folder links to and exit")
+    parser.add_argument("--dry-run", action="store_true", help="With --gc, only report what would be deleted")
+    parser.add_argument("--metrics-jsonl", help="Append per-phase and per-video events to this JSON-lines file")
+    parser.add_argument("--metrics-textfile", help="Write run totals to this Prometheus textfile (.prom)")
+    parser.add_argument(
+        "--no-progress",
+        action="store_true",
+        help="Print every log line as it happens instead of a live progress display",
+    )
     parser.add_argument("--yes", action="store_true", help="Auto-confirm prompts in CLI mode")
-    parser.add_argument("--api", action="store_true", help="Reserved for future REST API mode")
+    parser.add_argument(
+        "--worker",
+        action="store_true",
+        help=(
+            "Share the accounts with other --worker processes that use the same "
+            "download directory (also across machines on a shared volume)"
+        ),
+    )
+    parser.add_argument("--api", action="store_true", help="Serve a local REST API that queues download jobs")
+    parser.add_argument("--api-host", default="127.0.0.1", help="Address for --api to listen on")
+    parser.add_argument("--api-port", type=int, default=8765, help="Port for --api to listen on")
     return parser.parse_args()
 
 
 def run_self_check(logger: Logger) -> None:
+    import importlib.metadata  # noqa: PLC0415
+    import importlib.util  # noqa: PLC0415
+
     logger.info(f"Python version: {sys.version.split()[0]}")
-    dependencies = ["requests", "yt_dlp", "tqdm"]
-    for dep in dependencies:
+    # Read versions from package metadata; importing yt_dlp alone costs ~100 ms.
+    dependencies = {"requests": "requests", "yt_dlp": "yt-dlp", "tqdm": "tqdm"}
+    for dep, distribution in dependencies.items():
+        if importlib.util.find_spec(dep) is None:
+            logger.error(f"Dependency {dep} missing: No module named '{dep}'")
+            continue
         try:
-            module = __import__(dep)
-            version = getattr(module, "__version__", "unknown")
-            logger.success(f"Dependency {dep} available (version {version})")
-        except Exception as exc:
-            logger.error(f"Dependency {dep} missing: {exc}")
+            version = importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            version = "unknown"
+        logger.success(f"Dependency {dep} available (version {version})")
     color_support = sys.stdout.isatty()
     logger.info(f"TTY color support: {color_support}")
 
@@ -86,11 +214,13 @@ def parse_schedule(spec: str, logger: Logger) -> None:
 def export_metadata(videos: Iterable[VideoItem], target: Path, fmt: str) -> Path:
     target.parent.mkdir(parents=True, exist_ok=True)
     if fmt == "json":
-        payload = [video.__dict__ for video in videos]
-        target.write_text(
-            json.dumps(payload, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+        # Written item by item rather than dumped as one list.
+        with target.open("w", encoding="utf-8") as fh:
+            fh.write("[")
+            for count, video in enumerate(videos):
+                fh.write(",\n  " if count else "\n  ")
+                fh.write(json.dumps(asdict(video), ensure_ascii=False))
+            fh.write("\n]\n")
     else:
         with target.open("w", newline="", encoding="utf-8") as fh:
             writer = csv.writer(fh)
@@ -112,49 +242,159 @@ def export_playlist(videos: Iterable[VideoItem], target: Path) -> Path:
     return target
 
 
-def download_thumbnails(
-    session: requests.Session,
-    videos: Iterable[VideoItem],
-    target_dir: Path,
-    logger: Logger,
-    timeout: int,
+def verify_checksums(
+    settings: Settings, logger: Logger, max_age_days: float = 7.0
 ) -> None:
-    thumb_dir = target_dir / "thumbnails"
-    thumb_dir.mkdir(parents=True, exist_ok=True)
-    for video in videos:
-        if not video.thumbnail_url:
-            continue
-        filename = thumb_dir / f"{video.id}.jpg"
-        if filename.exists():
-            continue
+    cache = None
+    if max_age_days > 0:
         try:
-            resp = session.get(video.thumbnail_url, timeout=timeout)
-            if resp.status_code == 200:
-                filename.write_bytes(resp.content)
-                logger.success(f"Saved thumbnail {filename.name}")
+            cache = VerifyCache.open(settings.state_dir)
         except Exception as exc:
-            logger.warn(f"Failed to download thumbnail for {video.id}: {exc}")
+            logger.warn(f"Verification cache unavailable, hashing everything: {exc}")
+    service = VerifyService(
+        settings.download_dir,
+        logger,
+        max_workers=settings.max_workers,
+        cache=cache,
+        max_age=max_age_days * 86400,
+    )
+    report = service.run()
+    summaries.print_verify_report(report, logger)
 
 
-def verify_checksums(root: Path, logger: Logger) -> None:
-    import hashlib
+def collect_garbage(settings: Settings, logger: Logger, dry_run: bool = False) -> None:
+    store = MediaStore.open(settings.state_dir)
+    manifest = DownloadManifest.open(settings.state_dir)
+    try:
+        report = store.gc(settings.download_dir, manifest, logger, dry_run=dry_run)
+    finally:
+        manifest.close()
+    verb = "Would remove" if dry_run else "Removed"
+    logger.success(
+        f"{verb} {report.removed} of {report.scanned} stored video(s), "
+        f"{report.bytes_freed / 1e6:.1f} MB."
+    )
 
-    issues = 0
-    for sha_path in root.rglob("*.sha256"):
-        target = sha_path.with_suffix("")
-        if not target.exists():
-            logger.warn(f"Missing referenced file for {sha_path}")
-            issues += 1
-            continue
-        expected = sha_path.read_text(encoding="utf-8").strip()
-        digest = hashlib.sha256(target.read_bytes()).hexdigest()
-        if expected != digest:
-            logger.error(f"Checksum mismatch: {target}")
-            issues += 1
-    if issues == 0:
-        logger.success("All checksum files verified successfully.")
-    else:
-        logger.warn(f"Verification completed with {issues} issue(s).")
+
+def open_store(settings: Settings, logger: Logger) -> MediaStore | None:
+    if not settings.content_store:
+        return None
+    try:
+        return MediaStore.open(settings.state_dir)
+    except OSError as exc:
+        logger.warn(f"Media store unavailable, saving videos directly: {exc}")
+        return None
+
+
+def open_manifest(
+    settings: Settings, args: argparse.Namespace, logger: Logger
+) -> DownloadManifest | None:
+    if args.no_manifest:
+        return None
+    try:
+        return DownloadManifest.open(settings.state_dir)
+    except Exception as exc:
+        logger.warn(f"Download manifest unavailable, continuing without it: {exc}")
+        return None
+
+
+def open_journal(settings: Settings, logger: Logger) -> DownloadJournal | None:
+    try:
+        return DownloadJournal.open(settings.state_dir)
+    except OSError as exc:
+        logger.warn(f"Partial-download journal unavailable, downloads will not resume: {exc}")
+        return None
+
+
+def open_ydl_pool(settings: Settings) -> YoutubeDLPool | ProcessYoutubeDLPool:
+    opts = ydl_options(settings.proxy)
+    if not settings.download_processes:
+        return YoutubeDLPool(opts)
+    processes = min(settings.download_processes, settings.max_workers)
+    # Every download thread gets a slot: ceil(max_workers / processes) each.
+    return ProcessYoutubeDLPool(opts, processes, -(-settings.max_workers // processes))
+
+
+def open_direct(settings: Settings, session: requests.Session) -> DirectDownloader | None:
+    if not settings.direct_download:
+        return None
+    return DirectDownloader(session, settings.request_timeout)
+
+
+def open_leases(settings: Settings, logger: Logger) -> LeaseStore | None:
+    try:
+        return LeaseStore.open(settings.state_dir, settings.lease_ttl, logger)
+    except Exception as exc:
+        logger.error(f"Lease store unavailable, cannot run as a worker: {exc}")
+        return None
+
+
+def report_partials(settings: Settings, logger: Logger, max_age_days: float = 7.0) -> None:
+    journal = open_journal(settings, logger)
+    if not journal:
+        return
+    pruned = journal.prune(max_age_days * 86400)
+    if pruned:
+        logger.info(f"Discarded {pruned} partial download(s) older than {max_age_days:g} days.")
+    pending = journal.pending()
+    if pending:
+        logger.info(f"{len(pending)} interrupted download(s) will resume when their videos come up.")
+
+
+def open_metrics(settings: Settings, logger: Logger) -> Metrics:
+    jsonl = Path(settings.metrics_jsonl).expanduser() if settings.metrics_jsonl else None
+    textfile = Path(settings.metrics_textfile).expanduser() if settings.metrics_textfile else None
+    try:
+        return Metrics(jsonl, textfile)
+    except OSError as exc:
+        logger.warn(f"Metrics log unavailable, continuing without it: {exc}")
+        return Metrics(textfile_path=textfile)
+
+
+def open_ip_lookup(
+    settings: Settings, args: argparse.Namespace, session: requests.Session
+) -> IpLookup | None:
+    if args.privacy:
+        return None
+    return IpLookup(session, settings.request_timeout, settings.state_dir / IP_CACHE_FILENAME)
+
+
+def open_progress(args: argparse.Namespace, logger: Logger) -> ProgressRenderer | None:
+    if args.no_progress:
+        return None
+    return ProgressRenderer(logger)
+
+
+def build_rate_limiter(
+    settings: Settings, args: argparse.Namespace, logger: Logger
+) -> AdaptiveRateLimiter:
+    return AdaptiveRateLimiter(
+        {MEDIA_HOST: args.rate_limit, API_HOST: settings.api_rate_per_minute},
+        logger,
+    )
+
+
+def open_session(
+    settings: Settings,
+    args: argparse.Namespace,
+    logger: Logger,
+    rate_limiter: AdaptiveRateLimiter,
+    metrics: Metrics | None = None,
+) -> requests.Session:
+    cache = None
+    if not args.no_cache and settings.http_cache_mb > 0:
+        try:
+            cache = ResponseCache.open(settings.state_dir, settings.http_cache_mb)
+        except Exception as exc:
+            logger.warn(f"Response cache unavailable, continuing without it: {exc}")
+    return build_session(
+        settings.proxy,
+        cache,
+        settings.http_cache_ttl,
+        rate_limiter,
+        settings.connection_pool_size,
+        metrics,
+    )
 
 
 def resolve_username(raw: str, profile_service: ProfileService) -> str:
@@ -170,134 +410,562 @@ def choose_subset(total: int, desired: int | None, download_all: bool) -> int:
     return min(total, desired)
 
 
+def subset_limit(desired: int | None, download_all: bool) -> int | None:
+    if download_all:
+        return None
+    if desired is None or desired <= 0:
+        return 20
+    return desired
+
+
+def build_download_service(
+    settings: Settings,
+    args: argparse.Namespace,
+    username: str,
+    manifest: DownloadManifest | None,
+    logger: Logger,
+    ydl_pool: YoutubeDLPool | ProcessYoutubeDLPool | None = None,
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    metrics: Metrics | None = None,
+    progress: ProgressRenderer | None = None,
+    leases: LeaseStore | None = None,
+    direct: DirectDownloader | None = None,
+) -> DownloadService:
+    service = DownloadService(
+        base_dir=settings.download_dir,
+        username=username,
+        max_workers=settings.max_workers,
+        proxy=settings.proxy,
+        logger=logger,
+        rate_limit=args.rate_limit,
+        manifest=manifest,
+        checksum_algorithm=settings.checksum_algorithm,
+        ydl_pool=ydl_pool,
+        rate_limiter=rate_limiter,
+        journal=open_journal(settings, logger),
+        store=open_store(settings, logger),
+        window=settings.download_window,
+        max_consecutive_failures=settings.max_consecutive_failures,
+        metrics=metrics,
+        progress=progress,
+        leases=leases,
+        direct=direct,
+    )
+    # The run folder name is only known once the service exists.
+    service.exporter = open_results(args, service.target_dir, settings.checksum_algorithm)
+    return service
+
+
+def open_results(
+    args: argparse.Namespace, target_dir: Path, algorithm: str
+) -> ResultExporter | None:
+    if not args.results:
+        return None
+    # Parquet cannot be appended row by row: stream NDJSON and convert at the end.
+    fmt = "ndjson" if args.results == "parquet" else args.results
+    return ResultExporter(target_dir / f"results.{fmt}", fmt, algorithm)
+
+
+def finish_results(
+    download_service: DownloadService, args: argparse.Namespace, logger: Logger
+) -> None:
+    exporter = download_service.exporter
+    if not exporter:
+        return
+    exporter.close()
+    if not exporter.rows:
+        return
+    logger.info(f"Results saved to {exporter.path}")
+    if args.results == "parquet":
+        try:
+            columnar = write_parquet(exporter.path, exporter.path.with_suffix(".parquet"))
+        except ImportError:
+            logger.warn("Parquet export needs pyarrow (pip install pyarrow); kept NDJSON only.")
+        except Exception as exc:
+            logger.warn(f"Parquet export failed, kept NDJSON only: {exc}")
+        else:
+            logger.info(f"Columnar results saved to {columnar}")
+
+
+def open_thumbnails(
+    settings: Settings,
+    args: argparse.Namespace,
+    session: requests.Session,
+    manifest: DownloadManifest | None,
+    logger: Logger,
+    metrics: Metrics | None = None,
+) -> ThumbnailService | None:
+    if not args.thumbnails:
+        return None
+    return ThumbnailService(
+        session, settings.request_timeout, logger, manifest, settings.max_workers, metrics
+    )
+
+
+def export_extras(
+    subset: List[VideoItem],
+    download_service: DownloadService,
+    args: argparse.Namespace,
+    logger: Logger,
+) -> None:
+    finish_results(download_service, args, logger)
+
+    if args.metadata:
+        metadata_path = download_service.target_dir / f"metadata.{args.metadata}"
+        export_metadata(subset, metadata_path, args.metadata)
+        logger.info(f"Metadata saved to {metadata_path}")
+
+    if args.playlist:
+        playlist_path = download_service.target_dir / "playlist.m3u"
+        export_playlist(subset, playlist_path)
+        logger.info(f"Playlist exported to {playlist_path}")
+
+
+def stream_account(
+    username: str,
+    video_service: VideoService,
+    download_service: DownloadService,
+    args: argparse.Namespace,
+    scheduler: DownloadScheduler | None = None,
+    thumbnails: ThumbnailService | None = None,
+) -> Tuple[List[VideoItem], List[DownloadResult], DiscoveryOutcome]:
+    """Download videos while discovery is still paging through the account.
+
+    Also returns the discovery outcome, marked truncated when ``--count``
+    cut discovery short: older posts were never seen and the watermark
+    must stay put.
+    """
+    discovered: List[VideoItem] = []
+    limit = subset_limit(args.count, args.download_all)
+    outcome = DiscoveryOutcome()
+    stream = itertools.islice(
+        video_service.iter_videos(username, incremental=args.incremental, outcome=outcome), limit
+    )
+    exhausted = False
+
+    def tracked() -> Iterator[VideoItem]:
+        nonlocal exhausted
+        for video in stream:
+            discovered.append(video)
+            if thumbnails:
+                thumbnails.submit(video, download_service.target_dir)
+            yield video
+        # Not reached when the downloads stop pulling early (cancel, Ctrl-C).
+        exhausted = limit is None or len(discovered) < limit
+
+    if scheduler:
+        results = scheduler.download_all(download_service, tracked())
+    else:
+        results = download_service.download_all(tracked())
+    if not exhausted:
+        outcome.truncated = True
+    return discovered, results, outcome
+
+
 def run_batch(
     usernames: List[str],
     settings: Settings,
     args: argparse.Namespace,
     session: requests.Session,
     logger: Logger,
+    rate_limiter: AdaptiveRateLimiter | None = None,
+    metrics: Metrics | None = None,
+    leases: LeaseStore | None = None,
 ) -> None:
-    profile_service = ProfileService(session, settings.request_timeout, logger)
-    video_service = VideoService(session, settings.request_timeout, logger)
+    """Process many accounts at once on a single shared download pool.
 
-    for raw_name in usernames:
+    With ``leases`` the accounts are shared with other workers: each one is
+    leased before it is processed, so concurrent workers split the list.
+    """
+    rate_limiter = rate_limiter or build_rate_limiter(settings, args, logger)
+    profile_service = ProfileService(session, settings.request_timeout, logger, metrics=metrics)
+    manifest = open_manifest(settings, args, logger)
+    video_service = VideoService(
+        session,
+        settings.request_timeout,
+        logger,
+        manifest,
+        rate_limiter,
+        page_concurrency=settings.discovery_concurrency,
+        metrics=metrics,
+    )
+    ydl_pool = open_ydl_pool(settings)
+    direct = open_direct(settings, session)
+    thumbnails = open_thumbnails(settings, args, session, manifest, logger, metrics)
+    progress = open_progress(args, logger)
+    output_lock = threading.Lock()
+
+    def process(raw_name: str) -> None:
         name = raw_name.strip()
         if not name:
-            continue
+            return
         username = resolve_username(name, profile_service)
         profile = profile_service.fetch_profile(username)
-        summaries.print_profile(profile, logger)
-        videos = video_service.discover_videos(username)
+        with output_lock:
+            summaries.print_profile(profile, logger)
+        download_service = build_download_service(
+            settings,
+            args,
+            username,
+            manifest,
+            logger,
+            ydl_pool,
+            rate_limiter,
+            metrics,
+            progress,
+            leases,
+            direct,
+        )
+        videos, results, outcome = stream_account(
+            username, video_service, download_service, args, scheduler, thumbnails
+        )
+        # Even with nothing new, posts found already downloaded can move the mark.
+        video_service.advance_watermark(username, videos, results, outcome)
         if not videos:
             logger.warn(f"No videos for {username}")
-            continue
-        count = choose_subset(len(videos), args.count, args.download_all)
-        download_service = DownloadService(
-            base_dir=settings.download_dir,
-            username=username,
-            max_workers=settings.max_workers,
-            proxy=settings.proxy,
-            logger=logger,
-            rate_limit=args.rate_limit,
-        )
-        subset = videos[:count]
-        results = download_service.download_all(subset)
-        summaries.print_results(results, logger)
-
-        if args.metadata:
-            metadata_path = download_service.target_dir / f"metadata.{args.metadata}"
-            export_metadata(subset, metadata_path, args.metadata)
-            logger.info(f"Metadata saved to {metadata_path}")
-
-        if args.playlist:
-            playlist_path = download_service.target_dir / "playlist.m3u"
-            export_playlist(subset, playlist_path)
-            logger.info(f"Playlist exported to {playlist_path}")
-
-        if args.thumbnails:
-            download_thumbnails(
-                session,
-                subset,
-                download_service.target_dir,
-                logger,
-                settings.request_timeout,
-            )
+            return
+        with output_lock:
+            summaries.print_results(results, logger)
+        export_extras(videos, download_service, args, logger)
 
+    def work_leased() -> None:
+        while not scheduler.cancelled:
+            name = leases.acquire(ACCOUNT)
+            if name is None:
+                return
+            try:
+                process(name)
+            except Exception as exc:
+                leases.release(ACCOUNT, name)
+                logger.error(f"Account {name} failed: {exc}")
+            else:
+                leases.complete(ACCOUNT, name, keep_for=settings.worker_round)
 
-def run_interactive(settings: Settings, logger: Logger, args: argparse.Namespace) -> None:
-    session = build_session(settings.proxy)
-    ip_info = None if args.privacy else fetch_ip_metadata(session, settings.request_timeout)
-    profile_service = ProfileService(session, settings.request_timeout, logger)
-    video_service = VideoService(session, settings.request_timeout, logger)
+    scheduler = DownloadScheduler(settings.max_workers, logger, metrics=metrics)
+    try:
+        with progress or nullcontext(), scheduler, ThreadPoolExecutor(
+            max_workers=settings.account_concurrency
+        ) as accounts:
+            if leases:
+                leases.seed(ACCOUNT, [name.strip() for name in usernames if name.strip()])
+                futures = {
+                    accounts.submit(work_leased): f"worker {number + 1}"
+                    for number in range(settings.account_concurrency)
+                }
+            else:
+                futures = {accounts.submit(process, name): name for name in usernames}
+            try:
+                for future, name in futures.items():
+                    try:
+                        future.result()
+                    except Exception as exc:
+                        logger.error(f"Account {name.strip()} failed: {exc}")
+            except KeyboardInterrupt:
+                # Cancel before leaving the block, which waits for the account threads.
+                accounts.shutdown(wait=False, cancel_futures=True)
+                scheduler.cancel()
+                raise
+    finally:
+        ydl_pool.close()
+        if thumbnails:
+            thumbnails.close()
 
-    while True:
-        banners.print_banner(ip_info)
-        raw_username = prompts.ask_username()
-        if not raw_username:
-            logger.warn("Empty username, exiting interactive mode.")
-            return
-        username = resolve_username(raw_username, profile_service)
-        profile = profile_service.fetch_profile(username)
-        summaries.print_profile(profile, logger)
 
-        videos = video_service.discover_videos(username)
-        if not videos:
-            logger.error("No videos available. Try another account.")
-            continue
+def read_watchlist(path: Path) -> List[str]:
+    return [line.strip() for line in path.read_text(encoding="utf-8").splitlines()]
 
-        selection = prompts.ask_video_count(len(videos))
-        if selection.lower() == "all":
-            count = len(videos)
-        else:
+
+def run_watch(
+    settings: Settings, args: argparse.Namespace, logger: Logger, metrics: Metrics
+) -> None:
+    """Poll the watched accounts on their own schedules until stopped.
+
+    Sessions, yt-dlp instances, caches and the download pool live for the
+    whole watch, and the watchlist file is re-read whenever it changes.
+    """
+    watchlist = Path(args.watchlist) if args.watchlist else None
+    # A cached listing would hide new posts until it expired.
+    settings.http_cache_ttl["posts"] = 0
+    watch_args = argparse.Namespace(
+        **{**vars(args), "incremental": True, "download_all": args.count is None}
+    )
+    rate_limiter = build_rate_limiter(settings, args, logger)
+    session = open_session(settings, args, logger, rate_limiter, metrics)
+    profile_service = ProfileService(session, settings.request_timeout, logger, metrics=metrics)
+    manifest = open_manifest(settings, args, logger)
+    video_service = VideoService(
+        session,
+        settings.request_timeout,
+        logger,
+        manifest,
+        rate_limiter,
+        page_concurrency=settings.discovery_concurrency,
+        metrics=metrics,
+    )
+    ydl_pool = open_ydl_pool(settings)
+    direct = open_direct(settings, session)
+    thumbnails = open_thumbnails(settings, args, session, manifest, logger, metrics)
+    scheduler = DownloadScheduler(settings.max_workers, logger, metrics=metrics)
+    schedule = WatchSchedule(
+        settings.watch_interval,
+        settings.watch_min_interval,
+        settings.watch_max_interval,
+        settings.watch_jitter,
+    )
+    output_lock = threading.Lock()
+    stop = threading.Event()
+    watchlist_mtime: int | None = None
+    synced = False
+
+    def reload() -> None:
+        nonlocal watchlist_mtime, synced
+        names: List[str] = []
+        if watchlist:
             try:
-                count = max(1, min(int(selection), len(videos)))
-            except ValueError:
-                count = min(20, len(videos))
-                logger.warn("Invalid input, defaulting to 20 videos.")
-
-        download_service = DownloadService(
-            base_dir=settings.download_dir,
-            username=username,
-            max_workers=settings.max_workers,
-            proxy=settings.proxy,
-            logger=logger,
-            rate_limit=args.rate_limit,
+                mtime = watchlist.stat().st_mtime_ns
+                if mtime == watchlist_mtime:
+                    return
+                names = read_watchlist(watchlist)
+            except OSError as exc:
+                if watchlist_mtime is not None:
+                    logger.warn(f"Cannot read watchlist, keeping the current accounts: {exc}")
+                    watchlist_mtime = None
+                if synced:
+                    return
+                logger.error(f"Cannot read watchlist {watchlist}: {exc}")
+            else:
+                watchlist_mtime = mtime
+        if args.username:
+            names.append(args.username)
+        added, removed = schedule.sync(names)
+        synced = True
+        if added:
+            logger.info(f"Watching {', '.join(added)}.")
+        if removed:
+            logger.info(f"No longer watching {', '.join(removed)}.")
+        if not len(schedule):
+            logger.error("The watchlist is empty; waiting for accounts.")
+
+    def poll(name: str) -> int:
+        username = resolve_username(name, profile_service)
+        download_service = build_download_service(
+            settings, watch_args, username, manifest, logger, ydl_pool, rate_limiter, metrics, direct=direct
+        )
+        videos, results, outcome = stream_account(
+            username, video_service, download_service, watch_args, scheduler, thumbnails
         )
+        video_service.advance_watermark(username, videos, results, outcome)
+        if videos:
+            with output_lock:
+                summaries.print_results(results, logger)
+            export_extras(videos, download_service, watch_args, logger)
+        return len(videos)
 
-        if prompts.confirm_start(count, str(download_service.target_dir)):
-            subset = videos[:count]
-            results = download_service.download_all(subset)
-            summaries.print_results(results, logger)
-            if args.metadata:
-                metadata_path = download_service.target_dir / f"metadata.{args.metadata}"
-                export_metadata(subset, metadata_path, args.metadata)
-                logger.info(f"Metadata saved to {metadata_path}")
-            if args.playlist:
-                playlist_path = download_service.target_dir / "playlist.m3u"
-                export_playlist(subset, playlist_path)
-                logger.info(f"Playlist exported to {playlist_path}")
-            if args.thumbnails:
-                download_thumbnails(
-                    session,
-                    subset,
-                    download_service.target_dir,
-                    logger,
-                    settings.request_timeout,
-                )
-        else:
-            logger.info("Cancelled by user.")
+    def request_stop(*_) -> None:
+        stop.set()
+        # In-flight downloads keep their partials and resume on the next poll.
+        scheduler.cancel()
+
+    signal.signal(signal.SIGTERM, request_stop)
+    running: dict[Future, str] = {}
+    try:
+        with scheduler, ThreadPoolExecutor(
+            max_workers=settings.account_concurrency, thread_name_prefix="watch"
+        ) as accounts:
+            try:
+                while not stop.is_set():
+                    reload()
+                    for name in schedule.due():
+                        running[accounts.submit(poll, name)] = name
+                    # Wake for the next due account, or to look at the watchlist again.
+                    pending = schedule.seconds_until_next()
+                    timeout = WATCHLIST_CHECK if pending is None else min(pending, WATCHLIST_CHECK)
+                    if not running:
+                        stop.wait(timeout)
+                        continue
+                    done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        if stop.is_set():
+                            continue
+                        try:
+                            found = future.result()
+                        except Exception as exc:
+                            retry = schedule.failed(name)
+                            logger.error(f"Polling {name} failed: {exc}")
+                        else:
+                            retry = schedule.polled(name, found)
+                            logger.info(f"{name}: {found} new video(s).")
+                        if retry is not None:
+                            logger.info(f"Next poll of {name} in {retry / 60:.1f} minutes.")
+                    metrics.write_textfile()
+            except BaseException:
+                # Cancel before leaving the block, which waits for the account threads.
+                accounts.shutdown(wait=False, cancel_futures=True)
+                scheduler.cancel()
+                raise
+        logger.info("Watch stopped.")
+    finally:
+        ydl_pool.close()
+        if thumbnails:
+            thumbnails.close()
+
+
+def run_api(
+    settings: Settings, args: argparse.Namespace, logger: Logger, metrics: Metrics
+) -> None:
+    """Serve the REST API, running queued jobs on long-lived shared services."""
+    rate_limiter = build_rate_limiter(settings, args, logger)
+    session = open_session(settings, args, logger, rate_limiter, metrics)
+    profile_service = ProfileService(session, settings.request_timeout, logger, metrics=metrics)
+    manifest = open_manifest(settings, args, logger)
+    video_service = VideoService(
+        session,
+        settings.request_timeout,
+        logger,
+        manifest,
+        rate_limiter,
+        page_concurrency=settings.discovery_concurrency,
+        metrics=metrics,
+    )
+    ydl_pool = open_ydl_pool(settings)
+    direct = open_direct(settings, session)
+    thumbnails = open_thumbnails(settings, args, session, manifest, logger, metrics)
+    scheduler = DownloadScheduler(settings.max_workers, logger, metrics=metrics)
+    store = JobStore.open(settings.state_dir)
+
+    def execute(handle: JobHandle) -> None:
+        job = handle.job
+        job_args = argparse.Namespace(**{**vars(args), **job.options})
+        username = resolve_username(job.username, profile_service)
+        download_service = build_download_service(
+            settings, job_args, username, manifest, logger, ydl_pool, rate_limiter, metrics, direct=direct
+        )
+        download_service.on_result = lambda result: store.progress(job.id, result)
+        handle.on_cancel(download_service.cancel)
+        store.started(job.id, download_service.target_dir)
+        videos, results, outcome = stream_account(
+            username, video_service, download_service, job_args, scheduler, thumbnails
+        )
+        video_service.advance_watermark(username, videos, results, outcome)
+        if videos:
+            export_extras(videos, download_service, job_args, logger)
+        if download_service.cancelled and not handle.cancelled:
+            raise RuntimeError("stopped after repeated download failures")
 
-        again = input(
-            f"{Theme.MUTED}Download another account? (y/n) {Theme.RESET}"
-        ).strip().lower()
-        if again not in {"y", "yes"}:
-            break
+    runner = JobRunner(store, execute, settings.account_concurrency, logger, metrics)
+    server = ApiServer((args.api_host, args.api_port), store, runner, metrics)
+    host, port = server.server_address[:2]
+    # shutdown() blocks until serve_forever returns, so it cannot run on this thread.
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    try:
+        with scheduler:
+            runner.start()
+            logger.success(f"API listening on http://{host}:{port} (jobs in {store.path})")
+            try:
+                server.serve_forever()
+            finally:
+                runner.close()
+    finally:
+        server.server_close()
+        ydl_pool.close()
+        if thumbnails:
+            thumbnails.close()
+        store.close()
 
 
-def run_cli(settings: Settings, args: argparse.Namespace, logger: Logger) -> None:
-    session = build_session(settings.proxy)
-    ip_info = None if args.privacy else fetch_ip_metadata(session, settings.request_timeout)
-    banners.print_banner(ip_info)
+def run_interactive(
+    settings: Settings, logger: Logger, args: argparse.Namespace, metrics: Metrics | None = None
+) -> None:
+    rate_limiter = build_rate_limiter(settings, args, logger)
+    session = open_session(settings, args, logger, rate_limiter, metrics)
+    ip_lookup = open_ip_lookup(settings, args, session)
+    profile_service = ProfileService(session, settings.request_timeout, logger, metrics=metrics)
+    manifest = open_manifest(settings, args, logger)
+    video_service = VideoService(
+        session,
+        settings.request_timeout,
+        logger,
+        manifest,
+        rate_limiter,
+        page_concurrency=settings.discovery_concurrency,
+        metrics=metrics,
+    )
+
+    thumbnails = open_thumbnails(settings, args, session, manifest, logger, metrics)
+    progress = open_progress(args, logger)
+    try:
+        while True:
+            banners.print_banner(ip_lookup.get() if ip_lookup else None)
+            raw_username = prompts.ask_username()
+            if not raw_username:
+                logger.warn("Empty username, exiting interactive mode.")
+                return
+            username = resolve_username(raw_username, profile_service)
+            profile = profile_service.fetch_profile(username)
+            summaries.print_profile(profile, logger)
+
+            outcome = DiscoveryOutcome()
+            videos = video_service.discover_videos(
+                username, incremental=args.incremental, outcome=outcome
+            )
+            if not videos:
+                logger.error("No videos available. Try another account.")
+                continue
+
+            selection = prompts.ask_video_count(len(videos))
+            if selection.lower() == "all":
+                count = len(videos)
+            else:
+                try:
+                    count = max(1, min(int(selection), len(videos)))
+                except ValueError:
+                    count = min(20, len(videos))
+                    logger.warn("Invalid input, defaulting to 20 videos.")
+
+            download_service = build_download_service(
+                settings,
+                args,
+                username,
+                manifest,
+                logger,
+                rate_limiter=rate_limiter,
+                metrics=metrics,
+                progress=progress,
+                direct=open_direct(settings, session),
+            )
+
+            if prompts.confirm_start(count, str(download_service.target_dir)):
+                subset = videos[:count]
+                with progress or nullcontext():
+                    if thumbnails:
+                        thumbnails.submit_all(subset, download_service.target_dir)
+                    results = download_service.download_all(subset)
+                    if thumbnails:
+                        thumbnails.wait()
+                summaries.print_results(results, logger)
+                video_service.advance_watermark(username, videos, results, outcome)
+                export_extras(subset, download_service, args, logger)
+            else:
+                logger.info("Cancelled by user.")
+
+            again = input(
+                f"{Theme.MUTED}Download another account? (y/n) {Theme.RESET}"
+            ).strip().lower()
+            if again not in {"y", "yes"}:
+                break
+    finally:
+        if thumbnails:
+            thumbnails.close()
+
+
+def run_cli(
+    settings: Settings, args: argparse.Namespace, logger: Logger, metrics: Metrics | None = None
+) -> None:
+    rate_limiter = build_rate_limiter(settings, args, logger)
+    session = open_session(settings, args, logger, rate_limiter, metrics)
+    ip_lookup = open_ip_lookup(settings, args, session)
+    banners.print_banner(ip_lookup.get() if ip_lookup else None)
 
     usernames: List[str] = []
     if args.watchlist:
@@ -305,9 +973,7 @@ def run_cli(settings: Settings, args: argparse.Namespace, logger: Logger) -> Non
         if not watchlist_path.exists():
             logger.error(f"Watchlist file not found: {watchlist_path}")
             return
-        usernames.extend(
-            line.strip() for line in watchlist_path.read_text(encoding="utf-8").splitlines()
-        )
+        usernames.extend(read_watchlist(watchlist_path))
     if args.username:
         usernames.append(args.username)
 
@@ -315,58 +981,82 @@ def run_cli(settings: Settings, args: argparse.Namespace, logger: Logger) -> Non
         logger.error("No username provided. Use --username or --watchlist.")
         return
 
-    profile_service = ProfileService(session, settings.request_timeout, logger)
-    video_service = VideoService(session, settings.request_timeout, logger)
+    if args.worker:
+        leases = open_leases(settings, logger)
+        if not leases:
+            return
+        with leases:
+            run_batch(usernames, settings, args, session, logger, rate_limiter, metrics, leases)
+        logger.info("No accounts left to lease.")
+        return
 
-    for raw_name in usernames:
-        if not raw_name:
-            continue
-        username = resolve_username(raw_name, profile_service)
-        profile = profile_service.fetch_profile(username)
-        summaries.print_profile(profile, logger)
+    if args.yes:
+        # Nothing to confirm, so every account can share one download pool.
+        run_batch(usernames, settings, args, session, logger, rate_limiter, metrics)
+        return
 
-        videos = video_service.discover_videos(username)
-        if not videos:
-            logger.warn(f"No videos available for {username}.")
-            continue
+    profile_service = ProfileService(session, settings.request_timeout, logger, metrics=metrics)
+    manifest = open_manifest(settings, args, logger)
+    video_service = VideoService(
+        session,
+        settings.request_timeout,
+        logger,
+        manifest,
+        rate_limiter,
+        page_concurrency=settings.discovery_concurrency,
+        metrics=metrics,
+    )
+    thumbnails = open_thumbnails(settings, args, session, manifest, logger, metrics)
+    progress = open_progress(args, logger)
+    ydl_pool = open_ydl_pool(settings)
+    direct = open_direct(settings, session)
 
-        count = choose_subset(len(videos), args.count, args.download_all)
-        download_service = DownloadService(
-            base_dir=settings.download_dir,
-            username=username,
-            max_workers=settings.max_workers,
-            proxy=settings.proxy,
-            logger=logger,
-            rate_limit=args.rate_limit,
-        )
+    try:
+        for raw_name in usernames:
+            if not raw_name:
+                continue
+            username = resolve_username(raw_name, profile_service)
+            profile = profile_service.fetch_profile(username)
+            summaries.print_profile(profile, logger)
+            download_service = build_download_service(
+                settings,
+                args,
+                username,
+                manifest,
+                logger,
+                ydl_pool=ydl_pool,
+                rate_limiter=rate_limiter,
+                metrics=metrics,
+                progress=progress,
+                direct=direct,
+            )
 
-        if not args.yes:
+            outcome = DiscoveryOutcome()
+            videos = video_service.discover_videos(
+                username, incremental=args.incremental, outcome=outcome
+            )
+            if not videos:
+                logger.warn(f"No videos available for {username}.")
+                continue
+            count = choose_subset(len(videos), args.count, args.download_all)
             if not prompts.confirm_start(count, str(download_service.target_dir)):
                 logger.info("Cancelled by user input.")
                 continue
+            subset = videos[:count]
+            with progress or nullcontext():
+                if thumbnails:
+                    thumbnails.submit_all(subset, download_service.target_dir)
+                results = download_service.download_all(subset)
+                if thumbnails:
+                    thumbnails.wait()
 
-        subset = videos[:count]
-        results = download_service.download_all(subset)
-        summaries.print_results(results, logger)
-
-        if args.metadata:
-            metadata_path = download_service.target_dir / f"metadata.{args.metadata}"
-            export_metadata(subset, metadata_path, args.metadata)
-            logger.info(f"Metadata saved to {metadata_path}")
-
-        if args.playlist:
-            playlist_path = download_service.target_dir / "playlist.m3u"
-            export_playlist(subset, playlist_path)
-            logger.info(f"Playlist exported to {playlist_path}")
-
-        if args.thumbnails:
-            download_thumbnails(
-                session,
-                subset,
-                download_service.target_dir,
-                logger,
-                settings.request_timeout,
-            )
+            summaries.print_results(results, logger)
+            video_service.advance_watermark(username, videos, results, outcome)
+            export_extras(subset, download_service, args, logger)
+    finally:
+        ydl_pool.close()
+        if thumbnails:
+            thumbnails.close()
 
 
 def main() -> None:
@@ -377,11 +1067,6 @@ def main() -> None:
         run_self_check(logger)
         return
 
-    if args.verify:
-        settings = Settings.load()
-        verify_checksums(settings.download_dir, logger)
-        return
-
     settings = Settings.load()
     settings.apply_overrides(
         download_dir=args.download_dir,
@@ -389,18 +1074,52 @@ def main() -> None:
         quick_mode=args.quick,
         proxy=args.proxy,
         request_timeout=args.request_timeout,
+        checksum_algorithm=args.checksum,
+        account_concurrency=args.account_concurrency,
+        discovery_concurrency=args.discovery_concurrency,
+        content_store=args.store,
+        download_window=args.window,
+        max_consecutive_failures=args.max_failures,
+        download_processes=args.processes,
+        direct_download=args.direct,
+        watch_interval=args.watch_interval,
+        metrics_jsonl=args.metrics_jsonl,
+        metrics_textfile=args.metrics_textfile,
     )
 
+    if args.verify:
+        verify_checksums(settings, logger, args.verify_max_age)
+        return
+
+    if args.gc:
+        collect_garbage(settings, logger, args.dry_run)
+        return
+
     if args.schedule:
         parse_schedule(args.schedule, logger)
 
     if args.watchlist and args.username:
         logger.info("Processing --watchlist first, then explicit --username.")
 
-    if args.api:
-        logger.warn("REST API mode is not implemented yet. Continuing with CLI mode.")
+    report_partials(settings, logger)
 
-    if args.username or args.watchlist:
-        run_cli(settings, args, logger)
-    else:
-        run_interactive(settings, logger, args)
+    metrics = open_metrics(settings, logger)
+    try:
+        if args.api:
+            run_api(settings, args, logger, metrics)
+        elif args.watch:
+            if args.no_manifest:
+                logger.error("--watch relies on the download manifest and cannot run with --no-manifest.")
+            elif args.username or args.watchlist:
+                run_watch(settings, args, logger, metrics)
+            else:
+                logger.error("--watch needs --watchlist or --username.")
+        elif args.username or args.watchlist:
+            run_cli(settings, args, logger, metrics)
+        else:
+            run_interactive(settings, logger, args, metrics)
+    except KeyboardInterrupt:
+        logger.warn("Interrupted. Partial downloads resume on the next run.")
+        sys.exit(130)
+    finally:
+        metrics.close()
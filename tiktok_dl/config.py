@@ -5,28 +5,86 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict
 
+from .checksums import CHECKSUM_ALGORITHMS
+
 
 DEFAULT_CONFIG = {
     "download_dir": str(Path.home() / "Downloads" / "TikTokDownloads"),
     "max_workers": 4,
+    "account_concurrency": 4,
+    "discovery_concurrency": 4,
+    "api_rate_per_minute": 150,
+    "http_cache_mb": 64,
+    "http_cache_ttl_sec": {"profile": 3600, "posts": 300},
+    "http_pool_size": 0,
     "request_timeout_sec": 15,
     "quick_mode": True,
     "proxy": "",
+    "checksum_algorithm": "sha256",
+    "content_store": False,
+    "download_window": 0,
+    "max_consecutive_failures": 0,
+    "download_processes": 0,
+    "direct_download": True,
+    "watch_interval": 900,
+    "watch_min_interval": 120,
+    "watch_max_interval": 21600,
+    "watch_jitter": 0.1,
+    "lease_ttl": 120,
+    "worker_round": 3600,
+    "metrics_jsonl": "",
+    "metrics_textfile": "",
 }
 
 CONFIG_FILE = Path("tiktok_termux_ultimate.config.json")
+STATE_DIRNAME = ".tiktok_dl"
+MIN_WORKER_ROUND = 60.0
 
 
 @dataclass
 class Settings:
     download_dir: Path = Path(DEFAULT_CONFIG["download_dir"])
     max_workers: int = DEFAULT_CONFIG["max_workers"]
+    account_concurrency: int = DEFAULT_CONFIG["account_concurrency"]
+    discovery_concurrency: int = DEFAULT_CONFIG["discovery_concurrency"]
+    api_rate_per_minute: int = DEFAULT_CONFIG["api_rate_per_minute"]
+    http_cache_mb: int = DEFAULT_CONFIG["http_cache_mb"]
+    http_pool_size: int = DEFAULT_CONFIG["http_pool_size"]
+    http_cache_ttl: Dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_CONFIG["http_cache_ttl_sec"])
+    )
     request_timeout: int = DEFAULT_CONFIG["request_timeout_sec"]
     quick_mode: bool = DEFAULT_CONFIG["quick_mode"]
     proxy: str = DEFAULT_CONFIG["proxy"]
+    checksum_algorithm: str = DEFAULT_CONFIG["checksum_algorithm"]
+    content_store: bool = DEFAULT_CONFIG["content_store"]
+    download_window: int = DEFAULT_CONFIG["download_window"]
+    max_consecutive_failures: int = DEFAULT_CONFIG["max_consecutive_failures"]
+    download_processes: int = DEFAULT_CONFIG["download_processes"]
+    direct_download: bool = DEFAULT_CONFIG["direct_download"]
+    watch_interval: float = DEFAULT_CONFIG["watch_interval"]
+    watch_min_interval: float = DEFAULT_CONFIG["watch_min_interval"]
+    watch_max_interval: float = DEFAULT_CONFIG["watch_max_interval"]
+    watch_jitter: float = DEFAULT_CONFIG["watch_jitter"]
+    lease_ttl: float = DEFAULT_CONFIG["lease_ttl"]
+    worker_round: float = DEFAULT_CONFIG["worker_round"]
+    metrics_jsonl: str = DEFAULT_CONFIG["metrics_jsonl"]
+    metrics_textfile: str = DEFAULT_CONFIG["metrics_textfile"]
 
     extra: Dict[str, Any] = field(default_factory=dict)
 
+    @property
+    def state_dir(self) -> Path:
+        return self.download_dir / STATE_DIRNAME
+
+    @property
+    def connection_pool_size(self) -> int:
+        """Keep-alive connections per host; 0 in the config sizes it from the workers."""
+        if self.http_pool_size:
+            return self.http_pool_size
+        # Media downloads, thumbnails and listing pages can all hit one host at once.
+        return 2 * self.max_workers + self.discovery_concurrency * self.account_concurrency
+
     @classmethod
     def load(cls) -> "Settings":
         if CONFIG_FILE.exists():
@@ -45,10 +103,36 @@ class Settings:
         settings = cls(
             download_dir=Path(merged["download_dir"]).expanduser(),
             max_workers=max(int(merged["max_workers"]), 1),
+            account_concurrency=max(int(merged["account_concurrency"]), 1),
+            discovery_concurrency=max(int(merged["discovery_concurrency"]), 1),
+            api_rate_per_minute=max(int(merged["api_rate_per_minute"]), 1),
+            http_cache_mb=max(int(merged["http_cache_mb"]), 0),
+            http_pool_size=max(int(merged["http_pool_size"] or 0), 0),
+            http_cache_ttl={
+                **DEFAULT_CONFIG["http_cache_ttl_sec"],
+                **{k: int(v) for k, v in dict(merged["http_cache_ttl_sec"] or {}).items()},
+            },
             request_timeout=max(int(merged["request_timeout_sec"]), 5),
             quick_mode=bool(merged["quick_mode"]),
             proxy=str(merged["proxy"] or "").strip(),
+            checksum_algorithm=str(merged["checksum_algorithm"] or "").lower(),
+            content_store=bool(merged["content_store"]),
+            download_window=max(int(merged["download_window"] or 0), 0),
+            max_consecutive_failures=max(int(merged["max_consecutive_failures"] or 0), 0),
+            download_processes=max(int(merged["download_processes"] or 0), 0),
+            direct_download=bool(merged["direct_download"]),
+            watch_interval=max(float(merged["watch_interval"] or 0), 1.0),
+            watch_min_interval=max(float(merged["watch_min_interval"] or 0), 1.0),
+            watch_max_interval=max(float(merged["watch_max_interval"] or 0), 1.0),
+            watch_jitter=min(max(float(merged["watch_jitter"] or 0), 0.0), 0.5),
+            lease_ttl=max(float(merged["lease_ttl"] or 0), 5.0),
+            # With no round at all, finished accounts would be due again within the same pass.
+            worker_round=max(float(merged["worker_round"] or 0), MIN_WORKER_ROUND),
+            metrics_jsonl=str(merged["metrics_jsonl"] or "").strip(),
+            metrics_textfile=str(merged["metrics_textfile"] or "").strip(),
         )
+        if settings.checksum_algorithm not in CHECKSUM_ALGORITHMS:
+            settings.checksum_algorithm = DEFAULT_CONFIG["checksum_algorithm"]
         settings.extra = merged
         settings.download_dir.mkdir(parents=True, exist_ok=True)
         return settings
@@ -60,6 +144,17 @@ class Settings:
         quick_mode: bool | None = None,
         proxy: str | None = None,
         request_timeout: int | None = None,
+        checksum_algorithm: str | None = None,
+        account_concurrency: int | None = None,
+        discovery_concurrency: int | None = None,
+        content_store: bool | None = None,
+        download_window: int | None = None,
+        max_consecutive_failures: int | None = None,
+        download_processes: int | None = None,
+        direct_download: bool | None = None,
+        watch_interval: float | None = None,
+        metrics_jsonl: str | None = None,
+        metrics_textfile: str | None = None,
     ) -> None:
         if download_dir:
             path = Path(download_dir).expanduser()
@@ -73,3 +168,25 @@ class Settings:
             self.proxy = proxy.strip()
         if request_timeout:
             self.request_timeout = max(5, int(request_timeout))
+        if checksum_algorithm:
+            self.checksum_algorithm = checksum_algorithm.lower()
+        if account_concurrency:
+            self.account_concurrency = max(1, int(account_concurrency))
+        if discovery_concurrency:
+            self.discovery_concurrency = max(1, int(discovery_concurrency))
+        if content_store is not None:
+            self.content_store = bool(content_store)
+        if download_window:
+            self.download_window = max(1, int(download_window))
+        if max_consecutive_failures is not None:
+            self.max_consecutive_failures = max(0, int(max_consecutive_failures))
+        if download_processes is not None:
+            self.download_processes = max(0, int(download_processes))
+        if direct_download is not None:
+            self.direct_download = bool(direct_download)
+        if watch_interval:
+            self.watch_interval = max(1.0, float(watch_interval))
+        if metrics_jsonl:
+            self.metrics_jsonl = metrics_jsonl.strip()
+        if metrics_textfile:
+            self.metrics_textfile = metrics_textfile.strip()
@@ -0,0 +1,162 @@
+"""Per-video result exports that survive a killed run."""
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+from .models import DownloadResult
+
+RESULT_FORMATS = ("ndjson", "csv")
+RESULT_FIELDS = (
+    "index",
+    "video_id",
+    "url",
+    "description",
+    "status",
+    "success",
+    "size",
+    "checksum",
+    "algorithm",
+    "elapsed",
+    "target",
+    "finished_at",
+)
+
+
+def result_row(result: DownloadResult, algorithm: Optional[str] = None) -> Dict[str, Any]:
+    return {
+        "index": result.index,
+        "video_id": result.video.id,
+        "url": result.video.url,
+        "description": result.video.description,
+        "status": result.status,
+        "success": result.success,
+        "size": result.size,
+        "checksum": result.checksum,
+        "algorithm": algorithm if result.checksum else None,
+        "elapsed": round(result.elapsed, 3),
+        "target": str(result.target),
+        "finished_at": round(time.time(), 3),
+    }
+
+
+def trim_torn_line(path: Path) -> None:
+    """Cut off a last line that a killed process left half written."""
+    try:
+        fh = path.open("rb+")
+    except FileNotFoundError:
+        return
+    with fh:
+        end = fh.seek(0, os.SEEK_END)
+        if not end:
+            return
+        fh.seek(end - 1)
+        if fh.read(1) == b"\n":
+            return
+        pos = end
+        while pos > 0:
+            step = min(4096, pos)
+            pos -= step
+            fh.seek(pos)
+            cut = fh.read(step).rfind(b"\n")
+            if cut != -1:
+                fh.truncate(pos + cut + 1)
+                return
+        fh.truncate(0)
+
+
+class ResultExporter:
+    """Append one row per finished download to an NDJSON or CSV file.
+
+    Each row is written and flushed as its video finishes, so a killed run
+    still leaves every completed row on disk, and a torn last line is
+    trimmed when the file is reopened. The file is only created on the
+    first row, so accounts with nothing to download leave nothing behind.
+    """
+
+    def __init__(self, path: Path, fmt: str = "ndjson", algorithm: Optional[str] = None) -> None:
+        if fmt not in RESULT_FORMATS:
+            raise ValueError(f"Unsupported result format: {fmt}")
+        self.path = path
+        self.fmt = fmt
+        self.algorithm = algorithm
+        self.rows = 0
+        self._lock = threading.Lock()
+        self._fh: Optional[TextIO] = None
+        self._csv: Any = None
+
+    def __enter__(self) -> "ResultExporter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open(self) -> TextIO:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        trim_torn_line(self.path)
+        fresh = not self.path.exists() or self.path.stat().st_size == 0
+        fh = self.path.open("a", newline="", encoding="utf-8")
+        if self.fmt == "csv":
+            self._csv = csv.DictWriter(fh, fieldnames=RESULT_FIELDS)
+            if fresh:
+                self._csv.writeheader()
+        return fh
+
+    def write(self, result: DownloadResult) -> None:
+        row = result_row(result, self.algorithm)
+        if self.fmt == "csv" and row["description"]:
+            # One record per line, so trimming a torn line never splits a record.
+            row["description"] = " ".join(row["description"].splitlines())
+        with self._lock:
+            if self._fh is None:
+                self._fh = self._open()
+            if self._csv:
+                self._csv.writerow(row)
+            else:
+                self._fh.write(json.dumps(row, ensure_ascii=False) + "\n")
+            self._fh.flush()
+            self.rows += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fh is None:
+                return
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+            self._fh.close()
+            self._fh = None
+            self._csv = None
+
+
+def write_parquet(source: Path, target: Path) -> Path:
+    """Convert an NDJSON result file to Parquet; needs the optional pyarrow."""
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.json as pa_json  # noqa: PLC0415
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    schema = pa.schema(
+        [
+            ("index", pa.int64()),
+            ("video_id", pa.string()),
+            ("url", pa.string()),
+            ("description", pa.string()),
+            ("status", pa.string()),
+            ("success", pa.bool_()),
+            ("size", pa.int64()),
+            ("checksum", pa.string()),
+            ("algorithm", pa.string()),
+            ("elapsed", pa.float64()),
+            ("target", pa.string()),
+            ("finished_at", pa.float64()),
+        ]
+    )
+    table = pa_json.read_json(source, parse_options=pa_json.ParseOptions(explicit_schema=schema))
+    tmp = target.with_name(target.name + ".tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    os.replace(tmp, target)
+    return target
@@ -1,13 +1,62 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Any, Dict, Optional
 
 import requests
 from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.poolmanager import PoolManager
 from urllib3.util.retry import Retry
 
+from .http_cache import CachingAdapter, ResponseCache
+from .metrics import Metrics
+from .ratelimit import AdaptiveRateLimiter, RateLimitedAdapter
 
-def build_session(proxy: Optional[str] = None) -> requests.Session:
+DEFAULT_POOL_SIZE = 10
+# Host pools kept alive at once; media comes from many CDN host names.
+POOL_HOSTS = 32
+
+
+class _CountingPool(HTTPConnectionPool):
+    metrics: Optional[Metrics] = None
+
+    def _get_conn(self, timeout: Optional[float] = None) -> Any:
+        conn = super()._get_conn(timeout)
+        if self.metrics:
+            # New and reset connections have no socket yet: they pay for TCP and TLS again.
+            outcome = "hit" if conn.sock is not None else "miss"
+            self.metrics.incr("http_pool_total", host=self.host, outcome=outcome)
+        return conn
+
+
+def track_pool_usage(manager: PoolManager, metrics: Metrics) -> None:
+    """Count connection reuse (hits) and new connections (misses) per host.
+
+    Connections made through a proxy come from the adapter's proxy
+    managers and are not counted.
+    """
+    manager.pool_classes_by_scheme = {
+        "http": type("CountingHTTPConnectionPool", (_CountingPool,), {"metrics": metrics}),
+        "https": type(
+            "CountingHTTPSConnectionPool", (_CountingPool, HTTPSConnectionPool), {"metrics": metrics}
+        ),
+    }
+
+
+def build_session(
+    proxy: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    cache_ttls: Optional[Dict[str, int]] = None,
+    rate_limiter: Optional[AdaptiveRateLimiter] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    metrics: Optional[Metrics] = None,
+) -> requests.Session:
+    """Session shared by discovery, thumbnails and direct media downloads.
+
+    ``pool_size`` keep-alive connections are kept per host, so every
+    thread that can be talking to one host at a time reuses a warm
+    connection instead of paying for a new TCP and TLS handshake.
+    """
     session = requests.Session()
     session.headers.update(
         {
@@ -27,10 +76,25 @@ def build_session(proxy: Optional[str] = None) -> requests.Session:
     retry = Retry(
         total=3,
         backoff_factor=0.5,
-        status_forcelist=[429, 500, 502, 503, 504],
+        # 429s are left to the callers' adaptive rate limiter.
+        status_forcelist=[500, 502, 503, 504],
         allowed_methods=["GET", "HEAD", "OPTIONS"],
     )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
+    if cache:
+        adapter: HTTPAdapter = CachingAdapter(
+            cache,
+            cache_ttls,
+            rate_limiter,
+            max_retries=retry,
+            pool_connections=POOL_HOSTS,
+            pool_maxsize=pool_size,
+        )
+    else:
+        adapter = RateLimitedAdapter(
+            rate_limiter, max_retries=retry, pool_connections=POOL_HOSTS, pool_maxsize=pool_size
+        )
+    if metrics:
+        track_pool_usage(adapter.poolmanager, metrics)
     session.mount("http://", adapter)
     session.mount("https://", adapter)
     return session
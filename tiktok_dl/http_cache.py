@@ -0,0 +1,200 @@
+"""Persistent response cache for the JSON API endpoints."""
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Pattern, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from .ratelimit import AdaptiveRateLimiter, RateLimitedAdapter
+
+HTTP_CACHE_FILENAME = "http-cache.sqlite3"
+
+# name -> (URL pattern, default TTL in seconds)
+CACHE_RULES: Dict[str, Tuple[Pattern[str], int]] = {
+    "profile": (re.compile(r"^https://(www\.tikwm\.com/api/user/info|api\.tiktokuserinfo\.com/user/info)"), 3600),
+    "posts": (re.compile(r"^https://www\.tikwm\.com/api/user/posts"), 300),
+}
+
+# Describe the wire format, not the decoded body we store.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access);
+"""
+
+
+class ResponseCache:
+    """SQLite-backed store with per-entry expiry and LRU eviction by size."""
+
+    def __init__(self, path: Path, max_bytes: int = 64 * 1024 * 1024) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @classmethod
+    def open(cls, state_dir: Path, max_mb: int = 64) -> "ResponseCache":
+        return cls(state_dir / HTTP_CACHE_FILENAME, max_mb * 1024 * 1024)
+
+    def get(self, url: str) -> Optional[Tuple[int, Dict[str, str], bytes, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE url = ?",
+                    (time.time(), url),
+                )
+        if not row:
+            return None
+        return row[0], json.loads(row[1]), row[2], row[3]
+
+    def put(self, url: str, status: int, headers: Dict[str, str], body: bytes, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, headers, body, size, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, status, json.dumps(headers), body, len(body), now + ttl, now),
+            )
+            self._evict()
+
+    def touch(self, url: str, ttl: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET expires_at = ?, last_access = ? WHERE url = ?",
+                (now + ttl, now, url),
+            )
+
+    def count(self, stat: str) -> None:
+        """Add one to ``hits``, ``misses`` or ``revalidated``; sessions share the cache."""
+        with self._lock:
+            setattr(self, stat, getattr(self, stat) + 1)
+
+    def _evict(self) -> None:
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class CachingAdapter(RateLimitedAdapter):
+    """Adapter that serves matching GET requests from a ResponseCache.
+
+    Fresh entries are returned without touching the network or the rate
+    budget. Expired entries that carried an ETag or Last-Modified are
+    revalidated with a conditional request and reused on 304.
+    """
+
+    def __init__(
+        self,
+        cache: ResponseCache,
+        ttls: Optional[Dict[str, int]] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(rate_limiter, **kwargs)
+        self.cache = cache
+        self.ttls = {name: ttl for name, (_, ttl) in CACHE_RULES.items()}
+        self.ttls.update(ttls or {})
+
+    def _ttl_for(self, url: str) -> Optional[int]:
+        for name, (pattern, _) in CACHE_RULES.items():
+            if pattern.match(url):
+                ttl = self.ttls.get(name, 0)
+                return ttl if ttl > 0 else None
+        return None
+
+    def _from_cache(
+        self, request: requests.PreparedRequest, status: int, headers: Dict[str, str], body: bytes
+    ) -> requests.Response:
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response.headers["X-Cache"] = "HIT"
+        response._content = body
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url or ""
+        response.reason = "OK"
+        response.request = request
+        response.connection = self
+        return response
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        url = request.url or ""
+        ttl = self._ttl_for(url) if request.method == "GET" else None
+        if ttl is None:
+            return super().send(request, **kwargs)
+
+        cached = self.cache.get(url)
+        if cached:
+            status, headers, body, expires_at = cached
+            if expires_at > time.time():
+                self.cache.count("hits")
+                return self._from_cache(request, status, headers, body)
+            lowered = {k.lower(): v for k, v in headers.items()}
+            if "etag" in lowered:
+                request.headers["If-None-Match"] = lowered["etag"]
+            if "last-modified" in lowered:
+                request.headers["If-Modified-Since"] = lowered["last-modified"]
+
+        self.cache.count("misses")
+        response = super().send(request, **kwargs)
+        if cached and response.status_code == 304:
+            self.cache.count("revalidated")
+            self.cache.touch(url, ttl)
+            status, headers, body, _ = cached
+            return self._from_cache(request, status, headers, body)
+        if response.status_code == 200 and self._cacheable(response):
+            headers = {
+                k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS
+            }
+            self.cache.put(url, 200, headers, response.content, ttl)
+        return response
+
+    @staticmethod
+    def _cacheable(response: requests.Response) -> bool:
+        # TikWM reports throttling and lookup failures as 200 with a non-zero code.
+        try:
+            payload = response.json()
+        except ValueError:
+            return False
+        return not (isinstance(payload, dict) and payload.get("code", 0) not in (0, None))
@@ -0,0 +1,177 @@
+"""Persistent queue of download jobs for the REST API mode."""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .models import DownloadResult, Job
+
+JOBS_FILENAME = "jobs.sqlite3"
+JOB_STATUSES = ("queued", "running", "done", "failed", "cancelled")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    done INTEGER NOT NULL DEFAULT 0,
+    succeeded INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    target_dir TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+"""
+
+_COLUMNS = (
+    "id, username, options, status, created_at, started_at, finished_at, "
+    "done, succeeded, failed, bytes, target_dir, error"
+)
+
+
+def _job(row: tuple) -> Job:
+    return Job(
+        id=int(row[0]),
+        username=row[1],
+        options=json.loads(row[2]),
+        status=row[3],
+        created_at=float(row[4]),
+        started_at=row[5],
+        finished_at=row[6],
+        done=int(row[7]),
+        succeeded=int(row[8]),
+        failed=int(row[9]),
+        bytes=int(row[10]),
+        target_dir=row[11],
+        error=row[12],
+    )
+
+
+class JobStore:
+    """Download jobs and their progress, kept across API server restarts.
+
+    Jobs are claimed oldest first. A job still marked ``running`` when the
+    server starts was interrupted, so :meth:`requeue_interrupted` puts it
+    back in the queue; the partial-download journal lets it resume.
+    """
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, state_dir: Path) -> "JobStore":
+        return cls(state_dir / JOBS_FILENAME)
+
+    def submit(self, username: str, options: Dict[str, Any]) -> Job:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (username, options, status, created_at) VALUES (?, ?, 'queued', ?)",
+                (username, json.dumps(options), time.time()),
+            )
+            job_id = cursor.lastrowid
+        return self.get(job_id)
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return _job(row) if row else None
+
+    def list(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        query = f"SELECT {_COLUMNS} FROM jobs"
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY id DESC LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(query, params + (int(limit),)).fetchall()
+        return [_job(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: int(count) for status, count in rows}
+
+    def claim(self) -> Optional[Job]:
+        """Mark the oldest queued job as running and return it."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                        (time.time(), row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row[0]) if row else None
+
+    def started(self, job_id: int, target_dir: Path) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET target_dir = ? WHERE id = ?", (str(target_dir), job_id)
+            )
+
+    def progress(self, job_id: int, result: DownloadResult) -> None:
+        downloaded = result.size if result.status == "downloaded" else 0
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET done = done + 1, succeeded = succeeded + ?, "
+                "failed = failed + ?, bytes = bytes + ? WHERE id = ?",
+                (int(result.success), int(not result.success), downloaded, job_id),
+            )
+
+    def finish(self, job_id: int, status: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                (status, time.time(), error, job_id),
+            )
+
+    def cancel(self, job_id: int) -> bool:
+        """Cancel a job that has not started yet; returns False otherwise."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id),
+            )
+        return cursor.rowcount > 0
+
+    def requeue_interrupted(self) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, "
+                "done = 0, succeeded = 0, failed = 0, bytes = 0 WHERE status = 'running'"
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
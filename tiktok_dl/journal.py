@@ -0,0 +1,196 @@
+"""Crash-safe bookkeeping for partially downloaded media."""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .models import JournalEntry, VideoItem
+
+PARTIAL_DIRNAME = "partial"
+JOURNAL_SUFFIX = ".journal.json"
+
+# Partial path -> [lock, holders]; shared by every journal in the process.
+_PARTIAL_LOCKS: Dict[str, list] = {}
+_PARTIAL_LOCKS_GUARD = threading.Lock()
+
+
+def atomic_write_text(path: Path, text: str) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+class DownloadJournal:
+    """Partial files keyed by video ID, each next to a small JSON journal.
+
+    Partials live under the state directory rather than the timestamped
+    run folder, so a later run finds and resumes them. The finished file
+    is moved into the run folder with a single rename.
+    """
+
+    def __init__(self, root: Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+
+    @classmethod
+    def open(cls, state_dir: Path) -> "DownloadJournal":
+        return cls(state_dir / PARTIAL_DIRNAME)
+
+    def partial_path(self, video_id: str) -> Path:
+        return self.root / f"{video_id}.mp4"
+
+    def journal_path(self, video_id: str) -> Path:
+        return self.root / f"{video_id}{JOURNAL_SUFFIX}"
+
+    @contextmanager
+    def lock(self, video_id: str) -> Iterator[None]:
+        """Serialise transfers of one video, e.g. two API jobs for one account."""
+        key = str(self.partial_path(video_id))
+        with _PARTIAL_LOCKS_GUARD:
+            entry = _PARTIAL_LOCKS.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with _PARTIAL_LOCKS_GUARD:
+                entry[1] -= 1
+                if not entry[1]:
+                    del _PARTIAL_LOCKS[key]
+
+    def load(self, video_id: str) -> Optional[JournalEntry]:
+        path = self.journal_path(video_id)
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            return JournalEntry(
+                video_id=data["video_id"],
+                url=data["url"],
+                target=Path(data["target"]),
+                expected_size=data.get("expected_size"),
+                received=int(data.get("received", 0)),
+                updated_at=float(data.get("updated_at", 0)),
+                source=data.get("source", "ytdlp"),
+            )
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def pending(self) -> List[JournalEntry]:
+        entries = []
+        for path in self.root.glob(f"*{JOURNAL_SUFFIX}"):
+            entry = self.load(path.name[: -len(JOURNAL_SUFFIX)])
+            if entry:
+                entries.append(entry)
+        return entries
+
+    def write(self, entry: JournalEntry) -> None:
+        atomic_write_text(
+            self.journal_path(entry.video_id),
+            json.dumps(
+                {
+                    "video_id": entry.video_id,
+                    "url": entry.url,
+                    "target": str(entry.target),
+                    "expected_size": entry.expected_size,
+                    "received": entry.received,
+                    "updated_at": entry.updated_at,
+                    "source": entry.source,
+                }
+            ),
+        )
+
+    def tracker(self, video: VideoItem, target: Path, source: str = "ytdlp") -> "JournalTracker":
+        previous = self.load(video.id)
+        if previous and previous.source != source:
+            # Bytes from another source cannot be resumed from: start over.
+            self.discard(video.id, remove_partial=True)
+            previous = None
+        entry = JournalEntry(
+            video_id=video.id,
+            url=video.url,
+            target=target,
+            expected_size=previous.expected_size if previous else None,
+            received=previous.received if previous else 0,
+            updated_at=time.time(),
+            source=source,
+        )
+        self.write(entry)
+        return JournalTracker(self, entry)
+
+    def finished_partial(self, video_id: str, expected_size: Optional[int]) -> bool:
+        """True when the partial already holds all ``expected_size`` bytes.
+
+        A run killed after the last byte but before yt-dlp renamed its
+        ``.part`` file would otherwise ask for a range past the end, which
+        yt-dlp fails on instead of treating the file as complete.
+        """
+        if not expected_size:
+            return False
+        partial = self.partial_path(video_id)
+        part = partial.with_name(partial.name + ".part")
+        for candidate in (partial, part):
+            try:
+                if candidate.stat().st_size != expected_size:
+                    continue
+            except OSError:
+                continue
+            if candidate == part:
+                os.replace(part, partial)
+            return True
+        return False
+
+    def commit(self, video_id: str, source: Path, target: Path) -> None:
+        try:
+            os.replace(source, target)
+        except OSError:
+            # State directory on another filesystem: fall back to copy + delete.
+            shutil.move(str(source), str(target))
+        self.discard(video_id)
+
+    def discard(self, video_id: str, remove_partial: bool = False) -> None:
+        self.journal_path(video_id).unlink(missing_ok=True)
+        if remove_partial:
+            partial = self.partial_path(video_id)
+            partial.unlink(missing_ok=True)
+            partial.with_name(partial.name + ".part").unlink(missing_ok=True)
+
+    def prune(self, max_age: float) -> int:
+        """Drop partials whose journal has not been touched for ``max_age`` seconds."""
+        removed = 0
+        cutoff = time.time() - max_age
+        for entry in self.pending():
+            if entry.updated_at < cutoff:
+                self.discard(entry.video_id, remove_partial=True)
+                removed += 1
+        return removed
+
+
+class JournalTracker:
+    """yt-dlp progress hook that records progress at most once per interval."""
+
+    def __init__(self, journal: DownloadJournal, entry: JournalEntry, interval: float = 1.0) -> None:
+        self.journal = journal
+        self.entry = entry
+        self.interval = interval
+        self._last_write = 0.0
+
+    def __call__(self, status: Dict[str, Any]) -> None:
+        if status.get("status") != "downloading":
+            return
+        total = status.get("total_bytes") or status.get("total_bytes_estimate")
+        if total and status.get("total_bytes"):
+            self.entry.expected_size = int(total)
+        self.entry.received = int(status.get("downloaded_bytes") or 0)
+        now = time.monotonic()
+        if now - self._last_write >= self.interval:
+            self._last_write = now
+            self.entry.updated_at = time.time()
+            try:
+                self.journal.write(self.entry)
+            except OSError:
+                pass
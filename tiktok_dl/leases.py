@@ -0,0 +1,256 @@
+"""Leases that split accounts and videos between workers sharing a volume."""
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Iterable, Optional
+
+from .logging import Logger
+from .models import Lease
+
+LEASES_FILENAME = "leases.sqlite3"
+ACCOUNT = "account"
+VIDEO = "video"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leases (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    status TEXT NOT NULL,
+    owner TEXT,
+    expires_at REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    path TEXT,
+    size INTEGER,
+    checksum TEXT,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS leases_available ON leases (kind, status, expires_at);
+"""
+
+_COLUMNS = "kind, key, status, owner, expires_at, attempts, path, size, checksum"
+
+
+def default_owner() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _lease(row: tuple) -> Lease:
+    return Lease(
+        kind=row[0],
+        key=row[1],
+        status=row[2],
+        owner=row[3],
+        expires_at=row[4],
+        attempts=int(row[5]),
+        path=Path(row[6]) if row[6] else None,
+        size=row[7],
+        checksum=row[8],
+    )
+
+
+class LeaseStore:
+    """Work items (accounts, videos) leased to one worker at a time.
+
+    A lease lasts ``ttl`` seconds and is renewed by a heartbeat thread
+    while the worker lives; a crashed worker's leases run out and other
+    workers take the items over. Finished videos stay ``done`` for good,
+    with their path recorded so other workers link instead of fetching.
+    Finished accounts can be kept for ``keep_for`` seconds, which makes
+    them due again on the next round (``0``: at once).
+
+    The store sits on the shared volume, possibly over NFS/SMB, so it uses
+    SQLite's rollback journal: WAL needs shared memory between processes,
+    which does not work across hosts.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        owner: Optional[str] = None,
+        ttl: float = 120.0,
+        logger: Optional[Logger] = None,
+    ) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.owner = owner or default_owner()
+        self.ttl = max(float(ttl), 5.0)
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path),
+            timeout=60,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=DELETE")
+        self._conn.executescript(_SCHEMA)
+        self._stop = threading.Event()
+        self._heartbeat: Optional[threading.Thread] = None
+
+    @classmethod
+    def open(
+        cls, state_dir: Path, ttl: float = 120.0, logger: Optional[Logger] = None
+    ) -> "LeaseStore":
+        return cls(state_dir / LEASES_FILENAME, ttl=ttl, logger=logger)
+
+    def __enter__(self) -> "LeaseStore":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _transaction(self, work):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(time.time())
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def _get(self, kind: str, key: str) -> Optional[Lease]:
+        row = self._conn.execute(
+            f"SELECT {_COLUMNS} FROM leases WHERE kind = ? AND key = ?", (kind, key)
+        ).fetchone()
+        return _lease(row) if row else None
+
+    def _take(self, kind: str, key: str, now: float) -> None:
+        self._conn.execute(
+            "UPDATE leases SET status = 'leased', owner = ?, expires_at = ?, "
+            "attempts = attempts + 1, updated_at = ? WHERE kind = ? AND key = ?",
+            (self.owner, now + self.ttl, now, kind, key),
+        )
+
+    def seed(self, kind: str, keys: Iterable[str]) -> None:
+        """Make sure every key has a row; existing rows keep their state."""
+        rows = [(kind, key, time.time()) for key in keys]
+
+        def work(now: float) -> None:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO leases (kind, key, status, updated_at) "
+                "VALUES (?, ?, 'pending', ?)",
+                rows,
+            )
+
+        self._transaction(work)
+
+    def acquire(self, kind: str) -> Optional[str]:
+        """Lease the next available key of ``kind``, or None when all are taken."""
+
+        def work(now: float) -> Optional[str]:
+            row = self._conn.execute(
+                "SELECT key FROM leases WHERE kind = ? AND "
+                "(status = 'pending' OR (expires_at IS NOT NULL AND expires_at < ?)) "
+                "ORDER BY attempts, key LIMIT 1",
+                (kind, now),
+            ).fetchone()
+            if row:
+                self._take(kind, row[0], now)
+            return row[0] if row else None
+
+        return self._transaction(work)
+
+    def claim(self, kind: str, key: str, redo: bool = False) -> Lease:
+        """Try to lease one specific key and return its row either way.
+
+        The caller holds the lease when the returned ``owner`` is this
+        store's and ``status`` is ``leased``. A ``done`` row is only taken
+        back with ``redo``, e.g. when its recorded file has gone missing.
+        """
+
+        def work(now: float) -> Lease:
+            lease = self._get(kind, key)
+            if lease is None:
+                self._conn.execute(
+                    "INSERT INTO leases (kind, key, status, owner, expires_at, attempts, updated_at) "
+                    "VALUES (?, ?, 'leased', ?, ?, 1, ?)",
+                    (kind, key, self.owner, now + self.ttl, now),
+                )
+            else:
+                expired = lease.expires_at is not None and lease.expires_at < now
+                if lease.status == "pending" or expired or (lease.status == "done" and redo) or (
+                    lease.status == "leased" and lease.owner == self.owner
+                ):
+                    self._take(kind, key, now)
+            return self._get(kind, key)
+
+        return self._transaction(work)
+
+    def complete(
+        self,
+        kind: str,
+        key: str,
+        path: Optional[Path] = None,
+        size: Optional[int] = None,
+        checksum: Optional[str] = None,
+        keep_for: Optional[float] = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leases SET status = 'done', expires_at = ?, path = ?, size = ?, "
+                "checksum = ?, updated_at = ? WHERE kind = ? AND key = ? AND owner = ?",
+                (
+                    None if keep_for is None else now + keep_for,
+                    str(path) if path else None,
+                    size,
+                    checksum,
+                    now,
+                    kind,
+                    key,
+                    self.owner,
+                ),
+            )
+
+    def release(self, kind: str, key: str) -> None:
+        """Give a lease back unfinished so any worker can retry it."""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leases SET status = 'pending', owner = NULL, expires_at = NULL, "
+                "updated_at = ? WHERE kind = ? AND key = ? AND owner = ? AND status = 'leased'",
+                (time.time(), kind, key, self.owner),
+            )
+
+    def renew(self) -> int:
+        """Extend every lease this worker holds; returns how many."""
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE leases SET expires_at = ?, updated_at = ? "
+                "WHERE owner = ? AND status = 'leased'",
+                (now + self.ttl, now, self.owner),
+            )
+        return cursor.rowcount
+
+    def _beat(self) -> None:
+        while not self._stop.wait(self.ttl / 3):
+            try:
+                self.renew()
+            except sqlite3.Error as exc:
+                # Keep trying: the leases only lapse after a full ttl.
+                if self.logger:
+                    self.logger.warn(f"Lease heartbeat failed: {exc}")
+
+    def start(self) -> None:
+        if self._heartbeat:
+            return
+        self._stop.clear()
+        self._heartbeat = threading.Thread(target=self._beat, name="lease-heartbeat", daemon=True)
+        self._heartbeat.start()
+
+    def close(self) -> None:
+        if self._heartbeat:
+            self._stop.set()
+            self._heartbeat.join()
+            self._heartbeat = None
+        with self._lock:
+            self._conn.close()
@@ -1,31 +1,41 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Iterable
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
 
 from .theme import Theme
 
+# (level, rendered line); set while a progress renderer owns the terminal.
+LogSink = Callable[[str, str], None]
+
 
 @dataclass
 class Logger:
     prefix: str = "[TikTokDL]"
+    sink: Optional[LogSink] = field(default=None, repr=False)
 
     def _line(self, level: str, message: str) -> str:
         return f"{Theme.MUTED}{self.prefix}{Theme.RESET} {level} {message}{Theme.RESET}"
 
+    def write(self, text: str, level: str = "info") -> None:
+        sink = self.sink
+        if sink:
+            sink(level, text)
+        else:
+            print(text)
+
     def info(self, message: str) -> None:
-        print(self._line(f"{Theme.PRIMARY}INFO", message))
+        self.write(self._line(f"{Theme.PRIMARY}INFO", message), "info")
 
     def success(self, message: str) -> None:
-        print(self._line(f"{Theme.SUCCESS}OK", message))
+        self.write(self._line(f"{Theme.SUCCESS}OK", message), "success")
 
     def warn(self, message: str) -> None:
-        print(self._line(f"{Theme.WARNING}WARN", message))
+        self.write(self._line(f"{Theme.WARNING}WARN", message), "warn")
 
     def error(self, message: str) -> None:
-        print(self._line(f"{Theme.ERROR}ERROR", message))
+        self.write(self._line(f"{Theme.ERROR}ERROR", message), "error")
 
     def bullet_list(self, title: str, items: Iterable[str]) -> None:
         self.info(title)
-        for item in items:
-            print(f"  • {item}")
+        self.write("\n".join(f"  • {item}" for item in items))
@@ -0,0 +1,161 @@
+"""Persistent record of completed downloads, shared across runs."""
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .models import AccountWatermark, ManifestEntry, ThumbnailEntry
+
+MANIFEST_FILENAME = "manifest.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    checksum TEXT,
+    algorithm TEXT,
+    completed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    username TEXT PRIMARY KEY,
+    newest_id TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS thumbnails (
+    video_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class DownloadManifest:
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, state_dir: Path) -> "DownloadManifest":
+        return cls(state_dir / MANIFEST_FILENAME)
+
+    def lookup(self, video_id: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, path, size, checksum, algorithm, completed_at "
+                "FROM videos WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return ManifestEntry(
+            video_id=row[0],
+            path=Path(row[1]),
+            size=int(row[2]),
+            checksum=row[3],
+            algorithm=row[4],
+            completed_at=float(row[5]),
+        )
+
+    def contains(self, video_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+            ).fetchone()
+        return row is not None
+
+    def record(
+        self,
+        video_id: str,
+        path: Path,
+        size: int,
+        checksum: Optional[str],
+        algorithm: Optional[str] = "sha256",
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO videos "
+                "(video_id, path, size, checksum, algorithm, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, str(path), int(size), checksum, algorithm, time.time()),
+            )
+
+    def forget(self, video_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM videos WHERE video_id = ?", (video_id,))
+
+    def watermark(self, username: str) -> Optional[AccountWatermark]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT username, newest_id, updated_at "
+                "FROM accounts WHERE username = ?",
+                (username.lower(),),
+            ).fetchone()
+        if not row:
+            return None
+        return AccountWatermark(
+            username=row[0],
+            newest_id=row[1],
+            updated_at=float(row[2]),
+        )
+
+    def update_watermark(self, username: str, newest_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO accounts (username, newest_id, updated_at) "
+                "VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET "
+                "newest_id = excluded.newest_id, "
+                "updated_at = excluded.updated_at",
+                (username.lower(), newest_id, time.time()),
+            )
+
+    def thumbnail(self, video_id: str) -> Optional[ThumbnailEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, path, etag, last_modified, fetched_at "
+                "FROM thumbnails WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return ThumbnailEntry(
+            video_id=row[0],
+            path=Path(row[1]),
+            etag=row[2],
+            last_modified=row[3],
+            fetched_at=float(row[4]),
+        )
+
+    def record_thumbnail(
+        self,
+        video_id: str,
+        path: Path,
+        etag: Optional[str],
+        last_modified: Optional[str],
+    ) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO thumbnails "
+                "(video_id, path, etag, last_modified, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (video_id, str(path), etag, last_modified, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
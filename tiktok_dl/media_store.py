@@ -0,0 +1,104 @@
+"""Content-addressed media store shared by every account and run."""
+from __future__ import annotations
+
+import os
+import shutil
+from pathlib import Path
+from typing import Iterator, Optional, Set
+
+from .logging import Logger
+from .manifest import DownloadManifest
+from .models import GcReport
+
+STORE_DIRNAME = "store"
+
+
+class MediaStore:
+    """Each video is kept once under its ID; run folders only hold links.
+
+    Objects live at ``store/<last two digits>/<video id>.mp4`` next to the
+    partial journal, so a finished transfer is moved in with one rename.
+    Run folders get a hardlink, or a symlink where hardlinks are not
+    possible, or as a last resort a copy, so garbage collection can never
+    take the only copy of a video. :meth:`gc` removes objects that no run
+    folder links to anymore.
+    """
+
+    def __init__(self, root: Path) -> None:
+        root.mkdir(parents=True, exist_ok=True)
+        self.root = root
+
+    @classmethod
+    def open(cls, state_dir: Path) -> "MediaStore":
+        return cls(state_dir / STORE_DIRNAME)
+
+    def path_for(self, video_id: str) -> Path:
+        return self.root / video_id[-2:].rjust(2, "_") / f"{video_id}.mp4"
+
+    def has(self, video_id: str, size: Optional[int] = None) -> bool:
+        try:
+            actual = self.path_for(video_id).stat().st_size
+        except OSError:
+            return False
+        return size is None or actual == size
+
+    def link(self, video_id: str, target: Path) -> None:
+        source = self.path_for(video_id)
+        try:
+            os.link(source, target)
+            return
+        except OSError:
+            pass
+        try:
+            os.symlink(source, target)
+        except OSError:
+            shutil.copy2(source, target)
+
+    def objects(self) -> Iterator[Path]:
+        return self.root.glob("*/*.mp4")
+
+    def _symlinked(self, download_dir: Path) -> Set[Path]:
+        referenced: Set[Path] = set()
+        root = self.root.resolve()
+        for dirpath, dirnames, filenames in os.walk(download_dir):
+            # Never descend into the state directory itself.
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                path = Path(dirpath) / name
+                if path.is_symlink():
+                    resolved = path.resolve()
+                    if resolved.is_relative_to(root):
+                        referenced.add(resolved)
+        return referenced
+
+    def gc(
+        self,
+        download_dir: Path,
+        manifest: Optional[DownloadManifest] = None,
+        logger: Optional[Logger] = None,
+        dry_run: bool = False,
+    ) -> GcReport:
+        """Delete objects that no file under ``download_dir`` links to."""
+        symlinked = self._symlinked(download_dir)
+        report = GcReport()
+        for path in self.objects():
+            report.scanned += 1
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if stat.st_nlink > 1 or path.resolve() in symlinked:
+                continue
+            report.removed += 1
+            report.bytes_freed += stat.st_size
+            if dry_run:
+                continue
+            path.unlink(missing_ok=True)
+            if manifest:
+                manifest.forget(path.stem)
+            if logger:
+                logger.info(f"Removed unreferenced {path.name}")
+        for shard in self.root.iterdir():
+            if shard.is_dir() and not any(shard.iterdir()) and not dry_run:
+                shutil.rmtree(shard, ignore_errors=True)
+        return report
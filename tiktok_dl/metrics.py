@@ -0,0 +1,144 @@
+"""Run metrics: a JSON-lines event log and a Prometheus textfile."""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+PREFIX = "tiktok_dl"
+
+MetricKey = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, Any]) -> MetricKey:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Thread-safe counters, gauges and phase timers for one run.
+
+    Phases and per-video outcomes are appended to the JSON-lines file as
+    they happen, so a crashed run still leaves a trail. Aggregates are
+    written to the Prometheus textfile on :meth:`close`, by atomic rename,
+    for node_exporter's textfile collector. Without either path the
+    aggregates are still kept in memory, so services can record
+    unconditionally.
+    """
+
+    def __init__(self, jsonl_path: Optional[Path] = None, textfile_path: Optional[Path] = None) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[MetricKey, float] = {}
+        self._gauges: Dict[MetricKey, float] = {}
+        self.textfile_path = textfile_path
+        self._jsonl: Optional[TextIO] = None
+        if jsonl_path:
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl = jsonl_path.open("a", encoding="utf-8")
+        self.run_id = f"{int(time.time())}-{os.getpid()}"
+        self.started = time.perf_counter()
+
+    def incr(self, name: str, amount: float = 1.0, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def gauge(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._gauges[_key(name, labels)] = value
+
+    def high_water(self, name: str, value: float, **labels: Any) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            if value > self._gauges.get(key, float("-inf")):
+                self._gauges[key] = value
+
+    def value(self, name: str, **labels: Any) -> float:
+        key = _key(name, labels)
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key, 0.0))
+
+    def observe(self, phase: str, seconds: float) -> None:
+        """Add ``seconds`` to a phase's totals without logging an event."""
+        self.incr("phase_seconds_total", seconds, phase=phase)
+        self.incr("phase_runs_total", phase=phase)
+
+    def record_phase(self, phase: str, seconds: float, **fields: Any) -> None:
+        self.observe(phase, seconds)
+        self.event("phase", phase=phase, seconds=round(seconds, 4), **fields)
+
+    @contextmanager
+    def phase(self, phase: str, **fields: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_phase(phase, time.perf_counter() - started, **fields)
+
+    def event(self, kind: str, **fields: Any) -> None:
+        if not self._jsonl:
+            return
+        line = self._event_line(kind, fields)
+        with self._lock:
+            # close() may have run since the check above.
+            if self._jsonl:
+                self._jsonl.write(line + "\n")
+                self._jsonl.flush()
+
+    def _event_line(self, kind: str, fields: Dict[str, Any]) -> str:
+        return json.dumps(
+            {"ts": round(time.time(), 3), "run": self.run_id, "event": kind, **fields},
+            default=str,
+        )
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            series = [(k, v, "counter") for k, v in self._counters.items()]
+            series += [(k, v, "gauge") for k, v in self._gauges.items()]
+        lines = []
+        typed = set()
+        for (name, labels), value, kind in sorted(series):
+            full = f"{PREFIX}_{name}"
+            if full not in typed:
+                typed.add(full)
+                lines.append(f"# TYPE {full} {kind}")
+            label_text = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+            sample = f"{full}{{{label_text}}}" if label_text else full
+            lines.append(f"{sample} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self) -> None:
+        """Publish the current totals; long-running modes call this as they go."""
+        if not self.textfile_path:
+            return
+        self.textfile_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.textfile_path.with_name(self.textfile_path.name + ".tmp")
+        tmp.write_text(self.render_prometheus(), encoding="utf-8")
+        os.replace(tmp, self.textfile_path)
+
+    def close(self) -> None:
+        elapsed = time.perf_counter() - self.started
+        video_bytes = self.value("bytes_total", kind="video")
+        self.gauge("run_duration_seconds", elapsed)
+        self.gauge("last_run_timestamp_seconds", time.time())
+        self.gauge("throughput_bytes_per_second", video_bytes / elapsed if elapsed else 0.0)
+        self.write_textfile()
+        line = self._event_line("run", {"seconds": round(elapsed, 3), "bytes": int(video_bytes)})
+        # The run record and the detach share one lock hold, so no event
+        # from a straggling worker can land after it.
+        with self._lock:
+            jsonl, self._jsonl = self._jsonl, None
+            if jsonl:
+                jsonl.write(line + "\n")
+                jsonl.close()
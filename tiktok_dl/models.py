@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 @dataclass
@@ -18,18 +18,140 @@ class UserProfile:
     private: bool
 
 
-@dataclass
+# Slotted: a large account keeps tens of thousands of these alive at once.
+@dataclass(slots=True)
 class VideoItem:
     id: str
     url: str
     description: Optional[str] = None
     thumbnail_url: Optional[str] = None
+    # Direct media URL and byte size from TikWM, when discovery had them.
+    play_url: Optional[str] = None
+    size: Optional[int] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadResult:
     index: int
     video: VideoItem
     success: bool
     status: str
     target: Path
+    size: int = 0
+    checksum: Optional[str] = None
+    elapsed: float = 0.0
+
+
+@dataclass
+class ManifestEntry:
+    video_id: str
+    path: Path
+    size: int
+    checksum: Optional[str]
+    algorithm: Optional[str]
+    completed_at: float
+
+
+@dataclass
+class DiscoveryOutcome:
+    """Filled in by discovery: whether every page of the account was read."""
+
+    failed_pages: int = 0
+    # Stopped before the end: max_pages with pages still full, or a --count limit.
+    truncated: bool = False
+    # Posts skipped because the manifest already has them.
+    known: List[str] = field(default_factory=list)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_pages and not self.truncated
+
+
+@dataclass
+class AccountWatermark:
+    username: str
+    newest_id: Optional[str]
+    updated_at: float
+
+
+@dataclass
+class VerifyReport:
+    checked: int = 0
+    cached: int = 0
+    missing: int = 0
+    mismatched: int = 0
+    bytes_hashed: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def issues(self) -> int:
+        return self.missing + self.mismatched
+
+
+@dataclass
+class ThumbnailEntry:
+    video_id: str
+    path: Path
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+@dataclass
+class JournalEntry:
+    video_id: str
+    url: str
+    target: Path
+    expected_size: Optional[int]
+    received: int
+    updated_at: float
+    # "direct" or "ytdlp": the two may serve different renditions.
+    source: str = "ytdlp"
+
+
+@dataclass
+class GcReport:
+    scanned: int = 0
+    removed: int = 0
+    bytes_freed: int = 0
+
+
+@dataclass
+class Job:
+    id: int
+    username: str
+    options: Dict[str, Any]
+    status: str
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    done: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    bytes: int = 0
+    target_dir: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class Lease:
+    kind: str
+    key: str
+    status: str
+    owner: Optional[str]
+    expires_at: Optional[float]
+    attempts: int
+    path: Optional[Path] = None
+    size: Optional[int] = None
+    checksum: Optional[str] = None
+
+
+@dataclass
+class WatchedAccount:
+    name: str
+    interval: float
+    next_due: float
+    # Smoothed count of new posts per poll; busier accounts go first.
+    posts_per_poll: float = 0.0
+    polls: int = 0
+    failures: int = 0
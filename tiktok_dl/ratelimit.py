@@ -0,0 +1,236 @@
+"""Thread-safe, per-host adaptive rate limiting."""
+from __future__ import annotations
+
+import ipaddress
+import re
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .logging import Logger
+
+MEDIA_HOST = "tiktok.com"
+API_HOST = "tikwm.com"
+HOST_ALIASES = {
+    "tiktokcdn.com": MEDIA_HOST,
+    "tiktokcdn-us.com": MEDIA_HOST,
+    "tiktokv.com": MEDIA_HOST,
+}
+THROTTLE_PATTERN = re.compile(r"HTTP Error (403|429)")
+# Set on a request to keep it out of the session adapter's limiter.
+UNMETERED_HEADER = "X-TikTokDL-Unmetered"
+
+
+def budget_key(url_or_host: str) -> str:
+    host = urlparse(url_or_host).hostname if "//" in url_or_host else url_or_host
+    host = (host or "").lower()
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        pass
+    else:
+        # Unrelated addresses must not share a budget through their last octets.
+        return host
+    parts = host.split(".")
+    domain = ".".join(parts[-2:]) if len(parts) >= 2 else host
+    return HOST_ALIASES.get(domain, domain)
+
+
+def is_throttle_error(exc: BaseException) -> bool:
+    return bool(THROTTLE_PATTERN.search(str(exc)))
+
+
+class TokenBucket:
+    """Classic token bucket; ``rate`` of ``None`` admits everything."""
+
+    def __init__(self, rate: Optional[float]) -> None:
+        self._lock = threading.Lock()
+        self._rate = rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def rate(self) -> Optional[float]:
+        return self._rate
+
+    @property
+    def capacity(self) -> float:
+        return max(1.0, self._rate or 1.0)
+
+    def set_rate(self, rate: Optional[float]) -> None:
+        with self._lock:
+            self._refill(time.monotonic())
+            self._rate = rate
+            self._tokens = min(self._tokens, self.capacity)
+
+    def _refill(self, now: float) -> None:
+        if self._rate:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                if self._rate is None:
+                    return waited
+                self._refill(time.monotonic())
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self._rate
+            time.sleep(delay)
+            waited += delay
+
+    def refund(self) -> None:
+        """Return a token that was acquired but never spent."""
+        with self._lock:
+            if self._rate is not None:
+                self._refill(time.monotonic())
+                self._tokens = min(self.capacity, self._tokens + 1)
+
+
+class Ticket:
+    """Admission to a host's budget, paid for before the work was queued.
+
+    The first :meth:`spend` on the reserved host uses the prepaid token;
+    later ones (retries, a fallback source) acquire as usual. A token that
+    was never spent goes back to the bucket on :meth:`refund`.
+    """
+
+    def __init__(self, limiter: "AdaptiveRateLimiter", key: Optional[str] = None) -> None:
+        self.limiter = limiter
+        self.key = key
+        self.paid = key is not None
+
+    def spend(self, url_or_host: str) -> None:
+        if self.paid and budget_key(url_or_host) == self.key:
+            self.paid = False
+            return
+        self.limiter.acquire(url_or_host)
+
+    def refund(self) -> None:
+        if self.paid:
+            self.paid = False
+            self.limiter.refund(self.key)
+
+
+class AdaptiveRateLimiter:
+    """One token bucket per upstream host with AIMD rate adjustment.
+
+    Work is admitted through :meth:`acquire` before it starts. A 403/429
+    halves the host's rate; each success raises it by a few percent, up to
+    twice the configured rate (or without bound when none was configured).
+    Hosts without a configured rate are unlimited until their first
+    throttle, which seeds the rate from the observed request rate.
+    """
+
+    DECREASE = 0.5
+    INCREASE = 0.05
+    FLOOR = 1 / 60
+
+    def __init__(self, per_minute: Optional[Dict[str, Optional[float]]] = None, logger: Optional[Logger] = None) -> None:
+        self.logger = logger
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._ceilings: Dict[str, Optional[float]] = {}
+        self._recent: Dict[str, Deque[float]] = {}
+        self._governed = set(per_minute or ())
+        for host, rate in (per_minute or {}).items():
+            per_second = rate / 60 if rate else None
+            self._buckets[host] = TokenBucket(per_second)
+            self._ceilings[host] = per_second * 2 if per_second else None
+
+    def _bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(None)
+                self._ceilings[key] = None
+            return bucket
+
+    def governs(self, url_or_host: str) -> bool:
+        """Whether the host's budget was configured, rate or not."""
+        return budget_key(url_or_host) in self._governed
+
+    def rate(self, url_or_host: str) -> Optional[float]:
+        """Current rate in requests per minute, ``None`` when unlimited."""
+        rate = self._bucket(budget_key(url_or_host)).rate
+        return rate * 60 if rate else None
+
+    def acquire(self, url_or_host: str) -> float:
+        key = budget_key(url_or_host)
+        waited = self._bucket(key).acquire()
+        now = time.monotonic()
+        with self._lock:
+            recent = self._recent.setdefault(key, deque())
+            recent.append(now)
+            while recent and now - recent[0] > 60:
+                recent.popleft()
+        return waited
+
+    def reserve(self, url_or_host: str) -> Ticket:
+        """Acquire a token now for a request that a worker sends later."""
+        self.acquire(url_or_host)
+        return Ticket(self, budget_key(url_or_host))
+
+    def refund(self, url_or_host: str) -> None:
+        self._bucket(budget_key(url_or_host)).refund()
+
+    def throttled(self, url_or_host: str) -> None:
+        key = budget_key(url_or_host)
+        bucket = self._bucket(key)
+        with self._lock:
+            current = bucket.rate
+            if current is None:
+                current = max(len(self._recent.get(key, ())), 1) / 60
+            new_rate = max(self.FLOOR, current * self.DECREASE)
+        bucket.set_rate(new_rate)
+        if self.logger:
+            self.logger.warn(f"{key} is throttling requests. Lowering rate to {new_rate * 60:.1f}/min.")
+
+    def succeeded(self, url_or_host: str) -> None:
+        key = budget_key(url_or_host)
+        bucket = self._bucket(key)
+        current = bucket.rate
+        if current is None:
+            return
+        ceiling = self._ceilings.get(key)
+        new_rate = current * (1 + self.INCREASE)
+        if ceiling is not None:
+            new_rate = min(new_rate, ceiling)
+        bucket.set_rate(new_rate)
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter that admits requests to the governed hosts through the limiter.
+
+    Only hosts whose budget the limiter was configured with (the media and
+    API hosts) are metered, and only their 403/429s lower the rate.
+    Requests carrying :data:`UNMETERED_HEADER` are sent as they are: cover
+    images, where a 403 is just an expired signed URL, and direct media
+    fetches, which the download service meters per video itself.
+    """
+
+    def __init__(self, rate_limiter: Optional[AdaptiveRateLimiter] = None, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.rate_limiter = rate_limiter
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        unmetered = request.headers.pop(UNMETERED_HEADER, None)
+        url = request.url or ""
+        if unmetered or not self.rate_limiter or not self.rate_limiter.governs(url):
+            return super().send(request, **kwargs)
+        self.rate_limiter.acquire(url)
+        response = super().send(request, **kwargs)
+        if response.status_code in (403, 429):
+            self.rate_limiter.throttled(url)
+        elif response.status_code < 400:
+            self.rate_limiter.succeeded(url)
+        return response
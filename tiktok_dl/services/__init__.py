@@ -1 +1,4 @@
 """Domain services for TikTok downloading."""
+
+TIKWM_API_BASE = "https://www.tikwm.com/api"
+TIKTOK_WEB_BASE = "https://www.tiktok.com"
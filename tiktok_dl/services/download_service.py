@@ -1,33 +1,60 @@
 from __future__ import annotations
 
+import os
 import re
+import threading
 import time
-from collections import deque
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from datetime import datetime
-from hashlib import sha256
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Optional, Set
 from urllib.parse import urlparse
 
-import yt_dlp
-
+from ..checksums import DEFAULT_ALGORITHM, ProgressHasher, write_checksum
+from ..exports import ResultExporter
+from ..direct import DirectDownloader, DirectDownloadError
+from ..journal import DownloadJournal, JournalTracker
+from ..leases import VIDEO, LeaseStore
 from ..logging import Logger
+from ..manifest import DownloadManifest
+from ..media_store import MediaStore
+from ..metrics import Metrics
 from ..models import DownloadResult, VideoItem
+from ..ratelimit import API_HOST, MEDIA_HOST, AdaptiveRateLimiter, Ticket, budget_key, is_throttle_error
+from ..ytdl import ProcessYoutubeDLPool, ProgressHook, YoutubeDLPool, chain_hooks
+
+if TYPE_CHECKING:
+    from ..ui.progress import ProgressRenderer
 
 ALLOWED_HOSTS = {"www.tiktok.com", "m.tiktok.com", "tiktok.com"}
 SAFE_SLUG = re.compile(r"[^A-Z0-9\-]")
 
 
+class DownloadCancelled(Exception):
+    """Raised from the progress hook to abort a transfer in progress."""
+
+
 def safe_folder(username: str) -> Path:
     slug = SAFE_SLUG.sub("_", username.upper()) or "UNKNOWN"
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     return Path(slug) / timestamp
 
 
-def write_checksum(target: Path) -> None:
-    digest = sha256(target.read_bytes()).hexdigest()
-    target.with_suffix(target.suffix + ".sha256").write_text(digest, encoding="utf-8")
+def ydl_options(proxy: Optional[str] = None) -> Dict[str, Any]:
+    opts: Dict[str, Any] = {
+        "format": "best",
+        "quiet": True,
+        "retries": 3,
+        "noprogress": True,
+        "nocheckcertificate": True,
+        # Resume an existing .part file with a Range request.
+        "continuedl": True,
+        # Keep the file byte-identical to what the progress hook hashed.
+        "fixup": "never",
+    }
+    if proxy:
+        opts["proxy"] = proxy
+    return opts
 
 
 class DownloadService:
@@ -39,87 +66,425 @@ class DownloadService:
         proxy: Optional[str],
         logger: Logger,
         rate_limit: Optional[int] = None,
+        manifest: Optional[DownloadManifest] = None,
+        checksum_algorithm: str = DEFAULT_ALGORITHM,
+        ydl_pool: Optional[YoutubeDLPool | ProcessYoutubeDLPool] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        journal: Optional[DownloadJournal] = None,
+        store: Optional[MediaStore] = None,
+        allowed_hosts: Optional[Iterable[str]] = None,
+        metrics: Optional[Metrics] = None,
+        progress: Optional[ProgressRenderer] = None,
+        exporter: Optional[ResultExporter] = None,
+        on_result: Optional[Callable[[DownloadResult], None]] = None,
+        window: int = 0,
+        max_consecutive_failures: int = 0,
+        leases: Optional[LeaseStore] = None,
+        direct: Optional[DirectDownloader] = None,
     ) -> None:
         self.base_dir = base_dir
         self.username = username
         self.max_workers = max(1, int(max_workers))
         self.proxy = proxy
         self.logger = logger
-        self.rate_limit = rate_limit
-        self.completed_window: deque[float] = deque(maxlen=rate_limit or 0)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter({MEDIA_HOST: rate_limit}, logger)
+        self.manifest = manifest
+        self.checksum_algorithm = checksum_algorithm
+        self.journal = journal
+        self.store = store
+        self.allowed_hosts = set(allowed_hosts or ALLOWED_HOSTS)
+        self.metrics = metrics or Metrics()
+        self.progress = progress
+        self.exporter = exporter
+        self.on_result = on_result
+        self.window = max(1, int(window)) if window else self.max_workers * 2
+        self.max_consecutive_failures = max(0, int(max_consecutive_failures))
+        self.leases = leases
+        self.direct = direct
+        self.busy_seconds = 0.0
+        self._busy_lock = threading.Lock()
+        self._failure_streak = 0
+        self._cancelled = threading.Event()
+        self._owns_pool = ydl_pool is None
+        self.ydl_pool = ydl_pool or YoutubeDLPool(ydl_options(proxy))
         self.target_dir = base_dir / safe_folder(username)
-        self.target_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        """Stop starting new downloads and abort the ones in progress.
+
+        Safe to call from any thread. Aborted videos finish with status
+        ``cancelled``; with a journal their partial files are kept, so the
+        next run resumes them.
+        """
+        self._cancelled.set()
+
+    def _abort_if_cancelled(self, status: Dict[str, Any]) -> None:
+        # A finished transfer is committed rather than left as a full partial.
+        if status.get("status") == "downloading" and self._cancelled.is_set():
+            raise DownloadCancelled()
 
     def _allowed_url(self, url: str) -> bool:
         try:
             host = urlparse(url).netloc.lower()
         except Exception:
             return False
-        return host in ALLOWED_HOSTS
+        return host in self.allowed_hosts
 
-    def _respect_rate_limit(self) -> None:
-        if not self.rate_limit:
+    def _allowed_play_url(self, url: str) -> bool:
+        try:
+            parsed = urlparse(url)
+        except Exception:
+            return False
+        if parsed.scheme not in ("http", "https"):
+            return False
+        if parsed.netloc.lower() in self.allowed_hosts:
+            return True
+        # TikWM hands out media on its own host or on TikTok's CDN.
+        return bool(parsed.hostname) and budget_key(parsed.hostname) in (MEDIA_HOST, API_HOST)
+
+    def _reuse_previous(
+        self, index: int, video: VideoItem, target: Path
+    ) -> Optional[DownloadResult]:
+        entry = self.manifest.lookup(video.id) if self.manifest else None
+        if self.store and self.store.has(video.id, entry.size if entry else None):
+            self.store.link(video.id, target)
+            if entry and entry.checksum:
+                write_checksum(target, entry.checksum, entry.algorithm or DEFAULT_ALGORITHM)
+            size = entry.size if entry else target.stat().st_size
+            checksum = entry.checksum if entry else None
+            return DownloadResult(index, video, True, "linked", target, size, checksum)
+        if not entry:
+            return None
+        return self._link_existing(
+            index, video, target, entry.path, entry.size, entry.checksum, entry.algorithm
+        )
+
+    def _link_existing(
+        self,
+        index: int,
+        video: VideoItem,
+        target: Path,
+        source: Optional[Path],
+        size: Optional[int],
+        checksum: Optional[str],
+        algorithm: Optional[str],
+    ) -> Optional[DownloadResult]:
+        try:
+            if not source or source.stat().st_size != size:
+                return None
+        except OSError:
+            return None
+
+        try:
+            os.link(source, target)
+        except OSError:
+            # Different filesystem or no hardlink support: point at the original.
+            return DownloadResult(index, video, True, "linked", source, size, checksum)
+        if checksum:
+            write_checksum(target, checksum, algorithm or DEFAULT_ALGORITHM)
+        return DownloadResult(index, video, True, "linked", target, size, checksum)
+
+    def _commit(self, video: VideoItem, partial: Path, target: Path) -> Path:
+        """Move a finished transfer into place and return the path to record."""
+        final = self.store.path_for(video.id) if self.store else target
+        if final != partial:
+            final.parent.mkdir(parents=True, exist_ok=True)
+            if self.journal:
+                self.journal.commit(video.id, partial, final)
+            else:
+                os.replace(partial, final)
+        if self.store:
+            self.store.link(video.id, target)
+        return final
+
+    def _record(self, video: VideoItem, target: Path, digest: str) -> None:
+        if not self.manifest:
             return
-        now = time.time()
-        if len(self.completed_window) == self.completed_window.maxlen:
-            span = now - self.completed_window[0]
-            if span < 60:
-                sleep_for = 60 - span
-                self.logger.warn(f"Rate limit hit. Sleeping for {sleep_for:.1f}s")
-                time.sleep(sleep_for)
-        self.completed_window.append(time.time())
-
-    def _download(self, index: int, video: VideoItem) -> DownloadResult:
+        try:
+            self.manifest.record(
+                video.id,
+                target,
+                target.stat().st_size,
+                digest,
+                self.checksum_algorithm,
+            )
+        except Exception as exc:
+            self.logger.warn(f"Could not update manifest for {video.id}: {exc}")
+
+    def _download(self, index: int, video: VideoItem, ticket: Ticket) -> DownloadResult:
         target = self.target_dir / f"{index:04d}_{video.id}.mp4"
         if target.exists() and target.stat().st_size > 1024:
-            return DownloadResult(index, video, True, "skipped", target)
+            return DownloadResult(index, video, True, "skipped", target, target.stat().st_size)
+
+        reused = self._reuse_previous(index, video, target)
+        if reused:
+            return reused
 
         if not self._allowed_url(video.url):
             return DownloadResult(index, video, False, "blocked", target)
 
-        opts = {
-            "outtmpl": str(target),
-            "format": "best",
-            "quiet": True,
-            "retries": 3,
-            "noprogress": True,
-            "nocheckcertificate": True,
-        }
-        if self.proxy:
-            opts["proxy"] = self.proxy
+        if not self.leases:
+            return self._fetch(index, video, target, ticket)
+        lease = self.leases.claim(VIDEO, video.id)
+        if lease.status == "done":
+            linked = self._link_existing(
+                index, video, target, lease.path, lease.size, lease.checksum, self.checksum_algorithm
+            )
+            if linked:
+                return linked
+            # Recorded as done but the file is gone: fetch it again.
+            lease = self.leases.claim(VIDEO, video.id, redo=True)
+        if lease.status != "leased" or lease.owner != self.leases.owner:
+            # Not ours to report as done: the watermark must not pass it until it lands.
+            return DownloadResult(index, video, False, "remote", target)
+        result = self._fetch(index, video, target, ticket)
+        if result.status in ("downloaded", "linked"):
+            self.leases.complete(VIDEO, video.id, result.target, result.size, result.checksum)
+        else:
+            self.leases.release(VIDEO, video.id)
+        return result
+
+    def _fetch(self, index: int, video: VideoItem, target: Path, ticket: Ticket) -> DownloadResult:
+        if not self.journal:
+            return self._transfer(index, video, target, ticket)
+        with self.journal.lock(video.id):
+            # Another job may have finished this video while we waited.
+            reused = self._reuse_previous(index, video, target)
+            return reused or self._transfer(index, video, target, ticket)
+
+    def _transfer(self, index: int, video: VideoItem, target: Path, ticket: Ticket) -> DownloadResult:
+        # With a journal the transfer goes to a per-video partial that
+        # survives restarts; the run folder only ever sees the finished file.
+        partial = self.journal.partial_path(video.id) if self.journal else target
+        direct = self._direct_source(video)
+        source = "direct" if direct else "ytdlp"
+        tracker = self.journal.tracker(video, target, source) if self.journal else None
+        if tracker and tracker.entry.received:
+            self.logger.info(
+                f"Resuming video {video.id} from {tracker.entry.received / 1024 / 1024:.1f} MB"
+            )
 
         for attempt in range(1, 4):
+            if self._cancelled.is_set():
+                return DownloadResult(index, video, False, "cancelled", target)
+            if attempt > 1:
+                self.metrics.incr("download_retries_total")
+            hasher = ProgressHasher(self.checksum_algorithm)
             try:
-                with yt_dlp.YoutubeDL(opts) as ydl:
-                    ydl.download([video.url])
-                if target.exists() and target.stat().st_size > 1024:
-                    write_checksum(target)
-                    self._respect_rate_limit()
-                    return DownloadResult(index, video, True, "downloaded", target)
+                hook = self._hooks(hasher, tracker)
+                expected = tracker.entry.expected_size if tracker else None
+                if not (tracker and self.journal.finished_partial(video.id, expected)):
+                    if direct:
+                        try:
+                            # Same media budget as yt-dlp, whatever host the play URL is on.
+                            ticket.spend(MEDIA_HOST)
+                            self.direct.download(video.play_url, str(partial), hook, video.size)
+                        except DirectDownloadError as exc:
+                            # A 403 on a signed URL usually means it expired; only 429 is throttling.
+                            if exc.status == 429:
+                                self.metrics.incr("throttle_events_total", source="media")
+                                self.rate_limiter.throttled(MEDIA_HOST)
+                            self.logger.warn(
+                                f"Direct URL failed for video {video.id}, using yt-dlp: {exc}"
+                            )
+                            self.metrics.incr("direct_fallbacks_total")
+                            direct = False
+                            tracker = self._restart_partial(video, target, partial)
+                            hasher = ProgressHasher(self.checksum_algorithm)
+                            hook = self._hooks(hasher, tracker)
+                            expected = None
+                    if not direct:
+                        ticket.spend(video.url)
+                        self.ydl_pool.download(video.url, str(partial), hook)
+                if partial.exists() and partial.stat().st_size > 1024:
+                    if expected and partial.stat().st_size != expected:
+                        self.journal.discard(video.id, remove_partial=True)
+                        raise IOError(
+                            f"size mismatch ({partial.stat().st_size} of {expected} bytes)"
+                        )
+                    digest = hasher.hexdigest(partial)
+                    size = partial.stat().st_size
+                    self.metrics.observe("checksum", hasher.elapsed)
+                    self.metrics.incr("bytes_total", size, kind="video")
+                    final = self._commit(video, partial, target)
+                    write_checksum(target, digest, self.checksum_algorithm)
+                    self._record(video, final, digest)
+                    self.rate_limiter.succeeded(MEDIA_HOST if direct else video.url)
+                    return DownloadResult(index, video, True, "downloaded", target, size, digest)
             except Exception as exc:
+                # yt-dlp may wrap the hook's exception, so check the flag itself.
+                if self._cancelled.is_set():
+                    return DownloadResult(index, video, False, "cancelled", target)
+                if is_throttle_error(exc):
+                    self.metrics.incr("throttle_events_total", source="media")
+                    self.rate_limiter.throttled(video.url)
                 self.logger.warn(
                     f"Attempt {attempt} failed for video {video.id}: {exc}"
                 )
-                time.sleep(attempt)
+                self._cancelled.wait(attempt)
         return DownloadResult(index, video, False, "failed", target)
 
-    def download_all(self, videos: Iterable[VideoItem]) -> List[DownloadResult]:
-        videos = list(videos)
-        if not videos:
-            return []
+    def _hooks(self, hasher: ProgressHasher, tracker: Optional[JournalTracker]) -> ProgressHook:
+        return chain_hooks(
+            self._abort_if_cancelled,
+            hasher,
+            tracker,
+            self.progress.hook if self.progress else None,
+        )
+
+    def _restart_partial(
+        self, video: VideoItem, target: Path, partial: Path
+    ) -> Optional[JournalTracker]:
+        # yt-dlp may pick another rendition than the direct URL: never splice the two.
+        if self.journal:
+            return self.journal.tracker(video, target, "ytdlp")
+        partial.unlink(missing_ok=True)
+        partial.with_name(partial.name + ".part").unlink(missing_ok=True)
+        return None
 
-        self.logger.info(
-            f"Starting parallel download with {self.max_workers} worker(s) into {self.target_dir}"
+    def _track_failures(self, result: DownloadResult) -> None:
+        if result.status == "failed":
+            limit = self.max_consecutive_failures
+            with self._busy_lock:
+                self._failure_streak += 1
+                streak = self._failure_streak
+                stop = bool(limit) and streak >= limit and not self._cancelled.is_set()
+                if stop:
+                    self.cancel()
+            if stop:
+                self.logger.error(
+                    f"Stopping @{self.username} after {streak} failed downloads in a row."
+                )
+        elif result.success:
+            with self._busy_lock:
+                self._failure_streak = 0
+
+    def _direct_source(self, video: VideoItem) -> bool:
+        return bool(self.direct and video.play_url and self._allowed_play_url(video.play_url))
+
+    def admit(self, video: VideoItem) -> Ticket:
+        """Wait for the media budget before a video is handed to a worker.
+
+        Waiting here rather than in the worker keeps throttled videos from
+        holding pool slots that other accounts could use. The token is
+        returned if the job turns out not to need a transfer.
+        """
+        return self.rate_limiter.reserve(MEDIA_HOST if self._direct_source(video) else video.url)
+
+    def run_job(self, index: int, video: VideoItem, ticket: Optional[Ticket] = None) -> DownloadResult:
+        if self.progress:
+            self.progress.started(video.id)
+        ticket = ticket or Ticket(self.rate_limiter)
+        started = time.perf_counter()
+        try:
+            result = self._download(index, video, ticket)
+        except Exception as exc:
+            self.logger.error(f"Unexpected error downloading {video.id}: {exc}")
+            result = DownloadResult(index, video, False, "failed", self.target_dir)
+        finally:
+            # Skipped, linked or remote videos never used the token they were admitted with.
+            ticket.refund()
+        elapsed = time.perf_counter() - started
+        result.elapsed = elapsed
+        self.metrics.observe("download", elapsed)
+        self.metrics.incr("videos_total", status=result.status)
+        self.metrics.incr("worker_busy_seconds_total", elapsed, worker=threading.current_thread().name)
+        with self._busy_lock:
+            self.busy_seconds += elapsed
+        self._track_failures(result)
+        self.metrics.event(
+            "video",
+            account=self.username,
+            video_id=video.id,
+            status=result.status,
+            seconds=round(elapsed, 4),
         )
+        if self.exporter:
+            try:
+                self.exporter.write(result)
+            except Exception as exc:
+                self.logger.warn(f"Could not export result for {video.id}: {exc}")
+        if self.on_result:
+            try:
+                self.on_result(result)
+            except Exception as exc:
+                self.logger.warn(f"Result callback failed for {video.id}: {exc}")
+        if self.progress:
+            self.progress.finished(
+                result.success or result.status == "remote",
+                result.size if result.status == "downloaded" else 0,
+            )
+        return result
+
+    def iter_downloads(self, videos: Iterable[VideoItem]) -> Iterator[DownloadResult]:
+        """Yield results as downloads finish, with at most ``window`` in flight.
 
-        results: List[DownloadResult] = []
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            future_map = {
-                executor.submit(self._download, idx, video): (idx, video)
-                for idx, video in enumerate(videos, start=1)
-            }
-            for future in as_completed(future_map):
-                results.append(future.result())
-
-        results.sort(key=lambda r: r.index)
-        return results
+        ``videos`` may be a lazy discovery generator: it is only pulled as
+        fast as the window drains, so workers start on the first page while
+        later pages are still loading, and nothing grows with the size of
+        the account. Results come out in completion order. Ctrl-C, closing
+        the generator or :meth:`cancel` drops the videos not yet started
+        and aborts the ones in progress instead of draining the backlog.
+        """
+        self._cancelled.clear()
+        self._failure_streak = 0
+        pending: Set[Future] = set()
+        executor: Optional[ThreadPoolExecutor] = None
+        started = time.perf_counter()
+        busy_before = self.busy_seconds
+        try:
+            for idx, video in enumerate(videos, start=1):
+                if len(pending) >= self.window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from self._collect(done)
+                if self._cancelled.is_set():
+                    break
+                ticket = self.admit(video)
+                if executor is None:
+                    self.target_dir.mkdir(parents=True, exist_ok=True)
+                    self.logger.info(
+                        f"Starting parallel download with {self.max_workers} worker(s) into {self.target_dir}"
+                    )
+                    executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers, thread_name_prefix="download"
+                    )
+                pending.add(executor.submit(self.run_job, idx, video, ticket))
+                if self.progress:
+                    self.progress.queued()
+                self.metrics.high_water("queue_depth_max", len(pending), queue="download")
+
+            if executor is not None and self._cancelled.is_set():
+                executor.shutdown(wait=False, cancel_futures=True)
+                # Futures cancelled by shutdown never wake wait(); drop them here.
+                pending = {future for future in pending if not future.cancelled()}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                yield from self._collect(done)
+        finally:
+            if executor is not None:
+                if pending:
+                    # Interrupted mid-run: stop the workers rather than drain them.
+                    self.cancel()
+                    self.logger.warn(f"Download of @{self.username} interrupted.")
+                executor.shutdown(wait=True, cancel_futures=True)
+                wall = time.perf_counter() - started
+                self.metrics.gauge(
+                    "worker_utilization",
+                    (self.busy_seconds - busy_before) / (wall * self.max_workers),
+                    pool="download",
+                )
+            if self._owns_pool:
+                self.ydl_pool.close()
+
+    def _collect(self, done: Iterable[Future]) -> Iterator[DownloadResult]:
+        for future in done:
+            if not future.cancelled():
+                yield future.result()
+
+    def download_all(self, videos: Iterable[VideoItem]) -> List[DownloadResult]:
+        """Download ``videos`` and return every result, sorted by index."""
+        return sorted(self.iter_downloads(videos), key=lambda r: r.index)
@@ -5,14 +5,25 @@ from typing import Optional
 import requests
 
 from ..logging import Logger
+from ..metrics import Metrics
 from ..models import UserProfile
+from . import TIKWM_API_BASE
 
 
 class ProfileService:
-    def __init__(self, session: requests.Session, timeout: int, logger: Logger) -> None:
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: int,
+        logger: Logger,
+        api_base: str = TIKWM_API_BASE,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
         self.session = session
         self.timeout = timeout
         self.logger = logger
+        self.api_base = api_base.rstrip("/")
+        self.metrics = metrics or Metrics()
 
     def normalize(self, raw: str) -> str:
         raw = (raw or "").strip()
@@ -23,13 +34,17 @@ class ProfileService:
         return raw
 
     def fetch_profile(self, username: str) -> Optional[UserProfile]:
+        with self.metrics.phase("profile", account=self.normalize(username)):
+            return self._fetch_profile(username)
+
+    def _fetch_profile(self, username: str) -> Optional[UserProfile]:
         username = self.normalize(username)
         if not username:
             self.logger.warn("Username is empty.")
             return None
 
         apis = [
-            f"https://www.tikwm.com/api/user/info?unique_id=@{username}",
+            f"{self.api_base}/user/info?unique_id=@{username}",
             f"https://api.tiktokuserinfo.com/user/info?username={username}",
         ]
 
@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Iterable, List, Optional, Tuple
+
+from ..logging import Logger
+from ..metrics import Metrics
+from ..models import DownloadResult, VideoItem
+from ..ratelimit import Ticket
+from .download_service import DownloadService
+
+
+class _AccountJobs:
+    def __init__(self, service: DownloadService) -> None:
+        self.service = service
+        self.pending: Deque[Tuple[int, VideoItem, Ticket]] = deque()
+        self.results: List[DownloadResult] = []
+        self.outstanding = 0
+
+
+class DownloadScheduler:
+    """A single download pool shared by every account in a run.
+
+    Accounts feed their videos in with :meth:`download_all` from their own
+    threads. Workers take one job at a time from each account with pending
+    work in turn, so a large account cannot starve small ones and idle
+    workers pick up whatever account still has videos left.
+    """
+
+    def __init__(
+        self,
+        max_workers: int,
+        logger: Logger,
+        backlog: Optional[int] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.max_workers = max(1, int(max_workers))
+        self.logger = logger
+        self.backlog = backlog or self.max_workers * 2
+        self.metrics = metrics or Metrics()
+        self._started = 0.0
+        self._busy = 0.0
+        self._cond = threading.Condition()
+        self._ready: Deque[_AccountJobs] = deque()
+        self._threads: List[threading.Thread] = []
+        self._accounts: List[_AccountJobs] = []
+        self._stopping = False
+        self._cancelled = False
+
+    def __enter__(self) -> "DownloadScheduler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if exc_info[0] is not None:
+            self.cancel()
+        self.close()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def start(self) -> None:
+        if self._threads:
+            return
+        self._stopping = False
+        self._cancelled = False
+        self._started = time.perf_counter()
+        self._busy = 0.0
+        for number in range(self.max_workers):
+            thread = threading.Thread(
+                target=self._worker, name=f"download-{number + 1}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def close(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+        if self._threads:
+            wall = time.perf_counter() - self._started
+            self.metrics.gauge(
+                "worker_utilization", self._busy / (wall * self.max_workers), pool="scheduler"
+            )
+        self._threads = []
+
+    def cancel(self) -> None:
+        """Cancel every account: queued videos are dropped, running ones aborted."""
+        with self._cond:
+            self._cancelled = True
+            for jobs in self._accounts:
+                jobs.service.cancel()
+                self._drop_pending(jobs)
+            self._cond.notify_all()
+
+    def _drop_pending(self, jobs: _AccountJobs) -> None:
+        # Caller holds self._cond.
+        jobs.outstanding -= len(jobs.pending)
+        for _, _, ticket in jobs.pending:
+            ticket.refund()
+        jobs.pending.clear()
+        if jobs in self._ready:
+            self._ready.remove(jobs)
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready and not self._stopping:
+                    self._cond.wait()
+                if not self._ready:
+                    return
+                jobs = self._ready.popleft()
+                index, video, ticket = jobs.pending.popleft()
+                if jobs.pending:
+                    # Back of the line: the next worker serves another account.
+                    self._ready.append(jobs)
+                self._cond.notify_all()
+
+            started = time.perf_counter()
+            result = jobs.service.run_job(index, video, ticket)
+
+            with self._cond:
+                self._busy += time.perf_counter() - started
+                jobs.results.append(result)
+                jobs.outstanding -= 1
+                self._cond.notify_all()
+
+    def download_all(
+        self, service: DownloadService, videos: Iterable[VideoItem]
+    ) -> List[DownloadResult]:
+        """Queue one account's videos on the shared pool and wait for them.
+
+        At most ``backlog`` videos per account wait in the queue, so a lazy
+        discovery generator is only consumed as fast as the pool drains it.
+        Once the service is cancelled (see :meth:`DownloadService.cancel`)
+        its queued videos are dropped and discovery stops being consumed.
+        """
+        jobs = _AccountJobs(service)
+        with self._cond:
+            if self._cancelled:
+                service.cancel()
+            self._accounts.append(jobs)
+        try:
+            self._feed(jobs, videos)
+            with self._cond:
+                while jobs.outstanding:
+                    if service.cancelled:
+                        self._drop_pending(jobs)
+                    if jobs.outstanding:
+                        self._cond.wait()
+        finally:
+            with self._cond:
+                self._accounts.remove(jobs)
+        return sorted(jobs.results, key=lambda r: r.index)
+
+    def _feed(self, jobs: _AccountJobs, videos: Iterable[VideoItem]) -> None:
+        service = jobs.service
+        for idx, video in enumerate(videos, start=1):
+            if service.cancelled:
+                return
+            if idx == 1:
+                service.target_dir.mkdir(parents=True, exist_ok=True)
+                self.logger.info(f"Queueing downloads for @{service.username} into {service.target_dir}")
+            with self._cond:
+                while len(jobs.pending) >= self.backlog and not service.cancelled:
+                    self._cond.wait()
+                if service.cancelled:
+                    return
+            # Rate-limit waits happen here, not in a worker holding a pool slot.
+            ticket = service.admit(video)
+            with self._cond:
+                if service.cancelled:
+                    ticket.refund()
+                    return
+                if not jobs.pending:
+                    self._ready.append(jobs)
+                jobs.pending.append((idx, video, ticket))
+                jobs.outstanding += 1
+                if service.progress:
+                    service.progress.queued()
+                self.metrics.high_water(
+                    "queue_depth_max", sum(len(j.pending) for j in self._ready), queue="scheduler"
+                )
+                self._cond.notify_all()
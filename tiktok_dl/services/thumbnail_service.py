@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional, Set
+
+import requests
+
+from ..logging import Logger
+from ..manifest import DownloadManifest
+from ..metrics import Metrics
+from ..models import VideoItem
+from ..ratelimit import UNMETERED_HEADER
+
+CHUNK_SIZE = 64 * 1024
+
+
+def link_or_copy(source: Path, target: Path) -> None:
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copy2(source, target)
+
+
+class ThumbnailService:
+    """Fetch thumbnails in the background while videos download.
+
+    Images stream to a temporary file and are renamed into place, so a
+    killed run never leaves a truncated JPEG. ETag/Last-Modified values are
+    kept in the manifest; an unchanged image (304) is linked from the copy
+    fetched by an earlier run instead of being transferred again.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: int,
+        logger: Logger,
+        manifest: Optional[DownloadManifest] = None,
+        max_workers: int = 4,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        self.session = session
+        self.timeout = timeout
+        self.logger = logger
+        self.manifest = manifest
+        self.metrics = metrics or Metrics()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, int(max_workers)), thread_name_prefix="thumbnail"
+        )
+        self._futures: Set[Future] = set()
+        self._lock = threading.Lock()
+        self.saved = 0
+        self.reused = 0
+
+    def submit(self, video: VideoItem, target_dir: Path) -> None:
+        if not video.thumbnail_url:
+            return
+        future = self._executor.submit(self._fetch, video, target_dir / "thumbnails")
+        with self._lock:
+            self._futures.add(future)
+        # Long-running modes never call wait(); don't hold on to finished fetches.
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future: Future) -> None:
+        if future.cancelled() or future.exception() is None:
+            with self._lock:
+                self._futures.discard(future)
+
+    def submit_all(self, videos: List[VideoItem], target_dir: Path) -> None:
+        for video in videos:
+            self.submit(video, target_dir)
+
+    def _conditional_headers(self, video: VideoItem) -> dict:
+        entry = self.manifest.thumbnail(video.id) if self.manifest else None
+        if not entry or not entry.path.exists():
+            return {}
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def _fetch(self, video: VideoItem, thumb_dir: Path) -> None:
+        started = time.perf_counter()
+        try:
+            self._fetch_one(video, thumb_dir)
+        finally:
+            self.metrics.observe("thumbnail", time.perf_counter() - started)
+
+    def _fetch_one(self, video: VideoItem, thumb_dir: Path) -> None:
+        thumb_dir.mkdir(parents=True, exist_ok=True)
+        filename = thumb_dir / f"{video.id}.jpg"
+        if filename.exists():
+            return
+        # Covers are not rate limited: a 403 here is an expired signed URL, not throttling.
+        headers = {**self._conditional_headers(video), UNMETERED_HEADER: "1"}
+        partial = filename.with_suffix(".jpg.part")
+        try:
+            with self.session.get(
+                video.thumbnail_url, headers=headers, timeout=self.timeout, stream=True
+            ) as resp:
+                if resp.status_code == 304 and self.manifest:
+                    entry = self.manifest.thumbnail(video.id)
+                    if entry:
+                        link_or_copy(entry.path, filename)
+                        with self._lock:
+                            self.reused += 1
+                        self.metrics.incr("thumbnails_total", status="reused")
+                    return
+                if resp.status_code != 200:
+                    return
+                with partial.open("wb") as fh:
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        fh.write(chunk)
+                self.metrics.incr("bytes_total", partial.stat().st_size, kind="thumbnail")
+                os.replace(partial, filename)
+                if self.manifest:
+                    self.manifest.record_thumbnail(
+                        video.id,
+                        filename,
+                        resp.headers.get("ETag"),
+                        resp.headers.get("Last-Modified"),
+                    )
+            with self._lock:
+                self.saved += 1
+            self.metrics.incr("thumbnails_total", status="saved")
+            self.logger.success(f"Saved thumbnail {filename.name}")
+        except Exception as exc:
+            partial.unlink(missing_ok=True)
+            self.metrics.incr("thumbnails_total", status="failed")
+            self.logger.warn(f"Failed to download thumbnail for {video.id}: {exc}")
+
+    def wait(self) -> None:
+        with self._lock:
+            futures, self._futures = self._futures, set()
+        for future in futures:
+            future.result()
+
+    def close(self) -> None:
+        self.wait()
+        self._executor.shutdown(wait=True)
+        if self.saved or self.reused:
+            self.logger.info(
+                f"Thumbnails: {self.saved} downloaded, {self.reused} unchanged and reused."
+            )
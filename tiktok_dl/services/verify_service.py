@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Iterator, Optional, Set, Tuple
+
+from ..checksums import CHECKSUM_ALGORITHMS, hash_file
+from ..logging import Logger
+from ..models import VerifyReport
+
+VERIFY_CACHE_FILENAME = "verify-cache.sqlite3"
+PROGRESS_EVERY = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS verified (
+    path TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT NOT NULL,
+    verified_at REAL NOT NULL,
+    PRIMARY KEY (path, algorithm)
+);
+"""
+
+
+class VerifyCache:
+    """Remembers files whose checksum matched, keyed on (path, size, mtime)."""
+
+    def __init__(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            str(path), timeout=30, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    @classmethod
+    def open(cls, state_dir: Path) -> "VerifyCache":
+        return cls(state_dir / VERIFY_CACHE_FILENAME)
+
+    def is_fresh(
+        self,
+        target: Path,
+        algorithm: str,
+        size: int,
+        mtime_ns: int,
+        digest: str,
+        max_age: float,
+    ) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, digest, verified_at FROM verified "
+                "WHERE path = ? AND algorithm = ?",
+                (str(target), algorithm),
+            ).fetchone()
+        if not row:
+            return False
+        return (
+            row[0] == size
+            and row[1] == mtime_ns
+            and row[2] == digest
+            and time.time() - row[3] <= max_age
+        )
+
+    def store(self, target: Path, algorithm: str, size: int, mtime_ns: int, digest: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO verified "
+                "(path, algorithm, size, mtime_ns, digest, verified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (str(target), algorithm, size, mtime_ns, digest, time.time()),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class VerifyService:
+    def __init__(
+        self,
+        root: Path,
+        logger: Logger,
+        max_workers: int = 4,
+        cache: Optional[VerifyCache] = None,
+        max_age: float = 7 * 86400,
+    ) -> None:
+        self.root = root
+        self.logger = logger
+        self.max_workers = max(1, int(max_workers))
+        self.cache = cache
+        self.max_age = max_age
+
+    def _sidecars(self) -> Iterator[Tuple[Path, str]]:
+        for algorithm in CHECKSUM_ALGORITHMS:
+            for sum_path in self.root.rglob(f"*.{algorithm}"):
+                yield sum_path, algorithm
+
+    def _verify_one(self, sum_path: Path, algorithm: str) -> Tuple[str, int]:
+        target = sum_path.with_suffix("")
+        try:
+            stat = target.stat()
+        except OSError:
+            self.logger.warn(f"Missing referenced file for {sum_path}")
+            return "missing", 0
+        expected = sum_path.read_text(encoding="utf-8").strip()
+        if self.cache and self.cache.is_fresh(
+            target, algorithm, stat.st_size, stat.st_mtime_ns, expected, self.max_age
+        ):
+            return "cached", 0
+        digest = hash_file(target, algorithm)
+        if digest != expected:
+            self.logger.error(f"Checksum mismatch: {target}")
+            return "mismatched", stat.st_size
+        if self.cache:
+            self.cache.store(target, algorithm, stat.st_size, stat.st_mtime_ns, digest)
+        return "checked", stat.st_size
+
+    def _tally(self, report: VerifyReport, outcome: Tuple[str, int]) -> None:
+        status, size = outcome
+        setattr(report, status, getattr(report, status) + 1)
+        report.bytes_hashed += size
+        done = report.checked + report.cached + report.missing + report.mismatched
+        if done % PROGRESS_EVERY == 0:
+            self.logger.info(f"Verified {done} file(s) so far...")
+
+    def run(self) -> VerifyReport:
+        report = VerifyReport()
+        started = time.monotonic()
+        window = self.max_workers * 4
+        pending: Set[Future] = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for sum_path, algorithm in self._sidecars():
+                if len(pending) >= window:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._tally(report, future.result())
+                pending.add(executor.submit(self._verify_one, sum_path, algorithm))
+            for future in pending:
+                self._tally(report, future.result())
+
+        report.elapsed = time.monotonic() - started
+        return report
@@ -3,19 +3,52 @@ from __future__ import annotations
 import collections
 import re
 import time
-from typing import Deque, List, Set
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urljoin
 
 import requests
 
 from ..logging import Logger
-from ..models import VideoItem
+from ..manifest import DownloadManifest
+from ..metrics import Metrics
+from ..models import DiscoveryOutcome, DownloadResult, VideoItem
+from ..ratelimit import MEDIA_HOST, AdaptiveRateLimiter
+from . import TIKTOK_WEB_BASE, TIKWM_API_BASE
+
+PAGE_SIZE = 30
+
+
+def _id_value(video_id: str | None) -> int:
+    try:
+        return int(video_id or 0)
+    except ValueError:
+        return 0
 
 
 class VideoService:
-    def __init__(self, session: requests.Session, timeout: int, logger: Logger) -> None:
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: int,
+        logger: Logger,
+        manifest: Optional[DownloadManifest] = None,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        page_concurrency: int = 1,
+        api_base: str = TIKWM_API_BASE,
+        web_base: str = TIKTOK_WEB_BASE,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
         self.session = session
         self.timeout = timeout
         self.logger = logger
+        self.manifest = manifest
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(logger=logger)
+        self.page_concurrency = max(1, int(page_concurrency))
+        self.api_base = api_base.rstrip("/")
+        self.web_base = web_base.rstrip("/")
+        self.metrics = metrics or Metrics()
         self.error_window: Deque[float] = collections.deque(maxlen=5)
 
     def _extract_video_id(self, url: str) -> str | None:
@@ -35,91 +68,282 @@ class VideoService:
             span = self.error_window[-1] - self.error_window[0]
             if span < 30:
                 self.logger.warn("TikTok appears to be throttling requests. Cooling down for 120 seconds.")
-                time.sleep(120)
+                self.metrics.incr("cooldowns_total")
+                with self.metrics.phase("cooldown"):
+                    time.sleep(120)
                 self.error_window.clear()
 
-    def discover_videos(self, username: str, max_pages: int = 10) -> List[VideoItem]:
+    def _known_checkers(self, username: str, incremental: bool, outcome: DiscoveryOutcome):
+        """Return (below_mark, downloaded) predicates for an incremental scan.
+
+        Scans stop at posts below the watermark. Posts above it that are
+        already in the manifest are skipped but do not stop the scan: a
+        page that failed last time can sit behind them. They are noted in
+        ``outcome.known`` so the watermark can move past them.
+        """
+        if not incremental:
+            return (lambda vid: False), (lambda vid: False)
+        watermark = self.manifest.watermark(username) if self.manifest else None
+        newest = _id_value(watermark.newest_id) if watermark else 0
+        if watermark and watermark.newest_id:
+            self.logger.info(
+                f"Incremental scan: looking for posts newer than {watermark.newest_id}."
+            )
+
+        def below_mark(vid: str) -> bool:
+            return bool(newest) and _id_value(vid) <= newest
+
+        def downloaded(vid: str) -> bool:
+            if self.manifest.contains(vid):
+                outcome.known.append(vid)
+                return True
+            return False
+
+        return below_mark, downloaded
+
+    def _fetch_page(self, username: str, page: int) -> Optional[List[dict]]:
+        """Return the raw videos on one TikWM page, or None if the page was skipped."""
+        cursor = (page - 1) * PAGE_SIZE
+        api_url = (
+            f"{self.api_base}/user/posts?"
+            f"unique_id=@{username}&count={PAGE_SIZE}&cursor={cursor}"
+        )
+        try:
+            started = time.perf_counter()
+            resp = self.session.get(api_url, timeout=self.timeout)
+            self.metrics.observe("discovery_page", time.perf_counter() - started)
+            if resp.status_code in (403, 429):
+                self.metrics.incr("throttle_events_total", source="tikwm")
+                self.error_window.append(time.time())
+                self._cooldown_if_needed()
+                return None
+            if resp.status_code != 200:
+                return None
+            return resp.json().get("data", {}).get("videos", [])
+        except Exception as exc:
+            self.logger.warn(f"TikWM page {page} failed: {exc}")
+            return None
+
+    def _iter_pages(
+        self, username: str, max_pages: int
+    ) -> Iterator[Tuple[int, Optional[List[dict]]]]:
+        """Yield TikWM pages in cursor order, prefetching later cursors.
+
+        Cursors are plain offsets, so pages can be requested ahead of time.
+        The number in flight starts at one and doubles with every page the
+        caller asks for, up to ``page_concurrency``; incremental scans that
+        stop after the first page therefore cost a single request. Pending
+        requests are cancelled when the caller stops iterating.
+        """
+        if self.page_concurrency <= 1:
+            for page in range(1, max_pages + 1):
+                yield page, self._fetch_page(username, page)
+            return
+
+        executor = ThreadPoolExecutor(
+            max_workers=self.page_concurrency, thread_name_prefix="tikwm"
+        )
+        pending: Dict[int, Future] = {}
+        next_page = 1
+        window = 1
+        try:
+            for page in range(1, max_pages + 1):
+                while next_page <= max_pages and len(pending) < window:
+                    pending[next_page] = executor.submit(self._fetch_page, username, next_page)
+                    next_page += 1
+                videos = pending.pop(page).result()
+                window = min(window * 2, self.page_concurrency)
+                yield page, videos
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def _entry_thumbnail(entry: dict) -> Optional[str]:
+        if entry.get("thumbnail"):
+            return entry["thumbnail"]
+        thumbnails = entry.get("thumbnails") or []
+        return thumbnails[-1].get("url") if thumbnails else None
+
+    def _play_url(self, video: dict) -> Optional[str]:
+        play = video.get("play")
+        if not isinstance(play, str) or not play:
+            return None
+        # TikWM sometimes answers with a path on its own host.
+        return urljoin(self.api_base, play)
+
+    def discover_videos(
+        self,
+        username: str,
+        max_pages: int = 10,
+        incremental: bool = False,
+        outcome: Optional[DiscoveryOutcome] = None,
+    ) -> List[VideoItem]:
+        return list(self.iter_videos(username, max_pages, incremental, outcome))
+
+    def iter_videos(
+        self,
+        username: str,
+        max_pages: int = 10,
+        incremental: bool = False,
+        outcome: Optional[DiscoveryOutcome] = None,
+    ) -> Iterator[VideoItem]:
+        """Yield videos as each source page arrives instead of after the full scan.
+
+        ``outcome`` records pages that failed and a scan cut off by
+        ``max_pages``; posts on those pages were never seen, so the caller
+        must not move the watermark past them.
+        """
         username = username.lstrip("@")
-        collected: List[VideoItem] = []
+        if outcome is None:
+            outcome = DiscoveryOutcome()
         seen: Set[str] = set()
+        found = 0
+
+        if incremental and not self.manifest:
+            self.logger.warn("Incremental discovery needs the download manifest; scanning everything.")
+            incremental = False
+        below_mark, downloaded = self._known_checkers(username, incremental, outcome)
 
         self.logger.info(f"Scanning @{username} for available videos...")
 
-        # Method 1: yt-dlp flat extraction
+        started = time.perf_counter()
         try:
-            import yt_dlp  # noqa: PLC0415
-
-            opts = {"quiet": True, "extract_flat": True, "playlistend": 500}
-            with yt_dlp.YoutubeDL(opts) as ydl:
-                info = ydl.extract_info(
-                    f"https://www.tiktok.com/@{username}",
-                    download=False,
-                )
-            entries = info.get("entries", []) if isinstance(info, dict) else []
-            for entry in entries:
-                url = entry.get("url")
-                if not url:
-                    continue
-                vid = self._extract_video_id(url)
-                if vid and vid not in seen:
-                    seen.add(vid)
-                    collected.append(
-                        VideoItem(
+            # Method 1: yt-dlp flat extraction
+            try:
+                import yt_dlp  # noqa: PLC0415
+
+                opts = {"quiet": True, "extract_flat": True, "playlistend": 500}
+                known_streak = 0
+                self.rate_limiter.acquire(MEDIA_HOST)
+                with yt_dlp.YoutubeDL(opts) as ydl:
+                    # process=False keeps the entry generator lazy, so videos are
+                    # yielded page by page and incremental scans stop requesting
+                    # pages once they reach known videos.
+                    info = ydl.extract_info(
+                        f"{self.web_base}/@{username}",
+                        download=False,
+                        process=False,
+                    )
+                    entries: Iterable[dict] = (
+                        (info.get("entries") or []) if isinstance(info, dict) else []
+                    )
+                    for position, entry in enumerate(entries, start=1):
+                        if position > opts["playlistend"]:
+                            break
+                        url = entry.get("url")
+                        if not url:
+                            continue
+                        vid = self._extract_video_id(url)
+                        if not vid or vid in seen:
+                            continue
+                        seen.add(vid)
+                        if below_mark(vid):
+                            known_streak += 1
+                            if known_streak >= PAGE_SIZE:
+                                break
+                            continue
+                        known_streak = 0
+                        if downloaded(vid):
+                            continue
+                        found += 1
+                        yield VideoItem(
                             id=vid,
                             url=url,
                             description=entry.get("title"),
-                            thumbnail_url=entry.get("thumbnail"),
+                            thumbnail_url=self._entry_thumbnail(entry),
                         )
-                    )
-            if collected:
-                self.logger.success(f"yt-dlp discovered {len(collected)} videos so far.")
-        except Exception as exc:
-            self.logger.warn(f"yt-dlp discovery failed: {exc}")
-
-        # Method 2: TikWM API pagination
-        for page in range(1, max_pages + 1):
-            cursor = (page - 1) * 30
-            api_url = (
-                f"https://www.tikwm.com/api/user/posts?"
-                f"unique_id=@{username}&count=30&cursor={cursor}"
-            )
-            try:
-                resp = self.session.get(api_url, timeout=self.timeout)
-                if resp.status_code in (403, 429):
-                    self.error_window.append(time.time())
-                    self._cooldown_if_needed()
-                    continue
-                if resp.status_code != 200:
-                    continue
-                payload = resp.json()
-                videos = payload.get("data", {}).get("videos", [])
-                new_count = 0
-                for video in videos:
-                    vid = video.get("video_id")
-                    if not vid or vid in seen:
+                if found:
+                    self.logger.success(f"yt-dlp discovered {found} videos so far.")
+            except Exception as exc:
+                self.logger.warn(f"yt-dlp discovery failed: {exc}")
+
+            # Method 2: TikWM API pagination
+            with closing(self._iter_pages(username, max_pages)) as pages:
+                for page, videos in pages:
+                    if videos is None:
+                        outcome.failed_pages += 1
                         continue
-                    seen.add(vid)
-                    collected.append(
-                        VideoItem(
-                            id=vid,
-                            url=f"https://www.tiktok.com/@{username}/video/{vid}",
-                            description=video.get("title"),
-                            thumbnail_url=video.get("cover"),
+                    page_items: List[VideoItem] = []
+                    skipped_downloaded = False
+                    for video in videos:
+                        vid = video.get("video_id")
+                        if not vid or vid in seen:
+                            continue
+                        seen.add(vid)
+                        if below_mark(vid):
+                            continue
+                        if downloaded(vid):
+                            skipped_downloaded = True
+                            continue
+                        page_items.append(
+                            VideoItem(
+                                id=vid,
+                                url=f"{self.web_base}/@{username}/video/{vid}",
+                                description=video.get("title"),
+                                thumbnail_url=video.get("cover"),
+                                play_url=self._play_url(video),
+                                size=video.get("size") if isinstance(video.get("size"), int) else None,
+                            )
                         )
-                    )
-                    new_count += 1
-                if new_count:
+                    if not page_items:
+                        if not skipped_downloaded:
+                            break
+                        continue
+                    found += len(page_items)
                     self.logger.info(
-                        f"Page {page}: +{new_count} videos (total {len(collected)})."
+                        f"Page {page}: +{len(page_items)} videos (total {found})."
                     )
+                    yield from page_items
                 else:
-                    break
-            except Exception as exc:
-                self.logger.warn(f"TikWM page {page} failed: {exc}")
-            time.sleep(0.3)
+                    # Every page was full: the account may go on past max_pages.
+                    outcome.truncated = True
+        finally:
+            # Wall time: with streaming this overlaps the downloads it feeds.
+            self.metrics.record_phase(
+                "discovery", time.perf_counter() - started, account=username, found=found
+            )
+            self.metrics.incr("videos_discovered_total", found)
 
-        if not collected:
+        if outcome.failed_pages:
+            self.logger.warn(
+                f"{outcome.failed_pages} page(s) of @{username} failed; they will be scanned again next run."
+            )
+        if incremental and not found:
+            self.logger.info(f"No new videos for @{username} since the last run.")
+        elif not found:
             self.logger.warn("No videos discovered.")
         else:
-            self.logger.info(f"Discovered total {len(collected)} unique videos.")
-        return collected
+            self.logger.info(f"Discovered total {found} unique videos.")
+
+    def advance_watermark(
+        self,
+        username: str,
+        discovered: Iterable[VideoItem],
+        results: Iterable[DownloadResult],
+        outcome: Optional[DiscoveryOutcome] = None,
+    ) -> None:
+        """Move the high-water mark up to the newest video with nothing pending below it.
+
+        The mark stays put when ``outcome`` shows discovery did not read the
+        whole account (a ``--count`` limit, a failed page, ``max_pages``):
+        posts it never saw may sit below the newest one. Posts discovery
+        skipped as already downloaded count as done.
+        """
+        if not self.manifest or (outcome and not outcome.complete):
+            return
+        username = username.lstrip("@")
+        done = {r.video.id for r in results if r.success}
+        if outcome:
+            done.update(outcome.known)
+        pending = [_id_value(v.id) for v in discovered if v.id not in done]
+        floor = min(pending) if pending else None
+        candidates = [
+            vid for vid in done if floor is None or _id_value(vid) < floor
+        ]
+        if not candidates:
+            return
+        newest = max(candidates, key=_id_value)
+        watermark = self.manifest.watermark(username)
+        if watermark and _id_value(watermark.newest_id) >= _id_value(newest):
+            return
+        self.manifest.update_watermark(username, newest_id=newest)
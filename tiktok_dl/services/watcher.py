@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import math
+import random
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ..models import WatchedAccount
+
+
+class WatchSchedule:
+    """When to poll each watched account next.
+
+    Accounts start at ``interval`` seconds. A poll that finds new posts
+    halves the account's interval (down to ``min_interval``) and a quiet
+    one stretches it by half (up to ``max_interval``), so accounts that
+    post often are polled often. Accounts due together go busiest first,
+    and every poll time is spread by ``jitter`` (a fraction of the
+    interval) so a large watchlist does not hit the API in lockstep.
+    """
+
+    SPEEDUP = 0.5
+    SLOWDOWN = 1.5
+    SMOOTHING = 0.5
+
+    def __init__(
+        self,
+        interval: float,
+        min_interval: float,
+        max_interval: float,
+        jitter: float = 0.1,
+        clock: Callable[[], float] = time.time,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.min_interval = max(1.0, float(min_interval))
+        self.max_interval = max(self.min_interval, float(max_interval))
+        self.interval = min(max(float(interval), self.min_interval), self.max_interval)
+        self.jitter = min(max(float(jitter), 0.0), 0.5)
+        self.clock = clock
+        self._random = rng or random.Random()
+        self._lock = threading.Lock()
+        self._accounts: Dict[str, WatchedAccount] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._accounts)
+
+    def _next(self, interval: float) -> float:
+        spread = interval * self.jitter
+        return self.clock() + interval + self._random.uniform(-spread, spread)
+
+    def sync(self, names: Iterable[str]) -> Tuple[List[str], List[str]]:
+        """Watch exactly ``names``; returns the (added, removed) accounts.
+
+        New accounts are due at once; known ones keep their schedule.
+        """
+        wanted = list(dict.fromkeys(name.strip() for name in names if name.strip()))
+        with self._lock:
+            removed = [name for name in self._accounts if name not in wanted]
+            for name in removed:
+                del self._accounts[name]
+            added = [name for name in wanted if name not in self._accounts]
+            for name in added:
+                self._accounts[name] = WatchedAccount(name, self.interval, self.clock())
+        return added, removed
+
+    def due(self) -> List[str]:
+        """Accounts to poll now, busiest first; each is handed out once.
+
+        An account handed out is not due again until :meth:`polled` or
+        :meth:`failed` reports back on it.
+        """
+        now = self.clock()
+        with self._lock:
+            ready = [a for a in self._accounts.values() if a.next_due <= now]
+            ready.sort(key=lambda a: (-a.posts_per_poll, a.next_due))
+            for account in ready:
+                account.next_due = math.inf
+        return [account.name for account in ready]
+
+    def polled(self, name: str, new_posts: int) -> Optional[float]:
+        """Record a finished poll; returns seconds until the next one."""
+        with self._lock:
+            account = self._accounts.get(name)
+            if not account:
+                return None
+            account.polls += 1
+            account.failures = 0
+            account.posts_per_poll += self.SMOOTHING * (new_posts - account.posts_per_poll)
+            factor = self.SPEEDUP if new_posts else self.SLOWDOWN
+            account.interval = min(max(account.interval * factor, self.min_interval), self.max_interval)
+            account.next_due = self._next(account.interval)
+            return account.next_due - self.clock()
+
+    def failed(self, name: str) -> Optional[float]:
+        """Retry a failed poll sooner than its interval, backing off each time."""
+        with self._lock:
+            account = self._accounts.get(name)
+            if not account:
+                return None
+            account.failures += 1
+            retry = min(self.min_interval * 2 ** (account.failures - 1), account.interval)
+            account.next_due = self._next(retry)
+            return account.next_due - self.clock()
+
+    def seconds_until_next(self) -> Optional[float]:
+        with self._lock:
+            pending = [a.next_due for a in self._accounts.values() if a.next_due != math.inf]
+        if not pending:
+            return None
+        return max(0.0, min(pending) - self.clock())
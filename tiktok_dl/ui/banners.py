@@ -1,13 +1,16 @@
 from __future__ import annotations
 
-import os
+import sys
 
 from ..theme import Theme
 from ..utils import human_timestamp, mask_ip, system_info
 
 
 def clear_screen() -> None:
-    os.system("cls" if os.name == "nt" else "clear")
+    # Home the cursor and erase the display; no shell needed, no-op when piped.
+    if sys.stdout.isatty():
+        sys.stdout.write("\033[H\033[2J")
+        sys.stdout.flush()
 
 
 def print_banner(ip_info: dict | None = None) -> None:
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import queue
+import shutil
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, TextIO
+
+from ..logging import Logger
+from ..theme import Theme
+
+# Move the cursor to the start of the line N lines up, then clear below it.
+_ERASE_BLOCK = "\x1b[{n}F\x1b[J"
+
+
+def human_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} B"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def human_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--"
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return f"{seconds // 3600}h{seconds % 3600 // 60:02d}m"
+    if seconds >= 60:
+        return f"{seconds // 60}m{seconds % 60:02d}s"
+    return f"{seconds}s"
+
+
+@dataclass
+class _WorkerState:
+    video_id: str
+    received: int = 0
+    total: Optional[int] = None
+
+
+class ProgressRenderer:
+    """Batch console output from worker threads into periodic frames.
+
+    Producers only put small tuples on a queue; a single thread drains it
+    and redraws at a fixed rate, so the terminal sees one write per frame
+    no matter how many workers there are. On a TTY the frame is a status
+    block (totals, throughput, ETA, one line per busy worker) redrawn in
+    place with log lines scrolling above it. Elsewhere (cron, pipes) a
+    compact summary line is printed every ``interval`` seconds and
+    per-item success lines are dropped.
+    """
+
+    def __init__(
+        self,
+        logger: Logger,
+        stream: Optional[TextIO] = None,
+        fps: float = 4.0,
+        interval: float = 10.0,
+        tty: Optional[bool] = None,
+    ) -> None:
+        self.logger = logger
+        self.stream = stream or sys.stdout
+        self.tty = self.stream.isatty() if tty is None else tty
+        self.frame = 1 / fps if self.tty else interval
+        self._events: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.queued_count = 0
+        self.done = 0
+        self.failed = 0
+        self.completed_bytes = 0
+        self.workers: Dict[str, _WorkerState] = {}
+        self._messages: List[str] = []
+        self._drawn = 0
+        self._last_summary = ""
+        self._started = time.monotonic()
+
+    # Producer side: safe to call from any thread.
+
+    def queued(self, count: int = 1) -> None:
+        self._events.put(("queued", None, count))
+
+    def started(self, video_id: str) -> None:
+        self._events.put(("started", threading.current_thread().name, video_id))
+
+    def hook(self, status: Dict[str, Any]) -> None:
+        """yt-dlp progress hook reporting bytes for the calling worker."""
+        if status.get("status") == "downloading":
+            total = status.get("total_bytes") or status.get("total_bytes_estimate")
+            total = int(total) if total else None
+            self._events.put(
+                ("bytes", threading.current_thread().name, (status.get("downloaded_bytes") or 0, total))
+            )
+
+    def finished(self, success: bool, size: int = 0) -> None:
+        self._events.put(("finished", threading.current_thread().name, (success, size)))
+
+    def log(self, level: str, line: str) -> None:
+        self._events.put(("log", level, line))
+
+    # Lifecycle.
+
+    def __enter__(self) -> "ProgressRenderer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread:
+            return
+        self._reset()
+        self._stop.clear()
+        self.logger.sink = self.log
+        self._thread = threading.Thread(target=self._run, name="progress", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if not self._thread:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.logger.sink = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.frame):
+            self._drain()
+            self._render()
+        self._drain()
+        self._render(final=True)
+
+    # Consumer side: only the renderer thread touches the state below.
+
+    def _drain(self) -> None:
+        while True:
+            try:
+                kind, key, value = self._events.get_nowait()
+            except queue.Empty:
+                return
+            if kind == "queued":
+                self.queued_count += value
+            elif kind == "started":
+                self.workers[key] = _WorkerState(value)
+            elif kind == "bytes":
+                state = self.workers.get(key)
+                if state:
+                    state.received, state.total = value
+            elif kind == "finished":
+                success, size = value
+                self.workers.pop(key, None)
+                self.done += 1
+                self.failed += 0 if success else 1
+                self.completed_bytes += size
+            elif kind == "log":
+                if self.tty or key != "success":
+                    self._messages.append(value)
+
+    def _stats(self) -> tuple:
+        elapsed = max(time.monotonic() - self._started, 1e-6)
+        in_flight = sum(state.received for state in self.workers.values())
+        rate = (self.completed_bytes + in_flight) / elapsed
+        remaining = self.queued_count - self.done
+        eta = remaining / (self.done / elapsed) if self.done and remaining > 0 else None
+        return rate, eta
+
+    def _summary(self) -> str:
+        rate, eta = self._stats()
+        failed = f", {self.failed} failed" if self.failed else ""
+        return (
+            f"{self.done}/{self.queued_count} done{failed}, "
+            f"{human_bytes(rate)}/s, ETA {human_duration(eta)}"
+        )
+
+    def _render(self, final: bool = False) -> None:
+        out: List[str] = []
+        if self.tty and self._drawn:
+            out.append(_ERASE_BLOCK.format(n=self._drawn))
+            self._drawn = 0
+        out.extend(line + "\n" for line in self._messages)
+        self._messages = []
+
+        summary = self._summary()
+        if self.tty:
+            # Lines must not wrap, or erasing the block would miss rows.
+            width = max(20, shutil.get_terminal_size().columns - 1)
+            block = [f"{Theme.PRIMARY}{Theme.BOLD}{('Progress ' + summary)[:width]}{Theme.RESET}"]
+            if not final:
+                for name in sorted(self.workers):
+                    state = self.workers[name]
+                    percent = f"{state.received * 100 // state.total:3d}%" if state.total else "    "
+                    text = f"{name:<14} {state.video_id} {percent} {human_bytes(state.received)}"
+                    block.append(f"{Theme.MUTED}{text[:width]}{Theme.RESET}")
+            out.extend(line + "\n" for line in block)
+            self._drawn = 0 if final else len(block)
+        elif summary != self._last_summary or final:
+            out.append(f"[progress] {summary}\n")
+            self._last_summary = summary
+
+        if out:
+            self.stream.write("".join(out))
+            self.stream.flush()
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import Iterable
 
 from ..logging import Logger
-from ..models import DownloadResult, UserProfile
+from ..models import DownloadResult, UserProfile, VerifyReport
 from ..theme import Theme
 from ..utils import human_timestamp
 
@@ -25,36 +25,67 @@ def print_profile(profile: UserProfile | None, logger: Logger) -> None:
         ],
     )
     if profile.signature:
-        print(f"{Theme.MUTED}Bio: {Theme.RESET}{profile.signature[:120]}")
+        logger.write(f"{Theme.MUTED}Bio: {Theme.RESET}{profile.signature[:120]}")
 
 
 def print_results(results: list[DownloadResult], logger: Logger) -> None:
-    success = sum(1 for r in results if r.success and r.status != "skipped")
+    success = sum(1 for r in results if r.status == "downloaded")
     skipped = sum(1 for r in results if r.status == "skipped")
-    failed = sum(1 for r in results if not r.success)
+    linked = sum(1 for r in results if r.status == "linked")
+    remote = sum(1 for r in results if r.status == "remote")
+    failed = sum(1 for r in results if not r.success and r.status != "remote")
     blocked = sum(1 for r in results if r.status == "blocked")
 
-    print()
-    print(f"{Theme.PRIMARY}{Theme.BOLD}Download summary - {human_timestamp()}{Theme.RESET}")
-    print(f"{Theme.SUCCESS}Downloaded: {success}{Theme.RESET}")
-    print(f"{Theme.WARNING}Skipped:   {skipped}{Theme.RESET}")
+    lines = [
+        "",
+        f"{Theme.PRIMARY}{Theme.BOLD}Download summary - {human_timestamp()}{Theme.RESET}",
+        f"{Theme.SUCCESS}Downloaded: {success}{Theme.RESET}",
+        f"{Theme.WARNING}Skipped:   {skipped}{Theme.RESET}",
+    ]
+    if linked:
+        lines.append(f"{Theme.ACCENT}Reused:    {linked}{Theme.RESET}")
+    if remote:
+        lines.append(f"{Theme.MUTED}Elsewhere: {remote}{Theme.RESET}")
     if blocked:
-        print(f"{Theme.WARNING}Blocked:   {blocked}{Theme.RESET}")
-    print(f"{Theme.ERROR}Failed:    {failed}{Theme.RESET}")
-    print()
+        lines.append(f"{Theme.WARNING}Blocked:   {blocked}{Theme.RESET}")
+    lines.append(f"{Theme.ERROR}Failed:    {failed}{Theme.RESET}")
+    lines.append("")
 
+    # Successful videos are covered by the counts; list only what needs attention.
     for entry in results:
-        status_color = {
-            "downloaded": Theme.SUCCESS,
-            "skipped": Theme.WARNING,
-            "failed": Theme.ERROR,
-            "blocked": Theme.WARNING,
-        }.get(entry.status, Theme.MUTED)
-        print(
+        if entry.success or entry.status == "remote":
+            continue
+        status_color = Theme.WARNING if entry.status == "blocked" else Theme.ERROR
+        lines.append(
             f"{status_color}{entry.index:03d} "
             f"{entry.status.upper():<10} "
             f"{entry.video.url}{Theme.RESET}"
         )
+    if failed:
+        lines.append("")
 
-    print()
+    # One write for the whole block keeps slow terminals responsive.
+    logger.write("\n".join(lines))
     logger.info("Done.")
+
+
+def print_verify_report(report: VerifyReport, logger: Logger) -> None:
+    elapsed = max(report.elapsed, 1e-6)
+    hashed = report.checked + report.mismatched
+    lines = [
+        "",
+        f"{Theme.PRIMARY}{Theme.BOLD}Verification summary - {human_timestamp()}{Theme.RESET}",
+        f"{Theme.SUCCESS}Verified:   {report.checked}{Theme.RESET}",
+        f"{Theme.MUTED}Cached:     {report.cached}{Theme.RESET}",
+        f"{Theme.WARNING}Missing:    {report.missing}{Theme.RESET}",
+        f"{Theme.ERROR}Mismatched: {report.mismatched}{Theme.RESET}",
+        f"{Theme.MUTED}Hashed {hashed} file(s), {report.bytes_hashed / 1e6:.1f} MB in "
+        f"{report.elapsed:.1f}s ({hashed / elapsed:.1f} files/s, "
+        f"{report.bytes_hashed / 1e6 / elapsed:.1f} MB/s){Theme.RESET}",
+        "",
+    ]
+    logger.write("\n".join(lines))
+    if report.issues == 0:
+        logger.success("All checksum files verified successfully.")
+    else:
+        logger.warn(f"Verification completed with {report.issues} issue(s).")
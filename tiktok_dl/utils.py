@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import json
 import platform
 import socket
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict
+from typing import Dict, Optional
 
 import getpass
 import requests
@@ -38,6 +41,65 @@ def fetch_ip_metadata(session: requests.Session, timeout: int) -> Dict[str, str]
         return {"ip": "unknown", "city": "unknown", "country": "unknown"}
 
 
+IP_CACHE_FILENAME = "ip-cache.json"
+IP_CACHE_TTL = 3600
+
+
+class IpLookup:
+    """Look up IP metadata on a daemon thread instead of blocking startup.
+
+    A successful result is cached on disk for ``ttl`` seconds, so repeated
+    short runs (cron) skip the request entirely. :meth:`get` never waits
+    longer than asked; the banner simply omits the IP line until it is known.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        timeout: int,
+        cache_path: Optional[Path] = None,
+        ttl: float = IP_CACHE_TTL,
+    ) -> None:
+        self.session = session
+        self.timeout = timeout
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._done = threading.Event()
+        self._result = self._load_cached()
+        if self._result is not None:
+            self._done.set()
+        else:
+            threading.Thread(target=self._run, name="ip-lookup", daemon=True).start()
+
+    def _load_cached(self) -> Optional[Dict[str, str]]:
+        if not self.cache_path:
+            return None
+        try:
+            cached = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if time.time() - float(cached["fetched_at"]) < self.ttl:
+                return dict(cached["data"])
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _run(self) -> None:
+        data = fetch_ip_metadata(self.session, self.timeout)
+        self._result = data
+        self._done.set()
+        if self.cache_path and data.get("ip") != "unknown":
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                self.cache_path.write_text(
+                    json.dumps({"fetched_at": time.time(), "data": data}), encoding="utf-8"
+                )
+            except OSError:
+                pass
+
+    def get(self, wait: float = 0.0) -> Optional[Dict[str, str]]:
+        self._done.wait(wait)
+        return self._result
+
+
 def mask_ip(ip: str) -> str:
     parts = ip.split(".")
     if len(parts) == 4:
@@ -0,0 +1,297 @@
+"""Pools of reusable yt-dlp instances, in-process or in worker processes."""
+from __future__ import annotations
+
+import multiprocessing
+import signal
+import threading
+from dataclasses import dataclass
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Optional
+
+ProgressHook = Callable[[Dict[str, Any]], None]
+
+_CANCEL = "cancel"
+
+
+def chain_hooks(*hooks: Optional[ProgressHook]) -> ProgressHook:
+    active = [hook for hook in hooks if hook]
+
+    def dispatch(status: Dict[str, Any]) -> None:
+        for hook in active:
+            hook(status)
+
+    return dispatch
+
+
+class _PooledInstance:
+    def __init__(self, opts: Dict[str, Any]) -> None:
+        # yt-dlp takes ~100 ms to import; only pay for it once a download starts.
+        import yt_dlp  # noqa: PLC0415
+
+        self.hook: Optional[ProgressHook] = None
+        self.ydl = yt_dlp.YoutubeDL({**opts, "progress_hooks": [self._dispatch]})
+
+    def _dispatch(self, status: Dict[str, Any]) -> None:
+        if self.hook:
+            self.hook(status)
+
+
+class YoutubeDLPool:
+    """Hands out idle YoutubeDL instances so setup runs once per worker.
+
+    Building a YoutubeDL registers every extractor, parses options and
+    creates a fresh cookie jar and HTTP handler. Instances are checked out
+    for one download at a time; only ``outtmpl`` and the progress hook
+    change between videos. An instance that raised is closed instead of
+    being returned, so a half-finished download never leaks into the next.
+    """
+
+    def __init__(self, opts: Dict[str, Any]) -> None:
+        self.opts = dict(opts)
+        self._idle: List[_PooledInstance] = []
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _acquire(self) -> _PooledInstance:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            self.created += 1
+        return _PooledInstance(self.opts)
+
+    def _release(self, instance: _PooledInstance) -> None:
+        instance.hook = None
+        with self._lock:
+            self._idle.append(instance)
+
+    def download(self, url: str, outtmpl: str, progress_hook: Optional[ProgressHook] = None) -> None:
+        instance = self._acquire()
+        instance.ydl.params["outtmpl"]["default"] = outtmpl
+        instance.hook = progress_hook
+        try:
+            instance.ydl.download([url])
+        except BaseException:
+            instance.ydl.close()
+            raise
+        self._release(instance)
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for instance in idle:
+            instance.ydl.close()
+
+
+class WorkerDownloadError(Exception):
+    """A download failed inside a worker process; carries yt-dlp's message."""
+
+
+@dataclass(frozen=True)
+class DownloadJob:
+    url: str
+    outtmpl: str
+
+
+@dataclass(frozen=True)
+class WorkerEvent:
+    kind: str  # "progress", "done" or "error"
+    status: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class _Aborted(Exception):
+    pass
+
+
+def _plain(status: Dict[str, Any]) -> Dict[str, Any]:
+    # info_dict and friends may not pickle; the hooks only read scalars.
+    return {k: v for k, v in status.items() if v is None or isinstance(v, (str, int, float, bool))}
+
+
+def _serve_slot(conn: Connection, opts: Dict[str, Any]) -> None:
+    instance: Optional[_PooledInstance] = None
+    while True:
+        try:
+            job = conn.recv()
+        except (EOFError, OSError):
+            return
+        if job is None:
+            return
+        if not isinstance(job, DownloadJob):
+            # A cancel that arrived after its download had already finished.
+            continue
+        if instance is None:
+            instance = _PooledInstance(opts)
+
+        def forward(status: Dict[str, Any]) -> None:
+            while conn.poll():
+                if conn.recv() in (_CANCEL, None):
+                    raise _Aborted("cancelled")
+            conn.send(WorkerEvent("progress", _plain(status)))
+
+        instance.hook = forward
+        instance.ydl.params["outtmpl"]["default"] = job.outtmpl
+        try:
+            instance.ydl.download([job.url])
+        except BaseException as exc:
+            instance.ydl.close()
+            instance = None
+            event = WorkerEvent("error", error=str(exc) or type(exc).__name__)
+        else:
+            event = WorkerEvent("done")
+        try:
+            conn.send(event)
+        except (EOFError, OSError):
+            return
+
+
+def _serve(conns: List[Connection], opts: Dict[str, Any]) -> None:
+    # Ctrl-C goes to the whole process group; the parent decides what to cancel.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    threads = [
+        threading.Thread(target=_serve_slot, args=(conn, opts), name=f"ytdl-{number + 1}")
+        for number, conn in enumerate(conns)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class _Slot:
+    def __init__(self, conn: Connection, process: multiprocessing.process.BaseProcess) -> None:
+        self.conn = conn
+        self.process = process
+
+
+class ProcessYoutubeDLPool:
+    """Runs yt-dlp in worker processes instead of threads of this one.
+
+    Experimental: no gain over :class:`YoutubeDLPool` has been measured.
+    On a single CPU it is slower, since it only adds IPC, and multi-core
+    runs of ``benchmarks/bench_processes.py`` are still outstanding.
+
+    Drop-in for :class:`YoutubeDLPool`: the calling thread sends a
+    :class:`DownloadJob` down a pipe to a slot in a worker process and
+    receives :class:`WorkerEvent` messages back, so progress hooks (hashing,
+    journal, progress display) and rate limiting stay in the parent and are
+    shared by all processes. Each of the ``processes`` workers serves
+    ``threads_per_process`` slots, one download at a time per slot, each with
+    its own reused YoutubeDL. Workers start on first use and a worker that
+    dies is replaced on demand.
+    """
+
+    def __init__(self, opts: Dict[str, Any], processes: int, threads_per_process: int = 1) -> None:
+        self.opts = dict(opts)
+        self.processes = max(1, int(processes))
+        self.threads_per_process = max(1, int(threads_per_process))
+        self.created = 0
+        # Forking a threaded parent can deadlock the child; spawn starts clean.
+        self._context = multiprocessing.get_context("spawn")
+        self._cond = threading.Condition()
+        self._idle: List[_Slot] = []
+        self._live = 0
+        self._workers: List[multiprocessing.process.BaseProcess] = []
+
+    @property
+    def capacity(self) -> int:
+        return self.processes * self.threads_per_process
+
+    def _spawn(self, slots: int) -> List[_Slot]:
+        pipes = [self._context.Pipe() for _ in range(slots)]
+        process = self._context.Process(
+            target=_serve,
+            args=([child for _, child in pipes], self.opts),
+            name="ytdl-worker",
+            daemon=True,
+        )
+        process.start()
+        for _, child in pipes:
+            child.close()
+        with self._cond:
+            self.created += 1
+            self._workers.append(process)
+        return [_Slot(parent, process) for parent, _ in pipes]
+
+    def _acquire(self) -> _Slot:
+        with self._cond:
+            while not self._idle and self._live >= self.capacity:
+                self._cond.wait()
+            if self._idle:
+                return self._idle.pop()
+            count = min(self.capacity - self._live, self.threads_per_process)
+            self._live += count
+        try:
+            slots = self._spawn(count)
+        except BaseException:
+            with self._cond:
+                self._live -= count
+                self._cond.notify_all()
+            raise
+        with self._cond:
+            self._idle.extend(slots[1:])
+            self._cond.notify_all()
+        return slots[0]
+
+    def _release(self, slot: _Slot) -> None:
+        with self._cond:
+            self._idle.append(slot)
+            self._cond.notify()
+
+    def _discard(self, slot: _Slot) -> None:
+        slot.conn.close()
+        with self._cond:
+            self._live -= 1
+            if not slot.process.is_alive():
+                # Its other idle slots are gone too.
+                dead = [s for s in self._idle if s.process is slot.process]
+                for other in dead:
+                    self._idle.remove(other)
+                    other.conn.close()
+                self._live -= len(dead)
+            self._cond.notify_all()
+
+    def download(self, url: str, outtmpl: str, progress_hook: Optional[ProgressHook] = None) -> None:
+        slot = self._acquire()
+        failure: Optional[BaseException] = None
+        try:
+            slot.conn.send(DownloadJob(url, outtmpl))
+            while True:
+                event: WorkerEvent = slot.conn.recv()
+                if event.kind != "progress":
+                    break
+                if progress_hook and failure is None:
+                    try:
+                        progress_hook(event.status or {})
+                    except BaseException as exc:
+                        # Keep draining until the worker confirms it stopped.
+                        failure = exc
+                        slot.conn.send(_CANCEL)
+        except (EOFError, OSError) as exc:
+            self._discard(slot)
+            raise WorkerDownloadError(f"yt-dlp worker process exited: {exc}") from exc
+        except BaseException:
+            self._discard(slot)
+            raise
+        self._release(slot)
+        if failure is not None:
+            raise failure
+        if event.kind == "error":
+            raise WorkerDownloadError(event.error)
+
+    def close(self) -> None:
+        with self._cond:
+            idle, self._idle = self._idle, []
+            workers, self._workers = self._workers, []
+            self._live -= len(idle)
+        for slot in idle:
+            try:
+                slot.conn.send(None)
+            except (EOFError, OSError):
+                pass
+            slot.conn.close()
+        for process in workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+                process.join()